@@ -1,33 +1,55 @@
 import numpy as np
 import random
-from collections import deque, defaultdict
+import time
+from collections import deque, defaultdict, namedtuple
+from itertools import islice
 from config import *
-from bfs import bfs
+from qtable import QTable
+from replay import ReplayBuffer
 
-# -------- HIGH-LEVEL GOALS (RL decides ONLY these) --------
-GO_CLEAN = 0
-GO_DUMP = 1
-GO_CHARGE = 2
-IDLE = 3
+# -------- HIGH-LEVEL GOALS (RL decides ONLY these; codes in config.py) --------
+NUM_GOALS = 4
+
+# -------- STATE SPACE: (batt, bin_stat, dirt_stat) --------
+STATE_SHAPE = (3, 2, 2)
+NUM_STATES = int(np.prod(STATE_SHAPE))
+
+# Tiles interact() can act on; stepping onto one may change the high-level state
+ACTIVE_TILES = (DIRT, BIN, CHARGER)
+
+# Learning and reward constants an agent trains with; sweep.py passes other values
+Hyperparams = namedtuple("Hyperparams", [
+    "learning_rate", "discount_factor", "epsilon", "epsilon_decay", "min_epsilon",
+    "reward_clean", "reward_dump", "reward_step", "reward_wall", "reward_death",
+])
+DEFAULT_PARAMS = Hyperparams(LEARNING_RATE, DISCOUNT_FACTOR, EPSILON, EPSILON_DECAY, MIN_EPSILON,
+                             REWARD_CLEAN, REWARD_DUMP, REWARD_STEP, REWARD_WALL, REWARD_DEATH)
 
 
 class VacuumAgent:
-    def __init__(self):
+    def __init__(self, replay_capacity=REPLAY_CAPACITY, params=DEFAULT_PARAMS):
         self.x = 0
         self.y = 0
         self.battery = MAX_BATTERY
         self.bin = 0
         self.is_alive = True
 
-        self.q_table = {}
-        self.epsilon = EPSILON
+        self.params = params
+        self.q_table = QTable(STATE_SHAPE, NUM_GOALS)
+        self.epsilon = params.epsilon
 
         self.current_goal = None
         self.current_path = deque()
 
+        # Created on the first learn() so agents that only act don't allocate one;
+        # replay_capacity 0 means no replay at all
+        self.replay_capacity = replay_capacity
+        self.replay = None
+        self.replay_steps = 0
+
     # ---------------- HIGH-LEVEL STATE ----------------
     def get_state(self, env):
-        dirt_left = np.count_nonzero(env.grid == DIRT)
+        dirt_left = env.dirt_count
 
         if self.battery < 40:
             batt = 0
@@ -54,45 +76,185 @@ class VacuumAgent:
         if next_state not in self.q_table:
             self.q_table[next_state] = np.zeros(4)
 
-        self.q_table[state][action] += LEARNING_RATE * (
+        p = self.params
+        self.q_table[state][action] += p.learning_rate * (
                 reward
-                + DISCOUNT_FACTOR * np.max(self.q_table[next_state])
+                + p.discount_factor * np.max(self.q_table[next_state])
                 - self.q_table[state][action]
         )
 
+        if self.replay_capacity:
+            table = self.q_table
+            self.replay_buffer().push(table.index(state), action, reward, table.index(next_state))
+            self._after_push()
+
+    def learn_option(self, state, action, reward, next_state, steps):
+        """SMDP Q-update for a goal that ran `steps` grid steps.
+
+        `reward` is the return discounted within the option, so the
+        bootstrap term is discounted by discount_factor ** steps. These
+        updates do not go into the replay buffer, whose model is one-step.
+        """
+        if state not in self.q_table:
+            self.q_table[state] = np.zeros(4)
+
+        if next_state not in self.q_table:
+            self.q_table[next_state] = np.zeros(4)
+
+        p = self.params
+        self.q_table[state][action] += p.learning_rate * (
+                reward
+                + p.discount_factor ** steps * np.max(self.q_table[next_state])
+                - self.q_table[state][action]
+        )
+
+    # ---------------- BATCHED (BatchedGridWorld) ----------------
+    def choose_goals(self, states):
+        """Epsilon-greedy goals for an (N, 3) array of states."""
+        n = len(states)
+        goals = np.random.randint(0, NUM_GOALS, size=n)
+        greedy = np.random.random(n) >= self.epsilon
+        if greedy.any():
+            rows = self.q_table.indices(states[greedy])
+            goals[greedy] = self.q_table.values[rows].argmax(axis=1)
+        return goals
+
+    def learn_batch(self, states, actions, rewards, next_states):
+        """One Q-update per visited (state, action) pair in the batch.
+
+        TD errors are computed against the pre-batch table and averaged per
+        (state, action), so N envs hitting the same pair take one
+        learning_rate step instead of N.
+        """
+        p = self.params
+        table = self.q_table
+        s_idx = table.indices(states)
+        ns_idx = table.indices(next_states)
+        actions = np.asarray(actions, dtype=np.int64)
+
+        td = (rewards + p.discount_factor * table.values[ns_idx].max(axis=1)
+              - table.values[s_idx, actions])
+        flat = s_idx * NUM_GOALS + actions
+        total = np.bincount(flat, weights=td, minlength=table.values.size)
+        count = np.bincount(flat, minlength=table.values.size)
+        hit = count > 0
+        table.values.ravel()[hit] += p.learning_rate * total[hit] / count[hit]
+        table.seen[s_idx] = 1
+        table.seen[ns_idx] = 1
+
+        if self.replay_capacity:
+            self.replay_buffer().push_batch(s_idx, actions, rewards, ns_idx)
+            self._after_push()
+
+    # ---------------- EXPERIENCE REPLAY ----------------
+    def replay_buffer(self):
+        if self.replay is None:
+            self.replay = ReplayBuffer(self.replay_capacity, self.q_table.values.shape[0], NUM_GOALS)
+        return self.replay
+
+    def _after_push(self):
+        """Sweeps the buffer every REPLAY_EVERY learn calls."""
+        self.replay_steps += 1
+        if self.replay_steps % REPLAY_EVERY == 0:
+            self.replay.sweep(self.q_table, learning_rate=self.params.learning_rate,
+                              discount=self.params.discount_factor)
+
     # ---------------- PATH EXECUTION ----------------
     def move_step(self, env):
+        p = self.params
         if not self.current_path:
-            return REWARD_STEP, False
+            return p.reward_step, False
 
         nx, ny = self.current_path.popleft()
 
-        if env.grid[nx][ny] in OBSTACLES:
-            return REWARD_WALL, False
+        if not env.passable[nx, ny]:
+            return p.reward_wall, False
 
         self.x, self.y = nx, ny
         self.battery -= BATTERY_COST_MOVE
 
         if self.battery <= 0:
-            return REWARD_DEATH, True
+            return p.reward_death, True
+
+        return p.reward_step, False
+
+    def act(self, env, goal, timer=None):
+        """One grid step toward `goal`: replans if needed, then move_step() and interact().
 
-        return REWARD_STEP, False
+        A goal that cannot be planned costs REWARD_PLAN_FAIL and the robot
+        stays put. Pass a metrics.PhaseTimer to time the plan, move_step
+        and interact phases. Returns (reward, died, plan_failed).
+        """
+        t = time.perf_counter() if timer else 0.0
+        if self.current_goal != goal or not self.current_path:
+            self.current_goal = goal
+            planned = self.plan(env, goal)
+            if timer: t = timer.lap("plan", t)
+            if not planned:
+                return REWARD_PLAN_FAIL, False, True
+
+        r1, died = self.move_step(env)
+        if timer: t = timer.lap("move_step", t)
+        r2 = self.interact(env)
+        if timer: timer.lap("interact", t)
+        return r1 + r2, died, False
+
+    def run_option(self, env, max_steps):
+        """Follows current_path until the high-level state may change; one SMDP macro-step.
+
+        The leading cells that are plain floor, passable and leave the
+        battery level (and the robot) intact are walked in bulk: position,
+        battery and the step rewards are updated at once. The first cell
+        that breaks that, if any within max_steps, is taken with move_step()
+        and interact() exactly as in the step-by-step loop, and ends the
+        option. Returns (reward, discounted reward, steps, died).
+        """
+        p = self.params
+        path = self.current_path
+        n = min(len(path), max_steps)
+        if n == 0:
+            return 0, 0.0, 0, False
+
+        cells = np.array(list(islice(path, n)))
+        flat = cells[:, 0] * env.cols + cells[:, 1]
+        stops = np.isin(env.flat_grid[flat], ACTIVE_TILES) | ~env.passable.reshape(-1)[flat]
+        quiet = int(stops.argmax()) if stops.any() else n
+        # Lowest battery that keeps get_state()'s battery level (and the robot alive)
+        floor = 120 if self.battery >= 120 else 40 if self.battery >= 40 else 1
+        quiet = min(quiet, max(0, (self.battery - floor) // BATTERY_COST_MOVE))
+
+        reward, discounted, died = 0, 0.0, False
+        if quiet:
+            for _ in range(quiet):
+                path.popleft()
+            self.x, self.y = int(cells[quiet - 1, 0]), int(cells[quiet - 1, 1])
+            self.battery -= quiet * BATTERY_COST_MOVE
+            reward = quiet * p.reward_step
+            gamma = p.discount_factor
+            # Geometric sum of the step rewards; undiscounted when gamma is 1
+            discounted = p.reward_step * (quiet if gamma == 1 else (1 - gamma ** quiet) / (1 - gamma))
+
+        steps = quiet
+        if quiet < n:
+            r1, died = self.move_step(env)
+            r = r1 + self.interact(env)
+            reward += r
+            discounted += p.discount_factor ** quiet * r
+            steps += 1
+        return reward, discounted, steps, died
 
     # ---------------- PLAN NEW GOAL ----------------
     def plan(self, env, goal):
         if goal == GO_CLEAN:
-            targets = np.argwhere(env.grid == DIRT)
+            path = env.nearest_dirt_path((self.x, self.y), PLANNER)
         elif goal == GO_DUMP:
-            targets = env.bin_positions
+            # Bins and chargers are static: reuse the per-layout distance field
+            path = env.utility_path(BIN, (self.x, self.y))
         elif goal == GO_CHARGE:
-            targets = env.charger_positions
+            path = env.utility_path(CHARGER, (self.x, self.y))
         else:
             return False
 
-        if len(targets) == 0:
-            return False
-
-        path = bfs(env, (self.x, self.y), targets)
         if not path:
             return False
 
@@ -104,14 +266,14 @@ class VacuumAgent:
         reward = 0
 
         if env.grid[self.x][self.y] == DIRT and self.bin < MAX_BIN:
-            env.grid[self.x][self.y] = EMPTY
+            env.clean(self.x, self.y)
             self.bin += 1
             self.battery -= BATTERY_COST_CLEAN
-            reward += REWARD_CLEAN
+            reward += self.params.reward_clean
 
         elif env.grid[self.x][self.y] == BIN and self.bin > 0:
             self.bin = 0
-            reward += REWARD_DUMP
+            reward += self.params.reward_dump
 
         elif env.grid[self.x][self.y] == CHARGER and self.battery < MAX_BATTERY:
             self.battery = min(MAX_BATTERY, self.battery + 10)
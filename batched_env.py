@@ -0,0 +1,182 @@
+import numpy as np
+from config import *
+from environment import GridWorld, NUM_DIRT
+from bfs import wavefront
+
+MAX_STEPS = 1000
+
+# (dx, dy) in bfs.MOVES order
+DIRECTIONS = np.array([(-1, 0), (1, 0), (0, 1), (0, -1)])
+
+
+class BatchedGridWorld:
+    """N copies of the house stepped together with array operations.
+
+    Each env carries its own grid, robot position, battery and bin; the
+    layout (walls, furniture, utilities) is shared. step() takes one
+    high-level goal per env and applies the same plan / move_step /
+    interact rules as the single-env training loop in train.py.
+    """
+
+    def __init__(self, num_envs, size=GRID_SIZE, seed=None, layout=None):
+        self.num_envs = num_envs
+        self.rng = np.random.default_rng(seed)
+
+        # Build the static layout once with the regular environment
+        house = GridWorld(size=size, render_mode=False, layout=layout)
+        house.build_house()
+        self.rows = house.rows
+        self.cols = house.cols
+        self.template = house.layout.grid.astype(np.int8)
+        self.charger_positions = list(house.charger_positions)
+        self.bin_positions = list(house.bin_positions)
+        self.start_pos = self.charger_positions[0]
+
+        self.passable = house.passable
+        self.empty_cells = house.layout.empty_cells
+
+        # Utilities never move, so their distance fields come from the layout cache
+        self.static_fields = {
+            GO_DUMP: house.utility_field(BIN)[0],
+            GO_CHARGE: house.utility_field(CHARGER)[0],
+        }
+
+        n = num_envs
+        self.grid = np.empty((n, self.rows, self.cols), dtype=np.int8)
+        self.x = np.zeros(n, dtype=np.int64)
+        self.y = np.zeros(n, dtype=np.int64)
+        self.battery = np.zeros(n, dtype=np.int64)
+        self.bin = np.zeros(n, dtype=np.int64)
+        self.dirt_left = np.zeros(n, dtype=np.int64)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.current_goal = np.full(n, -1, dtype=np.int64)
+        # Distance field each env is currently descending (-1 = no plan)
+        self.path_field = np.full((n, self.rows, self.cols), -1, dtype=np.int32)
+
+    # ---------------- RESET ----------------
+    def reset(self, mask=None):
+        """Resets the selected envs (all by default) and returns all states."""
+        if mask is None:
+            mask = np.ones(self.num_envs, dtype=bool)
+        ids = np.flatnonzero(mask)
+        if len(ids) == 0:
+            return self.get_state()
+
+        self.grid[ids] = self.template
+
+        # Pick NUM_DIRT distinct empty cells per env in one shot
+        num_dirt = min(NUM_DIRT, len(self.empty_cells))
+        keys = self.rng.random((len(ids), len(self.empty_cells)))
+        picks = np.argpartition(keys, num_dirt - 1, axis=1)[:, :num_dirt]
+        cells = self.empty_cells[picks]
+        self.grid[ids[:, None], cells[..., 0], cells[..., 1]] = DIRT
+
+        self.x[ids], self.y[ids] = self.start_pos
+        self.battery[ids] = MAX_BATTERY
+        self.bin[ids] = 0
+        self.dirt_left[ids] = num_dirt
+        self.steps[ids] = 0
+        self.current_goal[ids] = -1
+        self.path_field[ids] = -1
+        return self.get_state()
+
+    # ---------------- HIGH-LEVEL STATE ----------------
+    def get_state(self):
+        """(N, 3) array of (batt, bin_stat, dirt_stat), as VacuumAgent.get_state."""
+        batt = np.where(self.battery < 40, 0, np.where(self.battery < 120, 1, 2))
+        bin_stat = (self.bin >= MAX_BIN).astype(np.int64)
+        dirt_stat = (self.dirt_left == 0).astype(np.int64)
+        return np.stack([batt, bin_stat, dirt_stat], axis=1)
+
+    # ---------------- PLAN NEW GOAL ----------------
+    def plan(self, ids, goals):
+        """Plans for envs `ids`; returns a bool array of successes."""
+        ok = np.zeros(len(ids), dtype=bool)
+        here = (self.x[ids], self.y[ids])
+
+        for goal in (GO_DUMP, GO_CHARGE):
+            sel = goals == goal
+            if sel.any():
+                field = self.static_fields[goal]
+                d = field[here[0][sel], here[1][sel]]
+                # find_path() returns [] when already on a target: that is a failure
+                good = d > 0
+                ok[sel] = good
+                self.path_field[ids[sel][good]] = field
+
+        sel = goals == GO_CLEAN
+        if sel.any():
+            sub = ids[sel]
+            starts = np.stack([self.x[sub], self.y[sub]], axis=1)
+            fields = wavefront(self.passable, self.grid[sub] == DIRT, stop_at=starts)
+            d = fields[np.arange(len(sub)), starts[:, 0], starts[:, 1]]
+            good = d > 0
+            ok[sel] = good
+            self.path_field[sub[good]] = fields[good]
+
+        return ok
+
+    # ---------------- STEP ----------------
+    def step(self, goals):
+        """Advances every env by one grid step.
+
+        Returns (next_states, rewards, dones); dones includes truncation at
+        MAX_STEPS. Finished envs are not reset automatically.
+        """
+        goals = np.asarray(goals, dtype=np.int64)
+        n = self.num_envs
+        rewards = np.zeros(n, dtype=np.int64)
+        dones = np.zeros(n, dtype=bool)
+        all_ids = np.arange(n)
+
+        # 1. Plan where the goal changed or the current path is exhausted
+        pos_dist = self.path_field[all_ids, self.x, self.y]
+        need = (self.current_goal != goals) | (pos_dist <= 0)
+        self.current_goal[need] = goals[need]
+        failed = np.zeros(n, dtype=bool)
+        ids = np.flatnonzero(need)
+        if len(ids):
+            failed[ids] = ~self.plan(ids, goals[ids])
+        rewards[failed] = REWARD_PLAN_FAIL
+
+        # 2. move_step: descend the distance field by one cell
+        pos_dist = self.path_field[all_ids, self.x, self.y]
+        movers = ~failed & (pos_dist > 0)
+        m = np.flatnonzero(movers)
+        if len(m):
+            nx = self.x[m, None] + DIRECTIONS[:, 0]
+            ny = self.y[m, None] + DIRECTIONS[:, 1]
+            inside = (nx >= 0) & (nx < self.rows) & (ny >= 0) & (ny < self.cols)
+            nd = self.path_field[m[:, None], nx.clip(0, self.rows - 1), ny.clip(0, self.cols - 1)]
+            downhill = inside & (nd == pos_dist[m, None] - 1)
+            choice = downhill.argmax(axis=1)
+            self.x[m] = nx[np.arange(len(m)), choice]
+            self.y[m] = ny[np.arange(len(m)), choice]
+            self.battery[m] -= BATTERY_COST_MOVE
+            died = self.battery[m] <= 0
+            rewards[m] = np.where(died, REWARD_DEATH, REWARD_STEP)
+            dones[m[died]] = True
+
+        # 3. interact (skipped for failed plans, as in train.py)
+        act = ~failed
+        tile = self.grid[all_ids, self.x, self.y]
+        clean = act & (tile == DIRT) & (self.bin < MAX_BIN)
+        dump = act & (tile == BIN) & (self.bin > 0)
+        charge = act & (tile == CHARGER) & (self.battery < MAX_BATTERY)
+
+        c = np.flatnonzero(clean)
+        self.grid[c, self.x[c], self.y[c]] = EMPTY
+        self.bin[c] += 1
+        self.battery[c] -= BATTERY_COST_CLEAN
+        self.dirt_left[c] -= 1
+        rewards[c] += REWARD_CLEAN
+
+        self.bin[dump] = 0
+        rewards[dump] += REWARD_DUMP
+
+        self.battery[charge] = np.minimum(MAX_BATTERY, self.battery[charge] + 10)
+        rewards[charge] += 5
+
+        self.steps += 1
+        dones |= self.steps >= MAX_STEPS
+        return self.get_state(), rewards, dones
@@ -0,0 +1,42 @@
+"""Cold-start import latency of the entry points, each in a fresh interpreter.
+
+Run from the repository root:  python benchmarks/bench_import.py
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Headless entry points must not pull in pygame; main is the GUI baseline
+ENTRY_POINTS = [
+    ("train", True),
+    ("parallel_train", True),
+    ("evaluate", True),
+    ("sweep", True),
+    ("vector_env", True),
+    ("main", False),
+]
+
+PROBE = (
+    "import sys, time; t0 = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t0, 'pygame' in sys.modules)"
+)
+
+
+def measure(module, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(module=module)],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+        best = min(best, float(out[-2]))
+    return best, out[-1] == "True"
+
+
+if __name__ == "__main__":
+    for module, headless in ENTRY_POINTS:
+        seconds, has_pygame = measure(module)
+        flag = "pygame loaded" if has_pygame else "numpy only"
+        print(f"  import {module:<16} {seconds * 1e3:8.1f} ms   ({flag})")
+        if headless and has_pygame:
+            sys.exit(f"{module} imported pygame")
@@ -0,0 +1,57 @@
+"""Training throughput of parallel_train with 1, 2 and 4 workers.
+
+Run from the repository root:  python benchmarks/bench_parallel.py [--episodes N] [--workers 1,2,4]
+
+Each run trains the same number of episodes from the same seed; env steps
+per second are counted from the per-episode records, so runs whose
+episodes differ in length still compare fairly. Scaling is only
+meaningful up to the number of physical cores.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parallel_train import train_parallel
+
+
+class StepCounter:
+    """Metrics sink that only adds up env steps."""
+
+    def __init__(self):
+        self.steps = 0
+
+    def write(self, record):
+        self.steps += record["steps"]
+
+    def close(self):
+        pass
+
+
+def run(workers, episodes, seed=0):
+    """(seconds, env steps) for one training run with `workers` processes."""
+    counter = StepCounter()
+    with tempfile.TemporaryDirectory() as tmp, redirect_stdout(None):
+        t0 = time.perf_counter()
+        train_parallel(workers, episodes, seed, [counter], policy_file=os.path.join(tmp, "brain.npy"))
+        elapsed = time.perf_counter() - t0
+    return elapsed, counter.steps
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--episodes", type=int, default=400)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    args = parser.parse_args()
+
+    print(f"{args.episodes} episodes, {os.cpu_count()} CPUs")
+    base = None
+    for workers in map(int, args.workers.split(",")):
+        elapsed, steps = run(workers, args.episodes)
+        rate = steps / elapsed
+        base = base or rate
+        print(f"  {workers} workers  {elapsed:7.2f} s  {rate:10,.0f} steps/s   x{rate / base:4.2f}")
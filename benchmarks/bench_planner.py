@@ -0,0 +1,105 @@
+"""Compares the original path-copying BFS with the planner.py engines on
+20x20 and 200x200 houses, and the engines with each other on a 500x500
+multi-room lattice.
+
+Run from the repository root:  python benchmarks/bench_planner.py
+"""
+import os
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from environment import GridWorld
+from planner import ENGINES, NavGrid
+from floorplan import room_lattice
+from config import *
+
+
+def best_of(fn, repeat, number):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / number)
+    return best
+
+
+def legacy_bfs(env, start, targets):
+    """The repository's first bfs(), kept as the baseline.
+
+    Every queue entry carries a copy of its whole path, so a query costs
+    O(L^2) in the path length on top of the cells it visits.
+    """
+    targets = set(tuple(t) for t in targets)
+    q = deque([(start, [])])
+    visited = set([start])
+
+    while q:
+        (x, y), path = q.popleft()
+        if (x, y) in targets:
+            return path
+
+        for dx, dy in ((-1, 0), (1, 0), (0, 1), (0, -1)):
+            nx, ny = x+dx, y+dy
+            if 0 <= nx < env.rows and 0 <= ny < env.cols:
+                if (nx, ny) not in visited and env.grid[nx][ny] not in OBSTACLES:
+                    visited.add((nx, ny))
+                    q.append(((nx, ny), path+[(nx, ny)]))
+    return []
+
+
+def run(size, number, verbose=True):
+    """Times every engine on one cross-house query; returns [(name, seconds)]."""
+    env = GridWorld(size=size, render_mode=False)
+    env.build_house()
+
+    # Bottom-right bedroom to the top-right charger: crosses the house
+    start = (size - 2, size - 2)
+    targets = [env.charger_positions[0]]
+
+    length = len(legacy_bfs(env, start, targets))
+    rows = [("legacy (path copy)", best_of(lambda: legacy_bfs(env, start, targets), 5, number))]
+    for name, engine in ENGINES.items():
+        assert len(engine(env.nav, start, targets)) == length
+        rows.append((name, best_of(lambda: engine(env.nav, start, targets), 5, number)))
+
+    if verbose:
+        base = rows[0][1]
+        print(f"\n{size}x{size} grid, path length {length}")
+        for name, t in rows:
+            print(f"  {name:<18} {t * 1e3:9.3f} ms   x{base / t:6.1f}")
+    return rows
+
+
+def run_rooms(size, number, verbose=True):
+    """Corner-to-corner query across a room lattice (the path-copying baseline is too slow here)."""
+    layout = room_lattice(size)
+    nav = NavGrid(~layout.obstacles)
+    start = (size - 2, size - 3)
+    targets = [layout.charger_positions[0]]
+
+    t0 = time.perf_counter()
+    length = len(ENGINES["hpa"](nav, start, targets))  # also builds the room graph
+    build = time.perf_counter() - t0
+
+    rows = []
+    for name, engine in ENGINES.items():
+        assert len(engine(nav, start, targets)) == length
+        rows.append((name, best_of(lambda: engine(nav, start, targets), 3, number)))
+
+    if verbose:
+        base = rows[0][1]
+        print(f"\n{size}x{size} room lattice, path length {length}, "
+              f"{len(nav.rooms.room_cells)} rooms (graph built in {build * 1e3:.0f} ms)")
+        for name, t in rows:
+            print(f"  {name:<18} {t * 1e3:9.3f} ms   x{base / t:6.1f}")
+    return rows
+
+
+if __name__ == "__main__":
+    run(20, 200)
+    run(200, 3)
+    run_rooms(500, 3)
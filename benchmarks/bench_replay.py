@@ -0,0 +1,86 @@
+"""Sample efficiency of train.py with and without experience replay.
+
+Run from the repository root:  python benchmarks/bench_replay.py [--episodes N] [--every K] [--seeds S]
+
+Both variants train from the same seeds for the same episodes. Every
+`--every` episodes the greedy policy so far plays evaluate.py's first
+`--houses` houses, and the table shows the mean evaluation reward (over
+training seeds and houses) against training env steps, plus the
+wall-clock cost of the whole run.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from environment import GridWorld
+from agent import VacuumAgent
+from config import *
+from evaluate import run_greedy_episode
+from train import run_episode
+
+REPLAY = 10000
+
+
+def greedy_reward(agent, houses):
+    """Mean reward of the agent's greedy policy over evaluate.py seeds 0..houses-1."""
+    env = GridWorld(render_mode=False)
+    player = VacuumAgent()
+    player.q_table = agent.q_table
+    player.epsilon = 0.0
+    state = random.getstate(), np.random.get_state()
+    rewards = [run_greedy_episode(env, player, s)["reward"] for s in range(houses)]
+    random.setstate(state[0])
+    np.random.set_state(state[1])
+    return float(np.mean(rewards))
+
+
+def learning_curve(replay, episodes, every, houses, seed):
+    """[(episode, env steps, greedy reward)] and seconds for one training run."""
+    random.seed(seed)
+    np.random.seed(seed)
+    env = GridWorld(render_mode=False, seed=seed)
+    agent = VacuumAgent(replay_capacity=replay)
+    curve = []
+    steps = 0
+    elapsed = 0.0
+    for ep in range(1, episodes + 1):
+        t0 = time.perf_counter()
+        steps += run_episode(env, agent, env.reset()).steps
+        if agent.epsilon > MIN_EPSILON:
+            agent.epsilon *= EPSILON_DECAY
+        elapsed += time.perf_counter() - t0
+        if ep % every == 0:
+            curve.append((ep, steps, greedy_reward(agent, houses)))
+    return curve, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--every", type=int, default=100, help="episodes between evaluations")
+    parser.add_argument("--houses", type=int, default=20, help="evaluation houses per point")
+    parser.add_argument("--seeds", type=int, default=3, help="training seeds to average over")
+    parser.add_argument("--replay", type=int, default=REPLAY, help="buffer size of the replay run")
+    args = parser.parse_args()
+
+    runs = {}
+    for name, replay in (("off", 0), (f"replay {args.replay}", args.replay)):
+        curves, seconds = [], 0.0
+        for seed in range(args.seeds):
+            curve, elapsed = learning_curve(replay, args.episodes, args.every, args.houses, seed)
+            curves.append(curve)
+            seconds += elapsed
+        runs[name] = (np.array(curves).mean(axis=0), seconds / args.seeds)
+
+    names = list(runs)
+    print(f"greedy reward on {args.houses} houses, mean of {args.seeds} training seeds")
+    print(f"  {'episode':>7}" + "".join(f"  {name:>23}" for name in names))
+    for i in range(args.episodes // args.every):
+        row = "".join(f"  {runs[n][0][i, 2]:9.1f} @ {runs[n][0][i, 1]:8,.0f} st" for n in names)
+        print(f"  {int(runs[names[0]][0][i, 0]):>7}{row}")
+    print("  train s " + "".join(f"  {runs[n][1]:>23.1f}" for n in names))
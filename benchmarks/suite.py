@@ -0,0 +1,201 @@
+"""Hot-path benchmark suite with JSON output for run-over-run comparison.
+
+Run from the repository root:
+    python benchmarks/suite.py                          # writes benchmarks/results/<timestamp>.json
+    python benchmarks/suite.py --compare old.json       # exit 1 if anything regressed
+
+Every benchmark reseeds `random` and numpy first, so the houses, dirt and
+exploration are identical between runs of the same code.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+from environment import GridWorld
+from agent import VacuumAgent, STATE_SHAPE, NUM_GOALS
+from planner import bfs_path
+from config import *
+import train
+from bench_planner import best_of, run as run_planner, run_rooms
+
+SEED = 1234
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# Allowed slowdown before --compare flags a metric
+REGRESSION_TOLERANCE = 0.15
+
+
+def seed_everything(seed=SEED):
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def metric(value, unit, higher_is_better):
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+# ---------------- ENVIRONMENT ----------------
+def bench_reset():
+    seed_everything()
+    env = GridWorld(render_mode=False, seed=SEED)
+    t = best_of(env.reset, 5, 200)
+    return {"env.reset": metric(t * 1e6, "us/call", False)}
+
+
+def bench_sensors_and_state():
+    seed_everything()
+    env = GridWorld(render_mode=False, seed=SEED)
+    env.reset()
+    agent = VacuumAgent()
+    agent.x, agent.y = env.charger_positions[0]
+    sensors = best_of(lambda: env.get_sensors(agent.x, agent.y), 5, 5000)
+    state = best_of(lambda: agent.get_state(env), 5, 5000)
+    return {
+        "env.get_sensors": metric(sensors * 1e6, "us/call", False),
+        "agent.get_state": metric(state * 1e6, "us/call", False),
+    }
+
+
+# ---------------- PLANNING ----------------
+def bench_bfs():
+    seed_everything()
+    env = GridWorld(render_mode=False, seed=SEED)
+    env.build_house()
+    charger = env.charger_positions[0]
+    short_start = (charger[0] + 2, charger[1])
+    long_start = (env.rows - 2, env.cols - 2)
+    short = best_of(lambda: bfs_path(env.nav, short_start, [charger]), 5, 2000)
+    long = best_of(lambda: bfs_path(env.nav, long_start, [charger]), 5, 200)
+    results = {
+        "bfs.short": metric(short * 1e6, "us/call", False),
+        "bfs.long": metric(long * 1e6, "us/call", False),
+    }
+    for size, number in ((20, 200), (200, 3)):
+        for name, t in run_planner(size, number, verbose=False):
+            key = "legacy" if "legacy" in name else name
+            results[f"planner.{key}.{size}x{size}"] = metric(t * 1e3, "ms/call", False)
+    for name, t in run_rooms(250, 3, verbose=False):
+        results[f"planner.{name}.rooms250"] = metric(t * 1e3, "ms/call", False)
+    return results
+
+
+# ---------------- TRAINING ----------------
+def bench_train(episodes=20):
+    seed_everything()
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        steps = train.train(max_episodes=episodes, policy_file=os.path.join(tmp, "brain.npy"), seed=SEED,
+                            checkpoint_every=0)
+        elapsed = time.perf_counter() - t0
+    return {"train.steps_per_sec": metric(steps / elapsed, "steps/s", True)}
+
+
+# ---------------- FLEET ----------------
+def bench_fleet(steps=300):
+    """Per-robot step cost should stay flat as the fleet grows."""
+    from contextlib import redirect_stdout
+    from floorplan import room_lattice
+    from fleet import FleetSimulation, make_fleet
+    from qtable import QTable
+
+    q = QTable(STATE_SHAPE, NUM_GOALS)
+    layout = room_lattice(60)
+    results = {}
+    for count in (1, 8, 32):
+        seed_everything()
+        with redirect_stdout(None):
+            sim = FleetSimulation(GridWorld(layout=layout, seed=SEED), make_fleet(count, q))
+            t0 = time.perf_counter()
+            sim.advance(steps)
+            elapsed = time.perf_counter() - t0
+        results[f"fleet.robot_step.{count}"] = metric(elapsed / (steps * count) * 1e6, "us/call", False)
+    return results
+
+
+# ---------------- RENDERING ----------------
+def bench_draw(frames=300):
+    seed_everything()
+    env = GridWorld(render_mode=True, seed=SEED)
+    env.reset()
+    agent = VacuumAgent()
+    agent.x, agent.y = env.charger_positions[0]
+    env.draw(agent)
+
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        if not agent.current_path:
+            agent.plan(env, 0)
+        agent.move_step(env)
+        agent.interact(env)
+        env.draw(agent)
+    fps = frames / (time.perf_counter() - t0)
+    return {"draw.fps": metric(fps, "frames/s", True)}
+
+
+BENCHMARKS = [bench_reset, bench_sensors_and_state, bench_bfs, bench_train, bench_fleet, bench_draw]
+
+
+def run_suite():
+    results = {}
+    for bench in BENCHMARKS:
+        print(f"running {bench.__name__}...", flush=True)
+        results.update(bench())
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": SEED,
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance=REGRESSION_TOLERANCE):
+    """Prints per-metric change vs. a baseline; returns the regressed metric names."""
+    regressions = []
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        ratio = new["value"] / old["value"] if old["value"] else float("inf")
+        # Normalise so that >1 always means "better"
+        gain = ratio if new["higher_is_better"] else 1 / ratio
+        flag = ""
+        if gain < 1 - tolerance:
+            regressions.append(name)
+            flag = "  <-- REGRESSION"
+        print(f"  {name:<28} {old['value']:12.3f} -> {new['value']:12.3f} {new['unit']:<9} x{gain:5.2f}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", help="result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="baseline result file to compare against")
+    args = parser.parse_args()
+
+    report = run_suite()
+    out = args.out or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {out}")
+
+    for name, m in report["results"].items():
+        print(f"  {name:<28} {m['value']:12.3f} {m['unit']}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.compare}:")
+        if compare(report, baseline):
+            sys.exit(1)
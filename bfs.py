@@ -1,20 +1,79 @@
-from collections import deque
+import numpy as np
 from config import *
 
-def bfs(env, start, targets):
-    targets = set(tuple(t) for t in targets)
-    q = deque([(start, [])])
-    visited = set([start])
-
-    while q:
-        (x, y), path = q.popleft()
-        if (x, y) in targets:
-            return path
-
-        for dx, dy in [(-1,0),(1,0),(0,1),(0,-1)]:
-            nx, ny = x+dx, y+dy
-            if 0 <= nx < env.rows and 0 <= ny < env.cols:
-                if (nx, ny) not in visited and env.grid[nx][ny] not in OBSTACLES:
-                    visited.add((nx, ny))
-                    q.append(((nx, ny), path+[(nx, ny)]))
-    return []
+MOVES = [(-1, 0), (1, 0), (0, 1), (0, -1)]
+
+
+def wavefront(passable, sources, stop_at=None):
+    """Multi-source BFS distances for a stack of grids.
+
+    passable: (rows, cols) bool, shared by every grid in the stack.
+    sources:  (K, rows, cols) bool, the targets of each grid.
+    stop_at:  optional (K, 2) cells; expansion stops once all are labelled.
+
+    Returns (K, rows, cols) int32 with -1 for unreached cells.
+    """
+    k, rows, cols = sources.shape
+    dist = np.full((k, rows + 2, cols + 2), -1, dtype=np.int32)
+    inner = dist[:, 1:-1, 1:-1]
+    inner[sources] = 0
+
+    open_cells = np.zeros((rows + 2, cols + 2), dtype=bool)
+    open_cells[1:-1, 1:-1] = passable
+    frontier = np.zeros((k, rows + 2, cols + 2), dtype=bool)
+    frontier[:, 1:-1, 1:-1] = sources
+
+    if stop_at is not None:
+        idx = np.arange(k)
+        sx, sy = stop_at[:, 0], stop_at[:, 1]
+
+    d = 0
+    while frontier.any():
+        if stop_at is not None and (inner[idx, sx, sy] >= 0).all():
+            break
+        d += 1
+        grown = np.zeros_like(frontier)
+        grown[:, 1:, :] |= frontier[:, :-1, :]
+        grown[:, :-1, :] |= frontier[:, 1:, :]
+        grown[:, :, 1:] |= frontier[:, :, :-1]
+        grown[:, :, :-1] |= frontier[:, :, 1:]
+        grown &= open_cells
+        grown &= dist < 0
+        dist[grown] = d
+        frontier = grown
+
+    return inner.copy()
+
+
+def next_hops(dist):
+    """For each cell, the flat index of a neighbour one step closer (-1 if none).
+
+    Neighbours are tried in MOVES order, so ties between equally short
+    routes always break the same way.
+    """
+    rows, cols = dist.shape
+    padded = np.full((rows + 2, cols + 2), -2, dtype=np.int32)
+    padded[1:-1, 1:-1] = dist
+    flat = np.arange(rows * cols).reshape(rows, cols)
+
+    hops = np.full((rows, cols), -1, dtype=np.int64)
+    for dx, dy in reversed(MOVES):
+        nb = padded[1 + dx:rows + 1 + dx, 1 + dy:cols + 1 + dy]
+        downhill = (dist > 0) & (nb == dist - 1)
+        hops[downhill] = (flat + dx * cols + dy)[downhill]
+    return hops
+
+
+def follow(hops, dist, start):
+    """Walks a next-hop field from start; returns the path like planner.find_path() does."""
+    cols = hops.shape[1]
+    x, y = start
+    if dist[x, y] <= 0:
+        return []
+    path = []
+    i = hops[x, y]
+    while i >= 0:
+        cell = (int(i // cols), int(i % cols))
+        path.append(cell)
+        i = hops[cell]
+    return path
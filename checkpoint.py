@@ -0,0 +1,129 @@
+import json
+import os
+import random
+import numpy as np
+from qtable import QTable
+from replay import ReplayBuffer
+
+CHECKPOINT_FILE = "checkpoint.npz"
+CHECKPOINT_VERSION = 1
+
+
+def _windows(stopper, metrics):
+    """Rolling windows whose contents must survive a resume, by stable name."""
+    return {
+        "stopper.recent": stopper.recent,
+        "metrics.reward": metrics.reward,
+        "metrics.steps": metrics.steps,
+        "metrics.deaths": metrics.deaths,
+        "metrics.plan_failures": metrics.plan_failures,
+    }
+
+
+def _window_state(window):
+    return {"count": window.count, "total": window.total}, window.values
+
+
+def _restore_window(window, meta, values):
+    window.count = meta["count"]
+    window.total = meta["total"]
+    window.values[:] = values
+
+
+def _replay_state(buffer):
+    meta = {"capacity": buffer.capacity, "head": buffer.head, "size": buffer.size}
+    arrays = {
+        "replay:data": buffer.data,
+        "replay:counts": buffer.counts,
+        "replay:visits": buffer.visits,
+        "replay:reward_sum": buffer.reward_sum,
+    }
+    return meta, arrays
+
+
+def _restore_replay(agent, meta, data):
+    agent.replay_capacity = meta["capacity"]
+    buffer = agent.replay = ReplayBuffer(meta["capacity"], agent.q_table.values.shape[0], agent.q_table.num_actions)
+    buffer.head = meta["head"]
+    buffer.size = meta["size"]
+    buffer.data[:] = data["replay:data"]
+    buffer.counts[:] = data["replay:counts"]
+    buffer.visits[:] = data["replay:visits"]
+    buffer.reward_sum[:] = data["replay:reward_sum"]
+
+
+def save_checkpoint(path, agent, episode, total_steps, stopper, metrics, env):
+    """Writes everything train() needs to continue exactly where it stopped.
+
+    `episode` is the next episode to run. The file is written to a temp
+    name and renamed, so a crash mid-write leaves the previous checkpoint.
+    """
+    py_version, py_state, py_gauss = random.getstate()
+    np_name, np_keys, np_pos, np_has_gauss, np_gauss = np.random.get_state()
+
+    arrays = {}
+    window_meta = {}
+    for name, window in _windows(stopper, metrics).items():
+        window_meta[name], arrays[f"window:{name}"] = _window_state(window)
+    replay_meta = None
+    if agent.replay is not None:
+        replay_meta, replay_arrays = _replay_state(agent.replay)
+        arrays.update(replay_arrays)
+
+    meta = {
+        "version": CHECKPOINT_VERSION,
+        "episode": episode,
+        "total_steps": total_steps,
+        "epsilon": agent.epsilon,
+        "best_avg": stopper.best_avg,
+        "stagnation_counter": stopper.stagnation_counter,
+        "windows": window_meta,
+        "py_rng": {"version": py_version, "gauss": py_gauss},
+        "np_rng": {"name": np_name, "pos": int(np_pos), "has_gauss": int(np_has_gauss), "gauss": float(np_gauss)},
+        "q_shape": list(agent.q_table.shape),
+        "replay": replay_meta,
+        "replay_steps": agent.replay_steps,
+        "env_rng": env.rng.bit_generator.state,
+    }
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(
+            f,
+            meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+            q_values=agent.q_table.values,
+            q_seen=agent.q_table.seen,
+            py_rng_state=np.array(py_state, dtype=np.uint64),
+            np_rng_keys=np_keys,
+            **arrays,
+        )
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path, agent, stopper, metrics, env):
+    """Restores a save_checkpoint() file in place; returns (episode, total_steps)."""
+    with np.load(path) as data:
+        meta = json.loads(data["meta"].tobytes().decode())
+        if meta["version"] != CHECKPOINT_VERSION:
+            raise ValueError(f"{path}: checkpoint v{meta['version']}, expected v{CHECKPOINT_VERSION}")
+
+        values = data["q_values"]
+        agent.q_table = QTable(meta["q_shape"], values.shape[1], values.copy(), data["q_seen"].copy())
+        agent.epsilon = meta["epsilon"]
+        agent.replay_steps = meta["replay_steps"]
+        # "replay" is None when the run had no buffer (yet)
+        if meta["replay"] is not None:
+            _restore_replay(agent, meta["replay"], data)
+
+        stopper.best_avg = meta["best_avg"]
+        stopper.stagnation_counter = meta["stagnation_counter"]
+        for name, window in _windows(stopper, metrics).items():
+            _restore_window(window, meta["windows"][name], data[f"window:{name}"])
+
+        py = meta["py_rng"]
+        random.setstate((py["version"], tuple(int(v) for v in data["py_rng_state"]), py["gauss"]))
+        rng = meta["np_rng"]
+        np.random.set_state((rng["name"], data["np_rng_keys"], rng["pos"], rng["has_gauss"], rng["gauss"]))
+        env.rng.bit_generator.state = meta["env_rng"]
+
+    return meta["episode"], meta["total_steps"]
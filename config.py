@@ -25,15 +25,34 @@ MAX_BIN = 20
 BATTERY_COST_MOVE = 1
 BATTERY_COST_CLEAN = 3
 
+# --- High-Level Goals (the actions the Q-table chooses between) ---
+GO_CLEAN = 0
+GO_DUMP = 1
+GO_CHARGE = 2
+IDLE = 3
+
 # --- Rewards ---
 REWARD_CLEAN = 40
 REWARD_DUMP = 120
 REWARD_CHARGE = 40
 REWARD_STEP = -1
 REWARD_WALL = -10
+REWARD_PLAN_FAIL = -10  # goal with no reachable target; the robot stays put
 REWARD_REVISIT = -25
 REWARD_DEATH = -500
 
+# --- Path Planning ---
+# Engine used for dirt targets: "bfs", "astar", "jps" or "hpa" (see planner.py);
+# "hpa" plans over the room graph and pays off on large multi-room layouts.
+# "astar"/"jps" only help with a few targets; with a wall across the straight
+# line A* expands as much as BFS and is slower (benchmarks/bench_planner.py)
+PLANNER = "bfs"
+
+# --- Viewer Loop (main.py) ---
+RENDER_FPS = 50
+# Sim steps per rendered frame that TAB cycles through; 0 = as many as fit in a frame
+TURBO_MODES = (1, 10, 100, 0)
+
 # --- Hyperparameters ---
 LEARNING_RATE = 0.15
 DISCOUNT_FACTOR = 0.9
@@ -41,6 +60,18 @@ EPSILON = 1.0
 EPSILON_DECAY = 0.999
 MIN_EPSILON = 0.05
 
+# --- Experience Replay (replay.py) ---
+# Transitions kept for replay; 0 (the default) leaves it off, one Q-update per
+# env step. train.py --replay N turns it on (benchmarks/bench_replay.py compares)
+REPLAY_CAPACITY = 0
+# Env steps (or batched steps) between prioritized sweeps
+REPLAY_EVERY = 10
+# Update passes per sweep, and state-action pairs updated per pass (largest |TD| first)
+REPLAY_SWEEPS = 4
+REPLAY_PAIRS = 8
+# Pairs whose expected |TD error| is below this are left alone
+REPLAY_MIN_PRIORITY = 0.01
+
 # --- Colors ---
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
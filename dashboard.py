@@ -0,0 +1,198 @@
+"""Dashboard widgets for main.py (sidebar, bars, start menu). Requires pygame."""
+import sys
+from functools import lru_cache
+import pygame
+from config import *
+
+# --- CONFIGURATION ---
+SIDEBAR_WIDTH = 260
+WINDOW_WIDTH = SCREEN_WIDTH + SIDEBAR_WIDTH
+WINDOW_HEIGHT = SCREEN_HEIGHT
+
+# --- COLORS ---
+DARK_BG = (20, 25, 30)
+PANEL_BG = (15, 18, 23)
+NEON_BLUE = (0, 200, 255)
+NEON_RED = (255, 60, 90)
+NEON_GREEN = (50, 255, 120)
+NEON_YELLOW = (255, 220, 50)
+WHITE = (240, 240, 250)
+GRAY_TEXT = (150, 160, 170)
+BORDER_COLOR = (40, 50, 60)
+
+
+# --- FONT / GLYPH CACHE ---
+@lru_cache(maxsize=None)
+def get_font(name, size, bold=False):
+    """SysFont lookups scan the system font list, so each font is built once."""
+    return pygame.font.SysFont(name, size, bold=bold)
+
+
+@lru_cache(maxsize=1024)
+def render_text(text, name, size, color, bold=False):
+    """Rendered text surfaces, reused while the label and colour stay the same."""
+    return get_font(name, size, bold).render(text, True, color)
+
+
+# --- HELPER FUNCTIONS ---
+def draw_text_centered(surface, text, font, color, center_x, center_y):
+    text_obj = font.render(text, True, color)
+    text_rect = text_obj.get_rect(center=(center_x, center_y))
+    surface.blit(text_obj, text_rect)
+
+
+def draw_bar(surface, x, y, width, height, current, max_val, color, label):
+    """Draws a vertical progress bar."""
+    pygame.draw.rect(surface, (10, 10, 15), (x, y, width, height), border_radius=4)
+    if max_val == 0: max_val = 1
+    pct = max(0, min(1, current / max_val))
+    fill_h = int(height * pct)
+    fill_rect = pygame.Rect(x, y + height - fill_h, width, fill_h)
+    pygame.draw.rect(surface, color, fill_rect, border_radius=4)
+    pygame.draw.rect(surface, (60, 70, 80), (x, y, width, height), 1, border_radius=4)
+    lbl = render_text(label, 'Consolas', 12, GRAY_TEXT, bold=True)
+    surface.blit(lbl, (x + (width - lbl.get_width()) // 2, y + height + 8))
+    val = render_text(f"{int(pct * 100)}%", 'Arial', 12, WHITE, bold=True)
+    surface.blit(val, (x + (width - val.get_width()) // 2, y - 18))
+
+
+def agent_status(agent):
+    """(label, colour) for the robot's current operation."""
+    goals = {0: "CLEANING", 1: "DUMPING", 2: "CHARGING", 3: "IDLE"}
+    status = goals.get(agent.current_goal, "WAIT")
+    if not agent.is_alive: status = "OFFLINE"
+    status_color = NEON_GREEN if status == "CLEANING" else NEON_YELLOW
+    if status == "DUMPING": status_color = NEON_RED
+    if status == "OFFLINE": status_color = GRAY_TEXT
+    return status, status_color
+
+
+def draw_sidebar(surface, agent, episode_num, perf=None):
+    """Draws the left control panel; with a metrics.LiveStats the feed shows its counters."""
+    # Background
+    sidebar_rect = pygame.Rect(0, 0, SIDEBAR_WIDTH, SCREEN_HEIGHT)
+    pygame.draw.rect(surface, PANEL_BG, sidebar_rect)
+    pygame.draw.line(surface, NEON_BLUE, (SIDEBAR_WIDTH - 2, 0), (SIDEBAR_WIDTH - 2, SCREEN_HEIGHT), 2)
+
+    # Header
+    head = ('Arial', 20)
+    sub = ('Consolas', 14)
+    surface.blit(render_text("SYS MONITOR", *head, NEON_BLUE, bold=True), (20, 30))
+    surface.blit(render_text(f"RUN CYCLE: #{episode_num}", *sub, WHITE), (20, 60))
+    pygame.draw.line(surface, BORDER_COLOR, (20, 85), (SIDEBAR_WIDTH - 20, 85), 1)
+
+    # Status Box
+    status, status_color = agent_status(agent)
+    pygame.draw.rect(surface, (30, 35, 40), (20, 110, SIDEBAR_WIDTH - 40, 50), border_radius=5)
+    pygame.draw.rect(surface, status_color, (20, 110, SIDEBAR_WIDTH - 40, 50), 2, border_radius=5)
+    lbl = render_text("CURRENT OP:", *sub, GRAY_TEXT)
+    val = render_text(status, *head, status_color, bold=True)
+    surface.blit(lbl, (30, 118))
+    surface.blit(val, (30, 135))
+
+    # Bars
+    bar_y = 220;
+    bar_h = 200;
+    bar_w = 40;
+    gap = 40
+    batt_color = NEON_GREEN
+    if agent.battery < 150: batt_color = NEON_YELLOW
+    if agent.battery < 50: batt_color = NEON_RED
+    draw_bar(surface, 50, bar_y, bar_w, bar_h, agent.battery, MAX_BATTERY, batt_color, "PWR")
+    bin_color = NEON_BLUE
+    if agent.bin >= MAX_BIN * 0.8: bin_color = NEON_RED
+    draw_bar(surface, 50 + bar_w + gap, bar_y, bar_w, bar_h, agent.bin, MAX_BIN, bin_color, "BIN")
+
+    # Sensor Feed
+    pygame.draw.line(surface, BORDER_COLOR, (20, 480), (SIDEBAR_WIDTH - 20, 480), 1)
+    surface.blit(render_text("SENSOR FEED:", *sub, GRAY_TEXT), (20, 500))
+    if perf is None:
+        surface.blit(render_text(">> LIDAR OK", *sub, NEON_GREEN), (20, 525))
+        surface.blit(render_text(">> NAV MESH OK", *sub, NEON_GREEN), (20, 545))
+        return
+    color = NEON_GREEN if perf.fps() >= 0.9 * RENDER_FPS else NEON_YELLOW
+    for i, line in enumerate(perf.lines()):
+        surface.blit(render_text(line, *sub, color), (20, 525 + 20 * i))
+
+
+def draw_mini_bar(surface, x, y, width, current, max_val, color):
+    """Horizontal 6px gauge used in the fleet list."""
+    pct = max(0, min(1, current / max(max_val, 1)))
+    pygame.draw.rect(surface, (10, 10, 15), (x, y, width, 6), border_radius=2)
+    pygame.draw.rect(surface, color, (x, y, int(width * pct), 6), border_radius=2)
+
+
+def draw_fleet_sidebar(surface, robots, episode_num):
+    """Left panel for a fleet: one row per robot with its op, power and bin."""
+    sidebar_rect = pygame.Rect(0, 0, SIDEBAR_WIDTH, SCREEN_HEIGHT)
+    pygame.draw.rect(surface, PANEL_BG, sidebar_rect)
+    pygame.draw.line(surface, NEON_BLUE, (SIDEBAR_WIDTH - 2, 0), (SIDEBAR_WIDTH - 2, SCREEN_HEIGHT), 2)
+
+    head = ('Arial', 20)
+    sub = ('Consolas', 14)
+    small = ('Consolas', 12)
+    alive = sum(1 for r in robots if r.is_alive)
+    surface.blit(render_text("FLEET MONITOR", *head, NEON_BLUE, bold=True), (20, 30))
+    surface.blit(render_text(f"RUN CYCLE: #{episode_num}", *sub, WHITE), (20, 60))
+    surface.blit(render_text(f"ONLINE: {alive}/{len(robots)}", *sub, WHITE), (20, 80))
+    pygame.draw.line(surface, BORDER_COLOR, (20, 105), (SIDEBAR_WIDTH - 20, 105), 1)
+
+    row_h = 34
+    top = 115
+    fits = (SCREEN_HEIGHT - top - 30) // row_h
+    shown = robots if len(robots) <= fits else robots[:fits - 1]
+    for i, robot in enumerate(shown):
+        y = top + i * row_h
+        status, color = agent_status(robot)
+        if robot.is_alive and robot.waits:
+            status = "WAITING"
+        surface.blit(render_text(f"#{robot.id:<2}", *sub, GRAY_TEXT), (20, y))
+        surface.blit(render_text(status, *sub, color, bold=True), (60, y))
+        surface.blit(render_text(f"{robot.bin:>2}/{MAX_BIN}", *small, GRAY_TEXT), (SIDEBAR_WIDTH - 60, y + 1))
+        batt_color = NEON_GREEN
+        if robot.battery < 150: batt_color = NEON_YELLOW
+        if robot.battery < 50: batt_color = NEON_RED
+        draw_mini_bar(surface, 60, y + 19, 100, robot.battery, MAX_BATTERY, batt_color)
+        draw_mini_bar(surface, 170, y + 19, 50, robot.bin, MAX_BIN, NEON_BLUE)
+    if len(shown) < len(robots):
+        more = render_text(f"+{len(robots) - len(shown)} more", *sub, GRAY_TEXT)
+        surface.blit(more, (20, top + len(shown) * row_h))
+
+
+def show_menu(screen):
+    running = True
+    clock = pygame.time.Clock()
+    title_font = get_font('Arial', 50, bold=True)
+    sub_font = get_font('Consolas', 16)
+    btn_font = get_font('Arial', 22, bold=True)
+
+    while running:
+        screen.fill(DARK_BG)
+        for i in range(0, WINDOW_WIDTH, 40):
+            pygame.draw.line(screen, (30, 35, 40), (i, 0), (i, WINDOW_HEIGHT), 1)
+
+        mouse_pos = pygame.mouse.get_pos()
+        draw_text_centered(screen, "VACUUM AI SIMULATOR", title_font, NEON_BLUE, WINDOW_WIDTH // 2, 120)
+        draw_text_centered(screen, "Autonomous Cleaning Agent v2.5", sub_font, GRAY_TEXT, WINDOW_WIDTH // 2, 170)
+
+        btn_rect = pygame.Rect(WINDOW_WIDTH // 2 - 120, WINDOW_HEIGHT // 2, 240, 60)
+        is_hover = btn_rect.collidepoint(mouse_pos)
+
+        if is_hover:
+            pygame.draw.rect(screen, NEON_BLUE, btn_rect, border_radius=8)
+            pygame.draw.rect(screen, WHITE, btn_rect, 3, border_radius=8)
+            btn_text_color = DARK_BG
+        else:
+            pygame.draw.rect(screen, PANEL_BG, btn_rect, border_radius=8)
+            pygame.draw.rect(screen, NEON_BLUE, btn_rect, 2, border_radius=8)
+            btn_text_color = NEON_BLUE
+
+        draw_text_centered(screen, "INITIALIZE SYSTEM", btn_font, btn_text_color, btn_rect.centerx, btn_rect.centery)
+        draw_text_centered(screen, "Press SPACE to Start", sub_font, GRAY_TEXT, WINDOW_WIDTH // 2, WINDOW_HEIGHT - 60)
+        pygame.display.flip()
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT: pygame.quit(); sys.exit()
+            if event.type == pygame.MOUSEBUTTONDOWN and is_hover: running = False
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE: running = False
+        clock.tick(60)
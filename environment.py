@@ -1,16 +1,24 @@
-import pygame
 import numpy as np
-import random
-import os
 from config import *
+from bfs import MOVES, wavefront, next_hops, follow
+from planner import NavGrid, find_path
+from floorplan import resolve_layout
+
+# Dirt scattered by reset(), and the per-step chance and placement tries of a new spill
+NUM_DIRT = 40
+DIRT_SPAWN_CHANCE = 0.01
+DIRT_SPAWN_TRIES = 10
 
 
 class GridWorld:
-    def __init__(self, size=GRID_SIZE, render_mode=False):
-        self.rows = size
-        self.cols = size
+    def __init__(self, size=GRID_SIZE, render_mode=False, layout=None, seed=None):
+        # A layout file sets its own size; `size` only scales the built-in house
+        self.layout = resolve_layout(layout, size)
+        self.rows = self.layout.rows
+        self.cols = self.layout.cols
         self.render_mode = render_mode
-        self.grid = np.zeros((self.rows, self.cols), dtype=int)
+        self.grid = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        self.flat_grid = self.grid.reshape(-1)  # view: cell (r, c) is r * cols + c
 
         # Positions Lists (for dual utilities)
         self.charger_positions = []
@@ -20,177 +28,208 @@ class GridWorld:
         self.charger_pos = (0, 0)
         self.bin_pos = (0, 0)
 
+        # Static planning data, rebuilt only when the layout changes:
+        # passable mask, NavGrid and per-cell neighbour table
+        self.passable = None
+        self.nav = None
+        self.neighbors = None
+        self.empty_flat = None  # flat cells dirt may land on; the layout's until set_tile() changes one
+        self._layout_key = None
+        self._fields = {}
+
+        # Live dirt index: count plus the set of dirty cells.
+        # dirt_version changes whenever dirt appears or is cleaned, so
+        # planners can cache anything derived from the dirt layout.
+        self.dirt_count = 0
+        self.dirt_cells = set()
+        self.dirt_version = 0
+
+        # All of the house's randomness (dirt placement and spills) comes
+        # from this generator, so an episode depends only on its seed
+        self.rng = None
+        self._spawn_in = 0  # random_dirt_spawn() calls until the next spill
+        self.seed(seed)
+
+        # pygame is only imported when a window is wanted, so training and
+        # evaluation workers stay numpy-only
+        self.renderer = None
         if self.render_mode:
-            pygame.init()
-            self.width = self.cols * CELL_SIZE
-            self.height = self.rows * CELL_SIZE + 60
-            self.screen = pygame.display.set_mode((self.width, self.height))
-            pygame.display.set_caption("Vacuum AI - Sensible House Layout")
-            self.font = pygame.font.SysFont('Arial', 18, bold=True)
-            self.assets = {}
-            self.load_assets()
-
-    def load_assets(self):
-        def load_img(filename):
-            path = os.path.join("assets", filename)
-            if not os.path.exists(path): return None
-            img = pygame.image.load(path).convert_alpha()
-            return pygame.transform.scale(img, (CELL_SIZE, CELL_SIZE))
-
-        self.assets['floor'] = load_img("floor.png")
-        self.assets['robot'] = load_img("robot.png")
-        self.assets[DIRT] = load_img("dirts.png")
-        self.assets[CHARGER] = load_img("charger.png")
-        self.assets[BIN] = load_img("bin.png")
-        self.assets[WALL] = load_img("wall.png")
-        self.assets[WALL_UP] = load_img("wall_up.png")
-        self.assets[WALL_DOWN] = load_img("wall_down.png")
-        self.assets[SOFA_1] = load_img("sofa1.png")
-        self.assets[SOFA_2] = load_img("sofa2.png")
-        self.assets[CHAIR_UP] = load_img("chair_up.png")
-        self.assets[CHAIR_DOWN] = load_img("chair_down.png")
-        self.assets[TABLE] = load_img("table.png")
-        self.assets[BED] = load_img("bed.png")
-
-    def reset(self):
-        """Generates Sensible House with Dual Utilities."""
-        self.grid.fill(EMPTY)
-        self.charger_positions = []
-        self.bin_positions = []
+            from renderer import GridRenderer
+            self.renderer = GridRenderer(self)
+
+    def seed(self, seed=None):
+        """Restarts the environment's generator; None draws fresh OS entropy."""
+        self.rng = np.random.default_rng(seed)
 
-        # --- 1. OUTER SHELL ---
-        self.grid[0, :] = WALL_UP
-        self.grid[self.rows - 1, :] = WALL_DOWN
-        self.grid[:, 0] = WALL
-        self.grid[:, self.cols - 1] = WALL
-        self.grid[0, 0] = WALL
-        self.grid[0, self.cols - 1] = WALL
-        self.grid[self.rows - 1, 0] = WALL
-        self.grid[self.rows - 1, self.cols - 1] = WALL
-
-        # --- 2. WALLS ---
-        for r in range(1, 15): self.grid[r][7] = WALL
-        for c in range(1, 7): self.grid[7][c] = WALL
-        for c in range(1, 7): self.grid[14][c] = WALL
-        for r in range(14, self.rows - 1): self.grid[r][14] = WALL
-        for c in range(14, self.cols - 1): self.grid[14][c] = WALL
-
-        # --- 3. DOORS ---
-        self.grid[3][7] = EMPTY
-        self.grid[10][7] = EMPTY
-        self.grid[17][7] = EMPTY
-        self.grid[17][14] = EMPTY
-
-        # --- 4. FURNITURE ---
-        self.grid[2][2] = BED;
-        self.grid[2][5] = TABLE
-        self.grid[9][2] = BED;
-        self.grid[9][5] = CHAIR_UP
-        self.grid[16][2] = BED;
-        self.grid[18][5] = TABLE
-        self.grid[3][12] = SOFA_1;
-        self.grid[3][13] = SOFA_1
-        self.grid[5][12] = TABLE;
-        self.grid[5][13] = TABLE
-        self.grid[8][17] = SOFA_2
-        self.grid[10][12] = TABLE;
-        self.grid[10][13] = TABLE
-        self.grid[9][12] = CHAIR_DOWN;
-        self.grid[9][13] = CHAIR_DOWN
-        self.grid[11][12] = CHAIR_UP;
-        self.grid[11][13] = CHAIR_UP
-        self.grid[17][17] = TABLE
-
-        # --- 5. DUAL UTILITIES ---
-        # Charger 1 (Top Right)
-        self.grid[1][18] = CHARGER
-        self.charger_positions.append((1, 18))
-        # Charger 2 (Bottom Left)
-        self.grid[18][2] = CHARGER
-        self.charger_positions.append((18, 2))
-
-        # Bin 1 (Shed)
-        self.grid[16][18] = BIN
-        self.bin_positions.append((16, 18))
-        # Bin 2 (Bedroom 1)
-        self.grid[5][2] = BIN
-        self.bin_positions.append((5, 2))
-
-        # Fallback for old agent compatibility
-        self.charger_pos = self.charger_positions[0]
-        self.bin_pos = self.bin_positions[0]
+    def reset(self, seed=None):
+        """Restores the layout template and scatters fresh dirt; reseeds first if `seed` is given."""
+        if seed is not None:
+            self.seed(seed)
+        self.build_house()
 
         # --- 6. DIRT ---
-        num_dirt = 40
-        placed = 0
-        attempts = 0
-        while placed < num_dirt and attempts < 1000:
-            r = random.randint(1, self.rows - 2)
-            c = random.randint(1, self.cols - 2)
-            if self.grid[r][c] == EMPTY:
-                self.grid[r][c] = DIRT
-                placed += 1
-            attempts += 1
+        empty = self.empty_flat
+        cells = self.rng.choice(empty, size=min(NUM_DIRT, len(empty)), replace=False)
+        self.flat_grid[cells] = DIRT
+        self._spawn_in = self.rng.geometric(DIRT_SPAWN_CHANCE)
 
+        self._rebuild_dirt_index()
         return self.charger_positions[0]
 
+    def build_house(self):
+        """Copies the compiled layout template in (walls, doors, furniture, utilities; no dirt)."""
+        layout = self.layout
+        np.copyto(self.grid, layout.grid)
+        if self._layout_key != layout.key:
+            self.charger_positions = layout.charger_positions
+            self.bin_positions = layout.bin_positions
+
+            # Fallback for old agent compatibility
+            self.charger_pos = self.charger_positions[0]
+            self.bin_pos = self.bin_positions[0]
+
+            self._use_layout(layout)
+
+    # ---------------- STATIC DISTANCE FIELDS ----------------
+    def _use_layout(self, layout):
+        self._compile_passability(~layout.obstacles)
+        self.empty_flat = layout.empty_flat
+        self._layout_key = layout.key
+
+    def _compile_passability(self, passable):
+        """Builds everything derived from the obstacle layout and drops cached fields.
+
+        neighbors is a (rows * cols, 4) int32 array: row i holds the flat
+        indices of cell i's four neighbours in bfs.MOVES order (north,
+        south, east, west), -1 where that neighbour is blocked or off the
+        map. Sensors read it; the planners read nav and movement passable.
+        """
+        rows, cols = self.rows, self.cols
+        self.passable = passable
+        self.nav = NavGrid(passable)
+
+        padded = np.full((rows + 2, cols + 2), -1, dtype=np.int32)
+        padded[1:-1, 1:-1] = np.where(passable, np.arange(rows * cols).reshape(rows, cols), -1)
+        table = np.stack([padded[:-2, 1:-1], padded[2:, 1:-1], padded[1:-1, 2:], padded[1:-1, :-2]], axis=-1)
+        self.neighbors = table.reshape(-1, 4)
+        self._fields.clear()
+
+    def _patch_passability(self, r, c, is_open):
+        """Opens or blocks one cell in passable, nav and neighbors, in place."""
+        self.passable[r, c] = is_open
+        self.nav.set_open((r, c), is_open)
+        # Only the rows of the cell's neighbours point at it
+        i = r * self.cols + c
+        for k, (dr, dc) in enumerate(MOVES):
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < self.rows and 0 <= nc < self.cols:
+                # Seen from (nr, nc), (r, c) lies in the opposite direction
+                self.neighbors[nr * self.cols + nc, k ^ 1] = i if is_open else -1
+        self._fields.clear()
+
+    def set_tile(self, r, c, tile):
+        """Writes one tile, keeping the dirt index, dirt spawn cells and passability data in step."""
+        old = self.grid[r][c]
+        self.grid[r][c] = tile
+        if old == DIRT and tile != DIRT:
+            self._unindex_dirt(r, c)
+        elif tile == DIRT and old != DIRT:
+            self._index_dirt(r, c)
+
+        i = r * self.cols + c
+        floor = tile in (EMPTY, DIRT)
+        if self.empty_flat is not None:
+            # empty_flat is sorted: find the slot, then insert or drop one entry
+            k = int(np.searchsorted(self.empty_flat, i))
+            listed = k < len(self.empty_flat) and self.empty_flat[k] == i
+            if floor != listed:
+                self.empty_flat = np.insert(self.empty_flat, k, i) if floor else np.delete(self.empty_flat, k)
+                self._layout_key = None
+
+        if self.passable is not None and self.passable[r, c] == (tile in OBSTACLES):
+            self._patch_passability(r, c, tile not in OBSTACLES)
+            self._layout_key = None  # no longer the template: next build_house() restores it
+
+    def utility_field(self, tile):
+        """(dist, next_hop) toward every CHARGER or BIN, computed once per layout."""
+        if tile not in self._fields:
+            positions = self.charger_positions if tile == CHARGER else self.bin_positions
+            sources = np.zeros((1, self.rows, self.cols), dtype=bool)
+            for x, y in positions:
+                sources[0, x, y] = True
+            dist = wavefront(self.passable, sources)[0]
+            self._fields[tile] = (dist, next_hops(dist))
+        return self._fields[tile]
+
+    def utility_path(self, tile, start):
+        """Shortest path to the nearest CHARGER/BIN; [] if unreachable or already there."""
+        dist, hops = self.utility_field(tile)
+        return follow(hops, dist, start)
+
     def random_dirt_spawn(self):
-        # 1% Chance
-        if random.random() < 0.01:
-            for _ in range(10):
-                r = random.randint(1, self.rows - 2)
-                c = random.randint(1, self.cols - 2)
-                if self.grid[r][c] == EMPTY:
-                    self.grid[r][c] = DIRT
-                    return
+        """Spills dirt on a DIRT_SPAWN_CHANCE of calls, on the first empty cell of a few random draws.
+
+        The gap between spills is drawn once per spill (geometric, the same
+        distribution as a coin flip per call), so most calls only count down.
+        """
+        self._spawn_in -= 1
+        if self._spawn_in > 0:
+            return
+        self._spawn_in = self.rng.geometric(DIRT_SPAWN_CHANCE)
+        empty = self.empty_flat
+        if len(empty) == 0:
+            return
+        for i in self.rng.choice(empty, size=DIRT_SPAWN_TRIES):
+            if self.flat_grid[i] == EMPTY:
+                self.add_dirt(*divmod(int(i), self.cols))
+                return
+
+    # ---------------- DIRT INDEX ----------------
+    def _rebuild_dirt_index(self):
+        rows, cols = np.nonzero(self.grid == DIRT)
+        self.dirt_cells = set(zip(rows.tolist(), cols.tolist()))
+        self.dirt_count = len(rows)
+        self.dirt_version += 1
+
+    def _index_dirt(self, r, c):
+        self.dirt_cells.add((r, c))
+        self.dirt_count += 1
+        self.dirt_version += 1
+
+    def _unindex_dirt(self, r, c):
+        self.dirt_cells.discard((r, c))
+        self.dirt_count -= 1
+        self.dirt_version += 1
+
+    def add_dirt(self, r, c):
+        self.grid[r][c] = DIRT
+        self._index_dirt(r, c)
+
+    def clean(self, r, c):
+        """Removes the dirt at (r, c) from the grid and the index."""
+        self.grid[r][c] = EMPTY
+        self._unindex_dirt(r, c)
+
+    def dirt_positions(self):
+        return list(self.dirt_cells)
+
+    def nearest_dirt_path(self, start, engine=PLANNER):
+        """Shortest path to the closest reachable dirt, [] if none or already on it."""
+        if self.dirt_count == 0:
+            return []
+        return find_path(self.nav, start, self.dirt_cells, engine)
 
     def get_sensors(self, x, y):
-        def get_val(r, c):
-            if r < 0 or r >= self.rows or c < 0 or c >= self.cols: return WALL
-            val = self.grid[r][c]
-            if val in [SOFA_1, SOFA_2, BED, TABLE, CHAIR_UP, CHAIR_DOWN, WALL_UP, WALL_DOWN]:
-                return WALL
-            return val
-
+        """Tiles west, east, south and north of (x, y), obstacles and the map edge as WALL, then (x, y) itself."""
+        flat = self.flat_grid
+        i = x * self.cols + y
+        n, s, e, w = self.neighbors[i].tolist()
         return (
-            get_val(x, y - 1), get_val(x, y + 1), get_val(x + 1, y), get_val(x - 1, y),
-            self.grid[x][y]
+            WALL if w < 0 else flat[w], WALL if e < 0 else flat[e],
+            WALL if s < 0 else flat[s], WALL if n < 0 else flat[n],
+            flat[i]
         )
 
-    def draw(self, agent=None):
+    def draw(self, agent=None, robots=None):
         if not self.render_mode: return
-
-        if self.assets.get('floor'):
-            for r in range(self.rows):
-                for c in range(self.cols):
-                    self.screen.blit(self.assets['floor'], (c * CELL_SIZE, r * CELL_SIZE))
-        else:
-            self.screen.fill(WHITE)
-
-        for r in range(self.rows):
-            for c in range(self.cols):
-                tile = self.grid[r][c]
-                rect = (c * CELL_SIZE, r * CELL_SIZE)
-                if tile != EMPTY:
-                    if tile in self.assets and self.assets[tile]:
-                        self.screen.blit(self.assets[tile], rect)
-                    else:
-                        color = BLACK
-                        if tile == DIRT:
-                            color = BROWN
-                        elif tile == CHARGER:
-                            color = GREEN
-                        elif tile == BIN:
-                            color = RED
-                        elif tile in [SOFA_1, SOFA_2]:
-                            color = BLUE
-                        pygame.draw.rect(self.screen, color, (c * CELL_SIZE, r * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-
-        if agent:
-            if self.assets.get('robot'):
-                self.screen.blit(self.assets['robot'], (agent.y * CELL_SIZE, agent.x * CELL_SIZE))
-            else:
-                rect = (agent.y * CELL_SIZE + 5, agent.x * CELL_SIZE + 5, CELL_SIZE - 10, CELL_SIZE - 10)
-                pygame.draw.rect(self.screen, BLUE, rect)
-
-        pygame.display.flip()
\ No newline at end of file
+        return self.renderer.draw(agent, robots)
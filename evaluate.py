@@ -0,0 +1,222 @@
+"""Greedy policy evaluation over many seeded houses, in a process pool.
+
+    python evaluate.py                                  # brain.npy, 1000 houses
+    python evaluate.py --episodes 5000 --json eval.json
+    python evaluate.py --max-death-rate 0.05 --min-coverage 0.9   # exit 1 if a gate fails
+
+Episodes play exactly as the viewer does (epsilon 0, main.py's fallback
+plan order and charging hold, random dirt spawns) and end when the robot
+dies, the house is clean or max_steps runs out. Episode i always uses
+seed + i, so results do not depend on the number of workers.
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+import numpy as np
+from environment import GridWorld
+from agent import VacuumAgent
+from config import *
+from qtable import QTable, POLICY_FILE
+from simulation import decide
+
+EPISODES = 1000
+MAX_STEPS = 1000
+# Episodes handed to a worker at a time
+CHUNK = 25
+# Two-sided 95% normal quantile
+Z95 = 1.959964
+
+EPISODE_DTYPE = np.dtype([
+    ("seed", "<i8"),
+    ("reward", "<f8"),
+    ("steps", "<i4"),
+    ("died", "?"),
+    ("cleaned", "<i4"),
+    ("dirt_seen", "<i4"),           # initial dirt plus everything that spawned
+    ("steps_to_clean", "<i4"),      # -1 if the house was never clean
+    ("charger_trips", "<i4"),
+    ("bin_trips", "<i4"),
+])
+
+# Worker-process state, set once by _init_worker
+_policy = None
+_layout = None
+
+
+def run_greedy_episode(env, agent, seed, max_steps=MAX_STEPS):
+    """Plays one seeded episode with the viewer's logic; returns an EPISODE_DTYPE record."""
+    random.seed(seed)
+    np.random.seed(seed)
+    start = env.reset(seed)
+
+    agent.x, agent.y = start
+    agent.battery = MAX_BATTERY
+    agent.bin = 0
+    agent.is_alive = True
+    agent.current_goal = None
+    agent.current_path.clear()
+
+    out = np.zeros((), dtype=EPISODE_DTYPE)
+    out["seed"] = seed
+    out["steps_to_clean"] = -1
+    dirt_seen = env.dirt_count
+    reward = 0.0
+    on_charger = True
+
+    steps = 0
+    while steps < max_steps:
+        before = env.dirt_count
+        env.random_dirt_spawn()
+        dirt_seen += env.dirt_count - before
+
+        decide(env, agent)
+        r1, died = agent.move_step(env)
+        bin_before = agent.bin
+        r2 = agent.interact(env)
+        reward += r1 + r2
+        steps += 1
+
+        tile = env.grid[agent.x][agent.y]
+        if tile == CHARGER and not on_charger:
+            out["charger_trips"] += 1
+        on_charger = tile == CHARGER
+        if tile == BIN and bin_before > 0 and agent.bin == 0:
+            out["bin_trips"] += 1
+
+        if died:
+            out["died"] = True
+            break
+        if env.dirt_count == 0:
+            out["steps_to_clean"] = steps
+            break
+
+    out["reward"] = reward
+    out["steps"] = steps
+    out["dirt_seen"] = dirt_seen
+    out["cleaned"] = dirt_seen - env.dirt_count
+    return out
+
+
+def _init_worker(policy_file, layout):
+    global _policy, _layout
+    _policy = QTable.load(policy_file, mmap=True)
+    _layout = layout
+
+
+def _run_chunk(args):
+    seeds, max_steps = args
+    env = GridWorld(render_mode=False, layout=_layout)
+    agent = VacuumAgent()
+    agent.q_table = _policy
+    agent.epsilon = 0.0
+    return np.array([run_greedy_episode(env, agent, s, max_steps) for s in seeds], dtype=EPISODE_DTYPE)
+
+
+def evaluate(policy_file=POLICY_FILE, episodes=EPISODES, seed=0, workers=None, layout=None, max_steps=MAX_STEPS):
+    """Runs `episodes` seeded episodes; returns an EPISODE_DTYPE array ordered by seed."""
+    workers = workers or os.cpu_count() or 1
+    seeds = list(range(seed, seed + episodes))
+    chunks = [(seeds[i:i + CHUNK], max_steps) for i in range(0, episodes, CHUNK)]
+    if workers == 1:
+        _init_worker(policy_file, layout)
+        parts = [_run_chunk(c) for c in chunks]
+    else:
+        with mp.Pool(workers, initializer=_init_worker, initargs=(policy_file, layout)) as pool:
+            parts = pool.map(_run_chunk, chunks)
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=EPISODE_DTYPE)
+
+
+# ---------------- STATISTICS ----------------
+def mean_ci(values):
+    """Mean with a normal-approximation 95% confidence interval."""
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n == 0:
+        return {"mean": float("nan"), "lo": float("nan"), "hi": float("nan"), "n": 0}
+    mean = values.mean()
+    half = Z95 * values.std(ddof=1) / np.sqrt(n) if n > 1 else 0.0
+    return {"mean": float(mean), "lo": float(mean - half), "hi": float(mean + half), "n": n}
+
+
+def rate_ci(hits, n):
+    """Proportion with a Wilson 95% interval (well behaved near 0 and 1)."""
+    if n == 0:
+        return {"mean": float("nan"), "lo": float("nan"), "hi": float("nan"), "n": 0}
+    p = hits / n
+    denom = 1 + Z95 ** 2 / n
+    centre = (p + Z95 ** 2 / (2 * n)) / denom
+    half = Z95 * np.sqrt(p * (1 - p) / n + Z95 ** 2 / (4 * n * n)) / denom
+    return {"mean": float(p), "lo": float(centre - half), "hi": float(centre + half), "n": n}
+
+
+def summarize(results):
+    """Aggregate statistics for a results array, as plain JSON-able dicts."""
+    n = len(results)
+    clean = results["steps_to_clean"] >= 0
+    coverage = results["cleaned"] / np.maximum(results["dirt_seen"], 1)
+    summary = {
+        "episodes": n,
+        "coverage": mean_ci(coverage),
+        "reward": mean_ci(results["reward"]),
+        "steps": mean_ci(results["steps"]),
+        "death_rate": rate_ci(int(results["died"].sum()), n),
+        "clean_rate": rate_ci(int(clean.sum()), n),
+        "steps_to_clean": mean_ci(results["steps_to_clean"][clean]),
+        "charger_trips": mean_ci(results["charger_trips"]),
+        "bin_trips": mean_ci(results["bin_trips"]),
+    }
+    if n:
+        p = np.percentile(results["reward"], [5, 25, 50, 75, 95])
+        summary["reward_percentiles"] = dict(zip(["p5", "p25", "p50", "p75", "p95"], map(float, p)))
+    return summary
+
+
+def print_summary(summary):
+    print(f"{summary['episodes']} episodes")
+    for key in ("coverage", "clean_rate", "steps_to_clean", "death_rate", "reward", "steps",
+                "charger_trips", "bin_trips"):
+        s = summary[key]
+        print(f"  {key:<16} {s['mean']:10.3f}   95% CI [{s['lo']:.3f}, {s['hi']:.3f}]   n={s['n']}")
+    if "reward_percentiles" in summary:
+        pct = "  ".join(f"{k}={v:.0f}" for k, v in summary["reward_percentiles"].items())
+        print(f"  reward dist      {pct}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--policy", default=POLICY_FILE)
+    parser.add_argument("--episodes", type=int, default=EPISODES)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first episode")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS)
+    parser.add_argument("--layout", default=None, help="floor plan file or layouts/ name")
+    parser.add_argument("--json", metavar="FILE", help="also write the summary as JSON")
+    parser.add_argument("--min-coverage", type=float, default=None, help="gate: lower CI bound of coverage")
+    parser.add_argument("--max-death-rate", type=float, default=None, help="gate: upper CI bound of deaths")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    results = evaluate(args.policy, args.episodes, args.seed, args.workers, args.layout, args.max_steps)
+    elapsed = time.perf_counter() - t0
+    summary = summarize(results)
+    summary["policy"] = args.policy
+    summary["seed"] = args.seed
+    summary["elapsed_s"] = elapsed
+    print_summary(summary)
+    print(f"  {int(results['steps'].sum()):,} steps in {elapsed:.1f}s")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    failed = []
+    if args.min_coverage is not None and summary["coverage"]["lo"] < args.min_coverage:
+        failed.append(f"coverage lower bound {summary['coverage']['lo']:.3f} < {args.min_coverage}")
+    if args.max_death_rate is not None and summary["death_rate"]["hi"] > args.max_death_rate:
+        failed.append(f"death rate upper bound {summary['death_rate']['hi']:.3f} > {args.max_death_rate}")
+    if failed:
+        sys.exit("GATE FAILED: " + "; ".join(failed))
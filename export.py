@@ -0,0 +1,370 @@
+"""Renders runs offscreen to animated PNGs or PNG sequences, faster than real time.
+
+    python export.py run.vtrj more.vtrj --out clips/        # recorded runs (main.py --record)
+    python export.py --seeds 0:100 --out clips/ --every 2   # greedy evaluation episodes
+
+Frames are drawn with the viewer's renderer and sidebar under SDL's dummy
+driver (no window, no frame pacing, no display.flip), copied into a small
+pool of preallocated numpy buffers and encoded by a background thread.
+Seed n replays evaluate.py's episode n exactly. .png output is an APNG
+whose frames only cover the region that changed, so clips stay small.
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# SDL would turn SIGTERM into a QUIT event and keep Pool.terminate from stopping workers
+os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+
+import argparse
+import multiprocessing as mp
+import queue
+import random
+import struct
+import sys
+import threading
+import time
+import zlib
+from contextlib import closing, redirect_stdout
+import numpy as np
+import pygame
+from environment import GridWorld
+from agent import VacuumAgent
+from config import *
+from dashboard import SIDEBAR_WIDTH, DARK_BG, NEON_BLUE, render_text
+from main import compose
+from qtable import QTable, POLICY_FILE
+from simulation import Simulation
+from trajectory import Trajectory
+from evaluate import MAX_STEPS
+
+# Frames in flight between the renderer and the encoder thread
+POOL_SIZE = 8
+# zlib level for PNG data: 1-3 is several times faster than 9 for a few % more bytes
+ZLIB_LEVEL = 3
+EXPORT_FPS = RENDER_FPS
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+# ---------------- PNG / APNG ENCODING ----------------
+def _chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+def _ihdr(width, height):
+    return _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))  # 8-bit RGB
+
+
+def _deflate(pixels):
+    """zlib stream of an (h, w, 3) uint8 image, filter type 0 on every row."""
+    h, w, _ = pixels.shape
+    raw = np.zeros((h, 1 + w * 3), dtype=np.uint8)
+    raw[:, 1:] = pixels.reshape(h, w * 3)
+    return zlib.compress(raw.tobytes(), ZLIB_LEVEL)
+
+
+def write_png(path, pixels):
+    h, w, _ = pixels.shape
+    with open(path, "wb") as f:
+        f.write(PNG_SIGNATURE + _ihdr(w, h) + _chunk(b"IDAT", _deflate(pixels)) + _chunk(b"IEND", b""))
+
+
+class PngSequence:
+    """One numbered PNG per frame in a directory."""
+
+    def __init__(self, path, fps=EXPORT_FPS):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.frames = 0
+
+    def add(self, pixels):
+        write_png(os.path.join(self.path, f"{self.frames:06d}.png"), pixels)
+        self.frames += 1
+
+    def close(self):
+        pass
+
+
+class ApngWriter:
+    """Streams an animated PNG.
+
+    Each frame after the first is stored as the bounding box of the pixels
+    that changed, drawn over the previous frame (dispose none, blend
+    source). The frame count in acTL is patched in on close(). An APNG
+    needs at least one frame, so closing without any removes the file.
+    """
+
+    def __init__(self, path, fps=EXPORT_FPS):
+        self.file = open(path, "wb")
+        self.fps = int(fps)
+        self.frames = 0
+        self.seq = 0
+        self.prev = None
+
+    def _fctl(self, x, y, w, h):
+        data = struct.pack(">IIIIIHHBB", self.seq, w, h, x, y, 1, self.fps, 0, 0)
+        self.seq += 1
+        return _chunk(b"fcTL", data)
+
+    def add(self, pixels):
+        h, w, _ = pixels.shape
+        if self.prev is None:
+            self.file.write(PNG_SIGNATURE + _ihdr(w, h))
+            self._actl = self.file.tell()
+            self.file.write(_chunk(b"acTL", struct.pack(">II", 0, 0)))
+            self.file.write(self._fctl(0, 0, w, h) + _chunk(b"IDAT", _deflate(pixels)))
+            self.prev = pixels.copy()
+        else:
+            changed = pixels.reshape(h, w * 3) != self.prev.reshape(h, w * 3)
+            rows = np.flatnonzero(changed.any(axis=1))
+            cols = np.flatnonzero(changed.any(axis=0).reshape(w, 3).any(axis=1))
+            if len(rows):
+                y0, y1, x0, x1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+            else:
+                y0, y1, x0, x1 = 0, 1, 0, 1  # unchanged: a 1-pixel frame keeps the timing
+            region = pixels[y0:y1, x0:x1]
+            data = self._fctl(int(x0), int(y0), int(x1 - x0), int(y1 - y0))
+            data += _chunk(b"fdAT", struct.pack(">I", self.seq) + _deflate(region))
+            self.seq += 1
+            self.file.write(data)
+            self.prev[y0:y1, x0:x1] = region
+        self.frames += 1
+
+    def close(self):
+        if self.file.closed:
+            return
+        if self.prev is None:
+            self.file.close()
+            os.remove(self.file.name)
+            return
+        self.file.write(_chunk(b"IEND", b""))
+        self.file.seek(self._actl)
+        self.file.write(_chunk(b"acTL", struct.pack(">II", self.frames, 0)))
+        self.file.close()
+
+
+class FrameWriter(threading.Thread):
+    """Encodes frames on a background thread from a fixed pool of raw surface buffers.
+
+    acquire() hands out a free (h, w, 4) buffer in the canvas' byte order,
+    blocking while all POOL_SIZE are queued, which keeps memory flat when
+    rendering outruns encoding. RGB conversion, downscaling and zlib all
+    happen here, and numpy and zlib release the GIL, so encoding overlaps
+    the next draws.
+    """
+
+    def __init__(self, encoder, shape, channels, downscale=1, pool_size=POOL_SIZE):
+        super().__init__(daemon=True)
+        self.encoder = encoder
+        self.channels = channels
+        self.downscale = downscale
+        self.free = queue.Queue()
+        for _ in range(pool_size):
+            self.free.put(np.empty(shape, dtype=np.uint8))
+        h, w = shape[0], shape[1]
+        self.rgb = np.empty((-(-h // downscale), -(-w // downscale), 3), dtype=np.uint8)
+        self.todo = queue.Queue()
+        self.error = None
+        self.start()
+
+    def acquire(self):
+        if self.error:
+            raise self.error
+        return self.free.get()
+
+    def submit(self, buf):
+        self.todo.put(buf)
+
+    def run(self):
+        d = self.downscale
+        while True:
+            buf = self.todo.get()
+            if buf is None:
+                break
+            try:
+                if self.error is None:
+                    for k, ch in enumerate(self.channels):
+                        self.rgb[..., k] = buf[::d, ::d, ch]
+                    self.encoder.add(self.rgb)
+            except Exception as e:  # surfaced to the renderer on its next acquire()
+                self.error = e
+            self.free.put(buf)
+
+    def close(self):
+        self.todo.put(None)
+        self.join()
+        self.encoder.close()
+        if self.error:
+            raise self.error
+
+
+# ---------------- OFFSCREEN RENDERING ----------------
+class OffscreenView:
+    """The dashboard view (sidebar, map, status strip) drawn into an offscreen canvas."""
+
+    def __init__(self, layout):
+        self.env = GridWorld(render_mode=True, layout=layout)
+        map_w, map_h = self.env.cols * CELL_SIZE, self.env.rows * CELL_SIZE + 60
+        self.map_surface = pygame.Surface((map_w, map_h))
+        self.env.renderer.screen = self.map_surface
+        self.canvas = pygame.Surface((SIDEBAR_WIDTH + map_w, max(SCREEN_HEIGHT, map_h)), 0, 32)
+        self.canvas.fill(DARK_BG)
+        self.status = pygame.Rect(SIDEBAR_WIDTH, self.env.rows * CELL_SIZE, map_w, 60)
+
+        w, h = self.canvas.get_size()
+        self.shape = (h, w, 4)
+        # Byte of each 32-bit pixel holding R, G and B
+        byte = (lambda shift: shift // 8) if sys.byteorder == "little" else (lambda shift: 3 - shift // 8)
+        self.channels = tuple(byte(shift) for shift in self.canvas.get_shifts()[:3])
+
+    def render(self, frame, label, out):
+        """Draws frame and copies the raw canvas pixels into `out`, an array of self.shape."""
+        np.copyto(self.env.grid, frame.grid)
+        pygame.draw.rect(self.canvas, DARK_BG, self.status)
+        self.canvas.blit(render_text(label, 'Consolas', 16, NEON_BLUE), (self.status.x + 20, self.status.y + 20))
+        compose(self.canvas, self.map_surface, self.env, frame, extra=[self.status])
+
+        h, w, _ = self.shape
+        raw = np.frombuffer(self.canvas.get_buffer(), dtype=np.uint8).reshape(h, self.canvas.get_pitch())
+        np.copyto(out.reshape(h, w * 4), raw[:, :w * 4])
+        del raw  # releases the canvas lock
+
+
+def open_encoder(path, fmt, fps):
+    return ApngWriter(path, fps) if fmt == "apng" else PngSequence(path, fps)
+
+
+def export_frames(frames, layout, path, fmt="apng", fps=EXPORT_FPS, downscale=1, title=""):
+    """Renders an iterable of Frames to path; returns the number of frames written."""
+    view = OffscreenView(layout)
+    writer = FrameWriter(open_encoder(path, fmt, fps), view.shape, view.channels, downscale)
+    count = 0
+    try:
+        for frame in frames:
+            buf = writer.acquire()
+            view.render(frame, f"{title}  step {frame.step + 1}", buf)
+            writer.submit(buf)
+            count += 1
+    finally:
+        writer.close()
+    return count
+
+
+# ---------------- FRAME SOURCES ----------------
+def trajectory_frames(traj, every=1):
+    for step in range(0, len(traj), every):
+        yield traj.frame(step)
+    if (len(traj) - 1) % every:
+        yield traj.frame(len(traj) - 1)  # always end on the final state
+
+
+def episode_frames(env, agent, seed, every=1, max_steps=MAX_STEPS):
+    """Snapshots of evaluate.py's seeded greedy episode (same RNG order, same stopping rule)."""
+    random.seed(seed)
+    np.random.seed(seed)
+    env.seed(seed)
+    with redirect_stdout(None):
+        sim = Simulation(env, agent)
+    sim.run = seed
+    yield sim.snapshot()
+    while sim.steps < max_steps:
+        done = sim.step()
+        last = done or env.dirt_count == 0 or sim.steps == max_steps
+        if last or sim.steps % every == 0:
+            yield sim.snapshot()
+        if last:
+            break
+
+
+# ---------------- BATCH JOBS ----------------
+_agent = None
+
+
+def _load_agent(policy_file):
+    global _agent
+    if _agent is None:
+        _agent = VacuumAgent()
+        _agent.q_table = QTable.load(policy_file, mmap=True)
+        _agent.epsilon = 0.0
+    return _agent
+
+
+def export_job(job):
+    """One clip: ("trajectory", path) or ("seed", n); returns (output, frames, seconds)."""
+    kind, source, out_dir, opts = job
+    ext = ".png" if opts["format"] == "apng" else ""
+    start = time.perf_counter()
+    if kind == "trajectory":
+        traj = Trajectory(source)
+        name = os.path.splitext(os.path.basename(source))[0]
+        try:
+            frames = trajectory_frames(traj, opts["every"])
+            out = os.path.join(out_dir, name + ext)
+            count = export_frames(frames, traj.layout(), out, opts["format"], opts["fps"], opts["downscale"], name)
+        finally:
+            traj.close()
+    else:
+        env = GridWorld(render_mode=False, layout=opts["layout"])
+        agent = _load_agent(opts["policy"])
+        frames = episode_frames(env, agent, source, opts["every"], opts["max_steps"])
+        out = os.path.join(out_dir, f"seed-{source}{ext}")
+        count = export_frames(frames, env.layout, out, opts["format"], opts["fps"], opts["downscale"],
+                              f"SEED {source}")
+    return out, count, time.perf_counter() - start
+
+
+def export_all(jobs, workers=1):
+    """Runs export jobs, in a process pool when workers > 1; yields results as they finish."""
+    if workers <= 1:
+        yield from map(export_job, jobs)
+        return
+    with mp.Pool(workers) as pool:
+        yield from pool.imap_unordered(export_job, jobs)
+
+
+def parse_seeds(spec):
+    """'7' -> [7], '0:100' -> 0..99"""
+    if ":" in spec:
+        lo, hi = map(int, spec.split(":"))
+        return list(range(lo, hi))
+    return [int(spec)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trajectories", nargs="*", help="trajectory files recorded with main.py --record")
+    parser.add_argument("--seeds", help="evaluation episodes to render: N or LO:HI")
+    parser.add_argument("--out", default="clips", help="output directory")
+    parser.add_argument("--format", default="apng", choices=["apng", "png"],
+                        help="one animated .png per run, or a directory of numbered .png frames")
+    parser.add_argument("--every", type=int, default=1, help="render every Nth step")
+    parser.add_argument("--fps", type=int, default=EXPORT_FPS, help="playback rate stored in animated files")
+    parser.add_argument("--downscale", type=int, default=1, help="keep every Nth pixel in each direction")
+    parser.add_argument("--policy", default=POLICY_FILE)
+    parser.add_argument("--layout", default=None, help="floor plan for --seeds (file or layouts/ name)")
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS)
+    parser.add_argument("--workers", type=int, default=1, help="processes rendering clips in parallel")
+    args = parser.parse_args()
+    if not args.trajectories and not args.seeds:
+        parser.error("give trajectory files and/or --seeds")
+    for path in args.trajectories:
+        if not os.path.exists(path):
+            parser.error(f"{path}: no such file")
+
+    opts = {"format": args.format, "every": max(1, args.every), "fps": args.fps, "downscale": max(1, args.downscale),
+            "policy": args.policy, "layout": args.layout, "max_steps": args.max_steps}
+    os.makedirs(args.out, exist_ok=True)
+    jobs = [("trajectory", path, args.out, opts) for path in args.trajectories]
+    jobs += [("seed", seed, args.out, opts) for seed in (parse_seeds(args.seeds) if args.seeds else [])]
+
+    start = time.perf_counter()
+    total = 0
+    with closing(export_all(jobs, args.workers)) as results:
+        for out, count, seconds in results:
+            total += count
+            print(f"  {out}: {count} frames in {seconds:.1f}s ({count / max(seconds, 1e-9):,.0f} frames/s)")
+    elapsed = time.perf_counter() - start
+    rate = total / max(elapsed, 1e-9)
+    print(f"{len(jobs)} clips, {total:,} frames in {elapsed:.1f}s: {rate:,.0f} frames/s, "
+          f"{rate * args.every / RENDER_FPS:.0f}x real time")
+    pygame.quit()
@@ -0,0 +1,262 @@
+"""Several VacuumAgents cleaning one GridWorld without colliding."""
+from collections import deque, namedtuple
+import numpy as np
+from config import *
+from agent import VacuumAgent, GO_CLEAN, GO_DUMP, GO_CHARGE
+from bfs import wavefront, next_hops, follow
+from simulation import Simulation, decide
+
+# Path steps a robot books ahead in the reservation table
+RESERVATION_HORIZON = 8
+# Ticks a robot waits on a blocked cell before stepping aside and replanning
+SIDESTEP_AFTER = 3
+
+# What the dashboard and renderer need per robot; `waits` counts blocked ticks
+RobotStatus = namedtuple("RobotStatus", ["id", "x", "y", "current_goal", "battery", "bin", "is_alive", "waits"])
+FleetFrame = namedtuple("FleetFrame", ["step", "grid", "robots", "run"])
+
+
+class ReservationTable:
+    """Space-time bookings: which robot holds which cell at which tick.
+
+    A robot books the next RESERVATION_HORIZON cells of its path when it
+    plans. Booking is first come, first served and stops at the first
+    (tick, cell) someone else holds, so later robots see earlier robots'
+    routes and wait instead of walking into them.
+    """
+
+    def __init__(self):
+        self.slots = {}   # (tick, cell) -> robot id
+        self.booked = {}  # robot id -> deque of its keys, oldest first
+
+    def holder(self, tick, cell):
+        return self.slots.get((tick, cell))
+
+    def release(self, rid):
+        for key in self.booked.pop(rid, ()):
+            if self.slots.get(key) == rid:
+                del self.slots[key]
+
+    def book(self, rid, tick, cells):
+        """Books cells[k] at tick + k, replacing the robot's earlier bookings."""
+        self.release(rid)
+        keys = deque()
+        for k, cell in enumerate(cells):
+            key = (tick + k, cell)
+            if self.slots.setdefault(key, rid) != rid:
+                break
+            keys.append(key)
+        self.booked[rid] = keys
+
+    def expire(self, tick):
+        """Drops bookings for ticks before `tick`."""
+        for keys in self.booked.values():
+            while keys and keys[0][0] < tick:
+                key = keys.popleft()
+                if self.slots.get(key) is not None:
+                    del self.slots[key]
+
+
+class SharedPlanner:
+    """Distance fields shared by the whole fleet.
+
+    Chargers and bins use GridWorld's per-layout fields. Dirt gets one
+    multi-source field that is rebuilt only when env.dirt_version moves,
+    so every robot that plans in between just walks the cached next hops.
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self._dirt = None
+        self._version = None
+        self.builds = 0
+        self.queries = 0
+
+    def dirt_field(self):
+        env = self.env
+        if self._version != env.dirt_version:
+            dist = wavefront(env.passable, (env.grid == DIRT)[None])[0]
+            self._dirt = (dist, next_hops(dist))
+            self._version = env.dirt_version
+            self.builds += 1
+        return self._dirt
+
+    def plan(self, agent, goal):
+        """Drop-in for VacuumAgent.plan(env, goal)."""
+        env = self.env
+        start = (agent.x, agent.y)
+        self.queries += 1
+        if goal == GO_CLEAN:
+            if env.dirt_count == 0:
+                return False
+            dist, hops = self.dirt_field()
+            path = follow(hops, dist, start)
+        elif goal == GO_DUMP:
+            path = env.utility_path(BIN, start)
+        elif goal == GO_CHARGE:
+            path = env.utility_path(CHARGER, start)
+        else:
+            return False
+
+        if not path:
+            return False
+        agent.current_path = deque(path)
+        return True
+
+
+def spawn_cells(env, count):
+    """The `count` open cells closest to a charger, chargers first."""
+    dist = env.utility_field(CHARGER)[0]
+    cells = np.argwhere(dist >= 0)
+    order = np.lexsort((cells[:, 1], cells[:, 0], dist[cells[:, 0], cells[:, 1]]))
+    if len(order) < count:
+        raise ValueError(f"only {len(order)} reachable cells for {count} robots")
+    return [tuple(int(v) for v in cells[i]) for i in order[:count]]
+
+
+class FleetSimulation(Simulation):
+    """N robots stepping together in one GridWorld.
+
+    Each tick every robot decides and plans as in Simulation, then moves
+    are resolved in a rotating priority order: a robot advances only into
+    a cell that is free at the next tick, not booked by another robot and
+    not being swapped with its occupant. Blocked robots wait, and step
+    aside after SIDESTEP_AFTER ticks so head-on meetings clear.
+    """
+
+    def __init__(self, env, agents, recorder=None):
+        self.agents = list(agents)
+        self.planner = SharedPlanner(env)
+        self.table = ReservationTable()
+        self.waits = [0] * len(self.agents)
+        super().__init__(env, self.agents[0], recorder)
+
+    def begin_run(self):
+        self.starts = spawn_cells(self.env, len(self.agents))
+        for agent, start in zip(self.agents, self.starts):
+            agent.x, agent.y = start
+            agent.battery = MAX_BATTERY
+            agent.bin = 0
+            agent.is_alive = True
+            agent.current_path.clear()
+            agent.current_goal = None
+        self.table = ReservationTable()
+        self.waits = [0] * len(self.agents)
+        self.done = False
+        self._end_requested = False
+        print(f"--- Starting Run #{self.run} ({len(self.agents)} robots) ---")
+
+    def step(self):
+        env, table = self.env, self.table
+        if self._end_requested:
+            self.done = True
+            return True
+
+        env.random_dirt_spawn()
+        tick = self.steps
+        table.expire(tick + 1)
+
+        # 1. Decide and plan; a fresh path is booked ahead, a cleared one
+        # (the charging hold empties the path in place) gives its cells back
+        n = len(self.agents)
+        order = [(tick + k) % n for k in range(n)]
+        for rid in order:
+            agent = self.agents[rid]
+            if not agent.is_alive:
+                continue
+            before = agent.current_path
+            decide(env, agent, self.planner.plan)
+            if agent.current_path is not before:
+                table.book(rid, tick + 1, list(agent.current_path)[:RESERVATION_HORIZON])
+            elif not agent.current_path:
+                table.release(rid)
+
+        # 2. Resolve moves until no further robot can advance this tick
+        occupant = {(a.x, a.y): rid for rid, a in enumerate(self.agents) if a.is_alive}
+        pending = [rid for rid in order if self.agents[rid].is_alive and self.agents[rid].current_path]
+        claimed = set()
+        moved = {}
+        progress = True
+        while progress:
+            progress = False
+            for rid in list(pending):
+                agent = self.agents[rid]
+                cell = agent.current_path[0]
+                if cell in claimed or table.holder(tick + 1, cell) not in (None, rid):
+                    continue
+                other = occupant.get(cell)
+                if other is not None and other != rid and (other not in moved or moved[other] == (agent.x, agent.y)):
+                    continue  # occupant stays put, or the two would swap cells
+                claimed.add(cell)
+                moved[rid] = cell
+                pending.remove(rid)
+                progress = True
+
+        # 3. Execute
+        for rid in order:
+            agent = self.agents[rid]
+            if not agent.is_alive:
+                continue
+            if rid in moved:
+                _, died = agent.move_step(env)
+                self.waits[rid] = 0
+                if died:
+                    agent.is_alive = False
+                    table.release(rid)
+                    print(f"Robot {rid + 1} died (Battery Depleted)")
+            elif rid in pending:
+                self.waits[rid] += 1
+                if self.waits[rid] >= SIDESTEP_AFTER:
+                    self._sidestep(rid, tick, occupant, claimed)
+                else:
+                    table.book(rid, tick + 2, list(agent.current_path)[:RESERVATION_HORIZON])
+
+        for rid in order:
+            agent = self.agents[rid]
+            if agent.is_alive:
+                agent.interact(env)
+
+        self.steps += 1
+        if self.recorder:
+            self.recorder.record(env, self.agents[0], self.run)
+        self.done = not any(a.is_alive for a in self.agents)
+        return self.done
+
+    def _sidestep(self, rid, tick, occupant, claimed):
+        """Moves a stuck robot to any free neighbour and drops its plan."""
+        agent = self.agents[rid]
+        env = self.env
+        for dx, dy in ((-1, 0), (1, 0), (0, 1), (0, -1)):
+            cell = (agent.x + dx, agent.y + dy)
+            if not (0 <= cell[0] < env.rows and 0 <= cell[1] < env.cols):
+                continue
+            if (env.passable[cell] and cell not in occupant and cell not in claimed
+                    and self.table.holder(tick + 1, cell) is None):
+                claimed.add(cell)
+                agent.current_path = deque([cell])
+                if agent.move_step(env)[1]:
+                    agent.is_alive = False
+                    print(f"Robot {rid + 1} died (Battery Depleted)")
+                break
+        agent.current_path.clear()
+        agent.current_goal = None
+        self.table.release(rid)  # also covers a robot that just died
+        self.waits[rid] = 0
+
+    def snapshot(self):
+        robots = tuple(
+            RobotStatus(rid + 1, a.x, a.y, a.current_goal, a.battery, a.bin, a.is_alive, self.waits[rid])
+            for rid, a in enumerate(self.agents)
+        )
+        return FleetFrame(self.steps, self.env.grid.copy(), robots, self.run)
+
+
+def make_fleet(count, q_table):
+    """`count` greedy agents sharing one (read-only) Q-table."""
+    agents = []
+    for _ in range(count):
+        agent = VacuumAgent()
+        agent.q_table = q_table
+        agent.epsilon = 0.0
+        agents.append(agent)
+    return agents
@@ -0,0 +1,296 @@
+import hashlib
+import json
+import os
+import numpy as np
+from config import *
+
+# Bump when the compiled arrays change meaning, so stale cache files are ignored
+COMPILER_VERSION = 1
+ROOT = os.path.dirname(os.path.abspath(__file__))
+LAYOUT_DIR = os.path.join(ROOT, "layouts")
+CACHE_DIR = os.path.join(ROOT, ".layout_cache")
+
+# One character per cell in .txt layouts and in the "rows" of .json layouts
+TILE_CHARS = {
+    ".": EMPTY,
+    "#": WALL,
+    "^": WALL_UP,
+    "v": WALL_DOWN,
+    "C": CHARGER,
+    "B": BIN,
+    "S": SOFA_1,
+    "s": SOFA_2,
+    "D": BED,
+    "T": TABLE,
+    "n": CHAIR_UP,
+    "u": CHAIR_DOWN,
+}
+CHAR_TILES = {tile: ch for ch, tile in TILE_CHARS.items()}
+
+
+class Layout:
+    """A compiled floor plan: everything about a house that never changes.
+
+    `grid` is the uint8 tile template (no dirt), `obstacles` the matching
+    bool mask and `empty_cells` the (K, 2) interior cells dirt may land on
+    (`empty_flat`: the same cells as flat indices).
+    `key` hashes the template and utility order, so equal keys mean the
+    planning data built for one layout is valid for the other. The outer
+    ring of cells must be obstacles, so the robot can never leave the map.
+    """
+
+    def __init__(self, name, grid, chargers, bins):
+        self.name = name
+        self.grid = np.ascontiguousarray(grid, dtype=np.uint8)
+        self.rows, self.cols = self.grid.shape
+        self.chargers = np.asarray(chargers, dtype=np.int64).reshape(-1, 2)
+        self.bins = np.asarray(bins, dtype=np.int64).reshape(-1, 2)
+        self.obstacles = np.isin(self.grid, OBSTACLES)
+
+        border = self.obstacles.copy()
+        border[1:-1, 1:-1] = True
+        if not border.all():
+            r, c = np.argwhere(~border)[0]
+            raise ValueError(f"layout {name!r} is not enclosed: border cell ({r}, {c}) is not a wall")
+
+        interior = np.zeros_like(self.obstacles)
+        interior[1:-1, 1:-1] = True
+        self.empty_cells = np.argwhere(interior & (self.grid == EMPTY))
+        self.empty_flat = self.empty_cells[:, 0] * self.cols + self.empty_cells[:, 1]
+
+        for kind, cells, tile in (("charger", self.chargers, CHARGER), ("bin", self.bins, BIN)):
+            if len(cells) == 0:
+                raise ValueError(f"layout {name!r} has no {kind}")
+            if np.any(self.grid[cells[:, 0], cells[:, 1]] != tile):
+                raise ValueError(f"layout {name!r}: {kind} position is not on a {kind} tile")
+
+        digest = hashlib.sha256(np.array(self.grid.shape, dtype=np.int64).tobytes())
+        for arr in (self.grid, self.chargers, self.bins):
+            digest.update(arr.tobytes())
+        self.key = digest.hexdigest()
+
+    @property
+    def charger_positions(self):
+        return [(int(r), int(c)) for r, c in self.chargers]
+
+    @property
+    def bin_positions(self):
+        return [(int(r), int(c)) for r, c in self.bins]
+
+    def to_text(self):
+        return "\n".join("".join(CHAR_TILES[t] for t in row) for row in self.grid) + "\n"
+
+
+# ---------------- PARSING ----------------
+def parse_rows(rows, name="layout"):
+    """Compiles equal-length tile strings; utilities are listed in row-major order."""
+    rows = [row.rstrip() for row in rows if row.strip()]
+    if not rows or len({len(row) for row in rows}) != 1:
+        raise ValueError(f"layout {name!r}: rows must be non-empty and of equal length")
+    try:
+        grid = np.array([[TILE_CHARS[ch] for ch in row] for row in rows], dtype=np.uint8)
+    except KeyError as e:
+        raise ValueError(f"layout {name!r}: unknown tile character {e.args[0]!r}") from None
+    return Layout(name, grid, np.argwhere(grid == CHARGER), np.argwhere(grid == BIN))
+
+
+def parse_layout(text, name="layout", fmt="txt"):
+    """Compiles layout source text.
+
+    JSON layouts give either "rows" (tile strings) or "grid" (tile codes),
+    and may pin the utility order with "chargers" / "bins" lists; the
+    first charger is where the robot starts.
+    """
+    if fmt == "txt":
+        return parse_rows(text.splitlines(), name)
+
+    spec = json.loads(text)
+    name = spec.get("name", name)
+    if "rows" in spec:
+        layout = parse_rows(spec["rows"], name)
+    else:
+        grid = np.array(spec["grid"], dtype=np.uint8)
+        layout = Layout(name, grid, np.argwhere(grid == CHARGER), np.argwhere(grid == BIN))
+    if "chargers" in spec or "bins" in spec:
+        layout = Layout(name, layout.grid, spec.get("chargers", layout.chargers), spec.get("bins", layout.bins))
+    return layout
+
+
+# ---------------- CACHE ----------------
+_loaded = {}  # content hash -> Layout, so repeated loads in one process are free
+
+
+def _read_cache(path, name):
+    try:
+        with np.load(path) as data:
+            return Layout(name, data["grid"], data["chargers"], data["bins"])
+    except (OSError, KeyError, ValueError):
+        return None  # missing or unreadable: recompile
+
+
+def _write_cache(path, layout):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, grid=layout.grid, chargers=layout.chargers, bins=layout.bins)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # read-only checkout: the cache is only an optimisation
+
+
+def load_layout(path):
+    """Loads a .txt or .json layout, compiling it at most once per content hash.
+
+    Compiled arrays are kept in CACHE_DIR as <sha256>.npz keyed on the file
+    bytes, so editing a layout file invalidates its entry automatically.
+    """
+    with open(path, "rb") as f:
+        source = f.read()
+    digest = hashlib.sha256(source + f"/v{COMPILER_VERSION}".encode()).hexdigest()
+    if digest in _loaded:
+        return _loaded[digest]
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    cache = os.path.join(CACHE_DIR, f"{digest}.npz")
+    layout = _read_cache(cache, name)
+    if layout is None:
+        fmt = "json" if path.endswith(".json") else "txt"
+        layout = parse_layout(source.decode("utf-8"), name, fmt)
+        _write_cache(cache, layout)
+    _loaded[digest] = layout
+    return layout
+
+
+def resolve_layout(layout=None, size=GRID_SIZE):
+    """Accepts a Layout, a file path, a name under layouts/, or None for the built-in house."""
+    if isinstance(layout, Layout):
+        return layout
+    if layout is None:
+        return default_house(size)
+    if not os.path.exists(layout):
+        for ext in (".txt", ".json"):
+            candidate = os.path.join(LAYOUT_DIR, layout + ext)
+            if os.path.exists(candidate):
+                return load_layout(candidate)
+    return load_layout(layout)
+
+
+# ---------------- BUILT-IN HOUSE ----------------
+_default = {}
+
+
+def default_house(size=GRID_SIZE):
+    """The original hand-placed house (layouts/house.json at 20x20), for any size >= 20."""
+    if size not in _default:
+        _default[size] = _build_default_house(size, size)
+    return _default[size]
+
+
+def _build_default_house(rows, cols):
+    grid = np.full((rows, cols), EMPTY, dtype=np.uint8)
+    chargers = []
+    bins = []
+
+    # --- 1. OUTER SHELL ---
+    grid[0, :] = WALL_UP
+    grid[rows - 1, :] = WALL_DOWN
+    grid[:, 0] = WALL
+    grid[:, cols - 1] = WALL
+    grid[0, 0] = WALL
+    grid[0, cols - 1] = WALL
+    grid[rows - 1, 0] = WALL
+    grid[rows - 1, cols - 1] = WALL
+
+    # --- 2. WALLS ---
+    for r in range(1, 15): grid[r][7] = WALL
+    for c in range(1, 7): grid[7][c] = WALL
+    for c in range(1, 7): grid[14][c] = WALL
+    for r in range(14, rows - 1): grid[r][14] = WALL
+    for c in range(14, cols - 1): grid[14][c] = WALL
+
+    # --- 3. DOORS ---
+    grid[3][7] = EMPTY
+    grid[10][7] = EMPTY
+    grid[17][7] = EMPTY
+    grid[17][14] = EMPTY
+
+    # --- 4. FURNITURE ---
+    grid[2][2] = BED;
+    grid[2][5] = TABLE
+    grid[9][2] = BED;
+    grid[9][5] = CHAIR_UP
+    grid[16][2] = BED;
+    grid[18][5] = TABLE
+    grid[3][12] = SOFA_1;
+    grid[3][13] = SOFA_1
+    grid[5][12] = TABLE;
+    grid[5][13] = TABLE
+    grid[8][17] = SOFA_2
+    grid[10][12] = TABLE;
+    grid[10][13] = TABLE
+    grid[9][12] = CHAIR_DOWN;
+    grid[9][13] = CHAIR_DOWN
+    grid[11][12] = CHAIR_UP;
+    grid[11][13] = CHAIR_UP
+    grid[17][17] = TABLE
+
+    # --- 5. DUAL UTILITIES ---
+    # Charger 1 (Top Right)
+    grid[1][18] = CHARGER
+    chargers.append((1, 18))
+    # Charger 2 (Bottom Left)
+    grid[18][2] = CHARGER
+    chargers.append((18, 2))
+
+    # Bin 1 (Shed)
+    grid[16][18] = BIN
+    bins.append((16, 18))
+    # Bin 2 (Bedroom 1)
+    grid[5][2] = BIN
+    bins.append((5, 2))
+
+    return Layout(f"house-{rows}x{cols}", grid, chargers, bins)
+
+
+def room_lattice(size, room=12, seed=0):
+    """A size x size house cut into room x room rooms joined by one-cell doors.
+
+    Every interior wall segment gets one door at a seeded random offset and
+    each room one piece of furniture, which makes large multi-room maps for
+    planner benchmarks. Chargers and bins sit in opposite corners.
+    """
+    rng = np.random.default_rng(seed)
+    grid = np.full((size, size), EMPTY, dtype=np.uint8)
+    grid[0, :] = WALL_UP
+    grid[size - 1, :] = WALL_DOWN
+    grid[:, 0] = WALL
+    grid[:, size - 1] = WALL
+
+    lines = list(range(room, size - 2, room))
+    for k in lines:
+        grid[k, 1:-1] = WALL
+        grid[1:-1, k] = WALL
+    bounds = [0] + lines + [size - 1]
+    for k in lines:
+        for lo, hi in zip(bounds, bounds[1:]):
+            grid[k, rng.integers(lo + 1, hi)] = EMPTY
+            grid[rng.integers(lo + 1, hi), k] = EMPTY
+    for top, bottom in zip(bounds, bounds[1:]):
+        for left, right in zip(bounds, bounds[1:]):
+            if bottom - top > 4 and right - left > 4:
+                grid[rng.integers(top + 2, bottom - 1), rng.integers(left + 2, right - 1)] = TABLE
+
+    chargers = [(1, size - 2), (size - 2, 1)]
+    bins = [(size - 2, size - 2), (1, 1)]
+    for cell in chargers:
+        grid[cell] = CHARGER
+    for cell in bins:
+        grid[cell] = BIN
+    return Layout(f"lattice-{size}-{room}", grid, chargers, bins)
+
+
+if __name__ == "__main__":
+    import sys
+    # Prints a layout as text, e.g. to start a new floor plan from the built-in house
+    print(resolve_layout(sys.argv[1] if len(sys.argv) > 1 else None).to_text(), end="")
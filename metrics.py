@@ -0,0 +1,313 @@
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+
+# What run_episode() reports back for one episode
+EpisodeResult = namedtuple("EpisodeResult", ["total_reward", "steps", "died", "plan_failures"])
+
+PHASES = ("choose_goal", "plan", "move_step", "interact", "learn")
+
+
+class PhaseTimer:
+    """Accumulates wall time per training-loop phase.
+
+    Usage inside a loop:  t = tick(); work(); t = timer.lap("phase", t)
+
+    totals is what the next drain() reports; run_totals keeps the whole
+    run for summary().
+    """
+
+    def __init__(self):
+        self.totals = dict.fromkeys(PHASES, 0.0)
+        self.run_totals = dict.fromkeys(PHASES, 0.0)
+
+    def lap(self, phase, start):
+        now = time.perf_counter()
+        self.totals[phase] += now - start
+        self.run_totals[phase] += now - start
+        return now
+
+    def drain(self):
+        """Returns the totals since the last drain (in ms) and zeros them."""
+        out = {f"{phase}_ms": t * 1e3 for phase, t in self.totals.items()}
+        self.totals = dict.fromkeys(PHASES, 0.0)
+        return out
+
+    def summary(self, episodes):
+        """One line per phase: total seconds, ms per episode and share of the timed loop."""
+        total = sum(self.run_totals.values()) or 1.0
+        per = max(episodes, 1)
+        return "\n".join(
+            f"{phase:>12}  {t:8.2f} s  {t * 1e3 / per:8.2f} ms/ep  {t / total:6.1%}"
+            for phase, t in self.run_totals.items()
+        )
+
+
+class RunningWindow:
+    """Mean of the last `size` values in O(1) per update (ring buffer + running sum)."""
+
+    def __init__(self, size):
+        self.size = size
+        self.values = np.zeros(size)
+        self.count = 0
+        self.total = 0.0
+
+    def __len__(self):
+        return min(self.count, self.size)
+
+    def push(self, value):
+        i = self.count % self.size
+        if self.count >= self.size:
+            self.total -= self.values[i]
+        self.values[i] = value
+        self.total += value
+        self.count += 1
+
+    def mean(self):
+        n = len(self)
+        return self.total / n if n else 0.0
+
+
+# ---------------- SINKS ----------------
+class StdoutSink:
+    """Prints every `every`-th record as one compact line."""
+
+    def __init__(self, every=1, stream=None):
+        self.every = every
+        self.stream = stream or sys.stdout
+
+    def write(self, record):
+        if record["episode"] % self.every == 0:
+            print(" | ".join(f"{k}={_fmt(v)}" for k, v in record.items()), file=self.stream)
+
+    def close(self):
+        pass
+
+
+class JsonlSink:
+    def __init__(self, path):
+        self.file = open(path, "a")
+
+    def write(self, record):
+        self.file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class CsvSink:
+    """CSV with the header taken from the first record."""
+
+    def __init__(self, path):
+        self.file = open(path, "a", newline="")
+        self.writer = None
+
+    def write(self, record):
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.file, fieldnames=list(record))
+            if self.file.tell() == 0:
+                self.writer.writeheader()
+        self.writer.writerow(record)
+
+    def close(self):
+        self.file.close()
+
+
+def open_sink(spec):
+    """Builds a sink from a CLI value: 'stdout', 'stdout:N', '*.csv' or '*.jsonl'."""
+    if spec == "stdout" or spec.startswith("stdout:"):
+        every = int(spec.split(":")[1]) if ":" in spec else 1
+        return StdoutSink(every)
+    if spec.endswith(".csv"):
+        return CsvSink(spec)
+    return JsonlSink(spec)
+
+
+def _fmt(value):
+    return f"{value:.3f}" if isinstance(value, float) else str(value)
+
+
+class TrainingMetrics:
+    """Streams one record per episode to the sinks, with rolling averages.
+
+    Rolling statistics cover the last `window` episodes and cost O(1) per
+    episode regardless of run length.
+    """
+
+    def __init__(self, sinks=(), window=100, timer=None):
+        self.sinks = list(sinks)
+        self.timer = timer
+        self.reward = RunningWindow(window)
+        self.steps = RunningWindow(window)
+        self.deaths = RunningWindow(window)
+        self.plan_failures = RunningWindow(window)
+        self.started = time.perf_counter()
+
+    def record(self, episode, result, epsilon):
+        self.reward.push(result.total_reward)
+        self.steps.push(result.steps)
+        self.deaths.push(1.0 if result.died else 0.0)
+        self.plan_failures.push(result.plan_failures)
+        if not self.sinks:
+            if self.timer:
+                self.timer.drain()
+            return
+
+        record = {
+            "episode": episode,
+            "reward": float(result.total_reward),
+            "steps": int(result.steps),
+            "died": bool(result.died),
+            "plan_failures": int(result.plan_failures),
+            "epsilon": float(epsilon),
+            "avg_reward": self.reward.mean(),
+            "avg_steps": self.steps.mean(),
+            "death_rate": self.deaths.mean(),
+            "avg_plan_failures": self.plan_failures.mean(),
+            "elapsed_s": time.perf_counter() - self.started,
+        }
+        if self.timer:
+            record.update(self.timer.drain())
+        for sink in self.sinks:
+            sink.write(record)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+# ---------------- LIVE PERFORMANCE (main.py) ----------------
+# Frames and planning calls the live statistics average over
+LIVE_WINDOW = 120
+# Seconds between refreshes of the on-screen text, so it stays readable
+LIVE_REFRESH = 0.5
+
+
+def memory_mb():
+    """(current, peak) resident set size in MB; None where the platform can't tell."""
+    current = peak = None
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak /= 2 ** 20 if sys.platform == "darwin" else 2 ** 10  # bytes on macOS, KB elsewhere
+    except ImportError:
+        pass
+    return current, peak
+
+
+class LiveStats:
+    """Runtime counters for the viewer: frame phases, simulation rate, planning latency, memory.
+
+    frame() is fed once per rendered frame with the seconds spent
+    simulating, drawing and flipping; timed() wraps a planner so every
+    call's latency is kept. snapshot() returns everything as a JSON-able
+    dict and lines() the short form the sidebar shows.
+
+    With a threaded simulation the timed planner runs on the worker thread
+    while the renderer reads the counters, so every access holds `lock`.
+    """
+
+    def __init__(self, window=LIVE_WINDOW):
+        self.lock = threading.RLock()
+        self.sim = RunningWindow(window)
+        self.draw = RunningWindow(window)
+        self.flip = RunningWindow(window)
+        self.interval = RunningWindow(window)
+        self.plan = RunningWindow(window)
+        self.last_plan = None
+        self.plans = 0
+        self._last_frame = None
+        self._rate_from = None  # (time, sim step) the steps/s rate is measured from
+        self.steps_per_sec = 0.0
+        self._lines = None
+        self._lines_at = 0.0
+
+    def timed(self, plan):
+        """Wraps a planning function so each call's duration is recorded."""
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return plan(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - t0
+                with self.lock:
+                    self.last_plan = elapsed
+                    self.plan.push(elapsed)
+                    self.plans += 1
+        return wrapper
+
+    def frame(self, sim, draw, flip, step):
+        """Records one rendered frame; `step` is the simulation's step counter."""
+        now = time.perf_counter()
+        with self.lock:
+            if self._last_frame is not None:
+                self.interval.push(now - self._last_frame)
+            self._last_frame = now
+            self.sim.push(sim)
+            self.draw.push(draw)
+            self.flip.push(flip)
+
+            if self._rate_from is None or step < self._rate_from[1]:
+                self._rate_from = (now, step)
+            elif now - self._rate_from[0] >= LIVE_REFRESH:
+                t0, s0 = self._rate_from
+                self.steps_per_sec = (step - s0) / (now - t0)
+                self._rate_from = (now, step)
+
+    def fps(self):
+        with self.lock:
+            mean = self.interval.mean()
+        return 1.0 / mean if mean else 0.0
+
+    def plan_p95(self):
+        with self.lock:
+            n = len(self.plan)
+            return float(np.percentile(self.plan.values[:n], 95)) if n else None
+
+    def snapshot(self, **context):
+        ms = lambda s: None if s is None else s * 1e3
+        rss, peak = memory_mb()
+        with self.lock:
+            return {
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "fps": self.fps(),
+                "sim_steps_per_s": self.steps_per_sec,
+                "frame_ms": {
+                    "sim": ms(self.sim.mean()),
+                    "draw": ms(self.draw.mean()),
+                    "flip": ms(self.flip.mean()),
+                    "interval": ms(self.interval.mean()),
+                },
+                "plan_ms": {"last": ms(self.last_plan), "p95": ms(self.plan_p95()),
+                            "mean": ms(self.plan.mean()), "calls": self.plans},
+                "memory_mb": {"rss": rss, "peak": peak},
+                "window_frames": LIVE_WINDOW,
+                **context,
+            }
+
+    def lines(self):
+        """Sidebar text, refreshed every LIVE_REFRESH seconds."""
+        now = time.perf_counter()
+        if self._lines is None or now - self._lines_at >= LIVE_REFRESH:
+            s = self.snapshot()
+            f, p, m = s["frame_ms"], s["plan_ms"], s["memory_mb"]
+            plan = "--" if p["last"] is None else f"{p['last']:.2f}/{p['p95']:.2f}"
+            mem = "--" if m["rss"] is None and m["peak"] is None else f"{m['rss'] or m['peak']:.0f} MB"
+            self._lines = [
+                f"FPS {s['fps']:5.1f}  SIM {s['sim_steps_per_s']:,.0f}/s",
+                f"PLAN {plan} ms p95",
+                f"SIM {f['sim']:.1f} DRW {f['draw']:.1f} FLP {f['flip']:.1f}",
+                f"MEM {mem}  [P] DUMP",
+            ]
+            self._lines_at = now
+        return self._lines
@@ -0,0 +1,205 @@
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import random
+from multiprocessing import shared_memory
+import numpy as np
+from environment import GridWorld
+from agent import VacuumAgent, STATE_SHAPE, NUM_STATES, NUM_GOALS
+from train import run_episode, EarlyStopping, MAX_EPISODES, WINDOW
+from config import *
+from qtable import QTable, POLICY_FILE
+from metrics import TrainingMetrics, open_sink
+
+# Seconds between liveness checks of the workers while waiting for a result
+RESULT_POLL = 1.0
+
+
+class SharedQTable:
+    """A QTable whose rows live in one shared-memory block.
+
+    `table` is a regular QTable over the shared buffer, so agent.learn()
+    updates it in place from any process. Every worker updates the same
+    12 rows on every step, so unlocked read-modify-writes would collide
+    constantly and lose updates; `locks` holds one lock per state row
+    (striped locking), which learn() takes around its update.
+
+    Layout: [epsilon: float64][q: NUM_STATES x NUM_GOALS float32][seen: NUM_STATES uint8]
+    """
+
+    Q_OFFSET = 8
+    SEEN_OFFSET = Q_OFFSET + NUM_STATES * NUM_GOALS * 4
+    SIZE = SEEN_OFFSET + NUM_STATES
+
+    def __init__(self, name=None, locks=None):
+        self.locks = locks if locks is not None else [mp.Lock() for _ in range(NUM_STATES)]
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.SIZE)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        buf = self.shm.buf
+        self.epsilon = np.ndarray((1,), dtype=np.float64, buffer=buf)
+        q = np.ndarray((NUM_STATES, NUM_GOALS), dtype=np.float32, buffer=buf, offset=self.Q_OFFSET)
+        seen = np.ndarray((NUM_STATES,), dtype=np.uint8, buffer=buf, offset=self.SEEN_OFFSET)
+        if name is None:
+            q.fill(0.0)
+            seen.fill(0)
+            self.epsilon[0] = EPSILON
+        self.table = QTable(STATE_SHAPE, NUM_GOALS, q, seen)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def snapshot(self):
+        """Private copy of the table, safe to keep after the block is closed."""
+        return QTable(STATE_SHAPE, NUM_GOALS, self.table.values.copy(), self.table.seen.copy())
+
+    def close(self):
+        # Views into the buffer must go before the mapping can be closed
+        del self.epsilon, self.table
+        self.shm.close()
+
+
+def _lock_updates(agent, locks):
+    """Makes the agent's Q-updates hold the row locks of the rows they write.
+
+    learn() holds the locks of its state's row and of next_state's row,
+    which it zero-fills the first time it sees it. A replay sweep may write
+    any row, so it runs after those are released, holding all of them.
+    Locks are always taken in index order, so no two workers can deadlock.
+    """
+    learn, sweep = agent.learn, agent._after_push
+    due = []
+    agent._after_push = lambda: due.append(True)
+
+    def locked_learn(state, action, reward, next_state):
+        rows = sorted({agent.q_table.index(state), agent.q_table.index(next_state)})
+        for row in rows:
+            locks[row].acquire()
+        try:
+            learn(state, action, reward, next_state)
+        finally:
+            for row in reversed(rows):
+                locks[row].release()
+        if due:
+            due.clear()
+            for lock in locks:
+                lock.acquire()
+            try:
+                sweep()
+            finally:
+                for lock in reversed(locks):
+                    lock.release()
+
+    agent.learn = locked_learn
+
+
+def _worker(name, locks, results, stop, seed, replay):
+    random.seed(seed)
+    np.random.seed(seed)
+
+    table = SharedQTable(name, locks)
+    env = GridWorld(render_mode=False, seed=seed)
+    agent = VacuumAgent(replay_capacity=replay)
+    agent.q_table = table.table
+    _lock_updates(agent, locks)
+
+    while not stop.is_set():
+        agent.epsilon = float(table.epsilon[0])
+        start_pos = env.reset()
+        results.put(run_episode(env, agent, start_pos))
+
+    agent.q_table = None
+    table.close()
+
+
+def _next_result(results, procs):
+    """Waits for the next EpisodeResult, raising if a worker died instead of reporting."""
+    while True:
+        try:
+            return results.get(timeout=RESULT_POLL)
+        except queue.Empty:
+            # Workers only exit once stop is set, so any exit here is a crash
+            for p in procs:
+                if not p.is_alive():
+                    raise RuntimeError(f"training worker {p.pid} exited with code {p.exitcode}")
+
+
+def train_parallel(workers=None, max_episodes=MAX_EPISODES, seed=0, sinks=(), policy_file=POLICY_FILE,
+                   replay=REPLAY_CAPACITY):
+    """Runs train()'s episode loop in `workers` processes over one shared Q-table.
+
+    The coordinator (this process) owns epsilon decay, logging, early
+    stopping and the final policy export; workers only play episodes
+    and report an EpisodeResult each. `replay` is each worker's own
+    replay buffer size (0: no replay).
+    """
+    workers = workers or os.cpu_count()
+    table = SharedQTable()
+    results = mp.Queue()
+    stop = mp.Event()
+    procs = [mp.Process(target=_worker, args=(table.name, table.locks, results, stop, seed + i, replay),
+                        daemon=True)
+             for i in range(workers)]
+
+    print(f"Starting parallel training with {workers} workers...")
+    for p in procs:
+        p.start()
+
+    stopper = EarlyStopping()
+    metrics = TrainingMetrics(sinks)
+    epsilon = EPSILON
+    try:
+        for ep in range(max_episodes):
+            result = _next_result(results, procs)
+
+            # -------- EPSILON DECAY --------
+            if epsilon > MIN_EPSILON:
+                epsilon *= EPSILON_DECAY
+                table.epsilon[0] = epsilon
+
+            # -------- LOGGING --------
+            metrics.record(ep, result, epsilon)
+            if ep % 1000 == 0:
+                print(f"Episode {ep} | Avg Reward (100): {metrics.reward.mean():.2f} | Epsilon: {epsilon:.3f}")
+
+            # -------- EARLY STOPPING CHECK --------
+            if stopper.update(result.total_reward):
+                print(f"\nEarly stopping triggered at episode {ep}")
+                print(f"Best {WINDOW}-episode avg reward: {stopper.best_avg:.2f}")
+                break
+    finally:
+        stop.set()
+        # Keep draining so no worker blocks on a full queue while exiting
+        while any(p.is_alive() for p in procs):
+            try:
+                results.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        for p in procs:
+            p.join()
+        metrics.close()
+        q_table = table.snapshot()
+        table.close()
+        table.shm.unlink()
+
+    q_table.save(policy_file)
+
+    print(f"Training complete. Policy saved to {policy_file}")
+    return q_table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-process Q-learning over a shared Q-table.")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--episodes", type=int, default=MAX_EPISODES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--metrics", action="append", default=[], metavar="SINK",
+                        help="per-episode metrics sink: stdout, stdout:N, FILE.jsonl or FILE.csv (repeatable)")
+    parser.add_argument("--replay", type=int, default=REPLAY_CAPACITY, metavar="N",
+                        help="replay each worker's last N transitions by prioritized sweeping (default: off)")
+    args = parser.parse_args()
+    train_parallel(args.workers, args.episodes, args.seed, [open_sink(s) for s in args.metrics],
+                   replay=args.replay)
@@ -0,0 +1,480 @@
+import heapq
+from collections import deque
+import numpy as np
+from config import *
+from bfs import wavefront
+
+
+class NavGrid:
+    """Flat, padded passability array shared by every planning engine.
+
+    Cells are stored row-major with a one-cell impassable border, so
+    neighbours are index +-1 / +-width and never need a bounds check.
+    """
+
+    def __init__(self, passable):
+        self.rows, self.cols = passable.shape
+        self.width = self.cols + 2
+        padded = np.zeros((self.rows + 2, self.width), dtype=np.uint8)
+        padded[1:-1, 1:-1] = passable
+        self.open = bytearray(padded.tobytes())
+        self.steps = (-self.width, self.width, 1, -1)  # same order as bfs.MOVES
+        self.rooms = None  # RoomGraph, built by the first "hpa" query
+
+    def index(self, cell):
+        return int((cell[0] + 1) * self.width + cell[1] + 1)
+
+    def set_open(self, cell, is_open):
+        """Opens or blocks one cell; the room graph is rebuilt by the next "hpa" query."""
+        self.open[self.index(cell)] = bool(is_open)
+        self.rooms = None
+
+    def cell(self, i):
+        return (i // self.width - 1, i % self.width - 1)
+
+    def unwind(self, parent, goal):
+        """Turns a parent map into a path of cells (start excluded)."""
+        path = []
+        i = goal
+        while parent[i] != -1:
+            path.append(self.cell(i))
+            i = parent[i]
+        return path[::-1]
+
+
+# ---------------- BFS ----------------
+def bfs_path(nav, start, targets):
+    s = nav.index(start)
+    goals = {nav.index(t) for t in targets}
+    if s in goals:
+        return []
+    open_ = nav.open
+    parent = {s: -1}
+    q = deque([s])
+    while q:
+        i = q.popleft()
+        for step in nav.steps:
+            j = i + step
+            if open_[j] and j not in parent:
+                parent[j] = i
+                if j in goals:
+                    return nav.unwind(parent, j)
+                q.append(j)
+    return []
+
+
+# ---------------- A* ----------------
+# Beyond this many targets the closest-target heuristic costs more than it saves;
+# A* and JPS then search without it (A* becomes a plain BFS)
+HEURISTIC_TARGETS = 8
+
+
+def _heuristic(nav, targets):
+    """Manhattan distance to the closest target."""
+    cells = [(r, c) for r, c in targets]
+    width = nav.width
+
+    if len(cells) == 1:
+        tr, tc = cells[0]
+
+        def h(i):
+            return abs(i // width - 1 - tr) + abs(i % width - 1 - tc)
+    else:
+        def h(i):
+            r, c = i // width - 1, i % width - 1
+            return min(abs(r - tr) + abs(c - tc) for tr, tc in cells)
+    return h
+
+
+def astar_path(nav, start, targets):
+    """A* with the Manhattan bound over a bucket queue.
+
+    f is an integer that never drops below the value being expanded, so
+    open nodes sit in one list per f value instead of a heap. Each list
+    is worked as a stack, which breaks ties toward the node found last
+    (the deepest) and runs straight at the goal across open floor.
+    """
+    s = nav.index(start)
+    goals = {nav.index(t) for t in targets}
+    if s in goals or not goals:
+        return []
+    if len(goals) > HEURISTIC_TARGETS:
+        return bfs_path(nav, start, targets)
+    open_ = nav.open
+    steps = nav.steps
+    h = _heuristic(nav, targets)
+    size = len(open_)
+    parent = {s: -1}
+    g = [size] * size  # size exceeds any path length
+    g[s] = 0
+    closed = bytearray(size)
+    f = h(s)
+    buckets = {f: [s]}
+    while buckets:
+        bucket = buckets.pop(f, None)
+        if bucket is None:
+            f += 1
+            continue
+        while bucket:
+            i = bucket.pop()
+            if closed[i]:
+                continue  # also queued under a larger f before a shorter route turned up
+            if i in goals:
+                return nav.unwind(parent, i)
+            closed[i] = 1
+            gj = g[i] + 1
+            for step in steps:
+                j = i + step
+                if open_[j] and gj < g[j]:
+                    g[j] = gj
+                    parent[j] = i
+                    fj = gj + h(j)
+                    if fj == f:
+                        bucket.append(j)
+                    elif fj in buckets:
+                        buckets[fj].append(j)
+                    else:
+                        buckets[fj] = [j]
+    return []
+
+
+# ---------------- JUMP POINT SEARCH ----------------
+def _jump(nav, i, step, goals):
+    """Follows `step` from i until a goal, a forced neighbour or a wall.
+
+    4-connected JPS: horizontal runs stop at forced neighbours; vertical
+    runs additionally stop wherever a horizontal jump would succeed.
+    """
+    open_ = nav.open
+    width = nav.width
+    vertical = step in (width, -width)
+    while True:
+        prev, i = i, i + step
+        if not open_[i]:
+            return -1
+        if i in goals:
+            return i
+        if vertical:
+            if (open_[i - 1] and not open_[prev - 1]) or (open_[i + 1] and not open_[prev + 1]):
+                return i
+            if _jump(nav, i, 1, goals) != -1 or _jump(nav, i, -1, goals) != -1:
+                return i
+        else:
+            if (open_[i - width] and not open_[prev - width]) or (open_[i + width] and not open_[prev + width]):
+                return i
+
+
+def _direction(delta, width):
+    """Unit step of a straight horizontal or vertical segment."""
+    if abs(delta) < width:
+        return 1 if delta > 0 else -1
+    return width if delta > 0 else -width
+
+
+def jps_path(nav, start, targets):
+    s = nav.index(start)
+    goals = {nav.index(t) for t in targets}
+    if s in goals or not goals:
+        return []
+    open_ = nav.open
+    width = nav.width
+    h = _heuristic(nav, targets) if len(goals) <= HEURISTIC_TARGETS else (lambda i: 0)
+    parent = {s: -1}
+    g = {s: 0}
+    heap = [(h(s), 0, s)]
+    while heap:
+        _, neg, i = heapq.heappop(heap)
+        if i in goals:
+            break
+        gi = -neg
+        if gi > g[i]:
+            continue
+
+        # Pruned directions: forward plus both perpendiculars
+        p = parent[i]
+        if p == -1:
+            dirs = nav.steps
+        else:
+            step = _direction(i - p, width)
+            side = (1, -1) if abs(step) == width else (width, -width)
+            dirs = (step,) + side
+
+        for step in dirs:
+            if not open_[i + step]:
+                continue
+            j = _jump(nav, i, step, goals)
+            if j == -1:
+                continue
+            cost = gi + (abs(j - i) // width if abs(step) == width else abs(j - i))
+            if cost < g.get(j, 1 << 30):
+                g[j] = cost
+                parent[j] = i
+                heapq.heappush(heap, (cost + h(j), -cost, j))
+    else:
+        return []
+
+    # Expand the straight segments between jump points into single cells
+    path = []
+    while parent[i] != -1:
+        p = parent[i]
+        step = _direction(i - p, width)
+        while i != p:
+            path.append(nav.cell(i))
+            i -= step
+    return path[::-1]
+
+
+# ---------------- HIERARCHICAL (HPA*) ----------------
+
+
+class RoomGraph:
+    """Rooms, doors and door-to-door costs for one NavGrid, in the style of HPA*.
+
+    A door is an open cell squeezed between obstacles on one axis and open
+    on the other; rooms are the connected components left once doors are
+    removed. Each door keeps a distance field into every room it touches,
+    so abstract edge costs and local refinement are both table lookups and
+    a query only floods the start room (and only if a target is in it).
+    """
+
+    def __init__(self, nav):
+        self.nav = nav
+        width = nav.width
+        open_ = np.frombuffer(bytes(nav.open), dtype=np.uint8).astype(bool)
+        up, down = np.roll(open_, width), np.roll(open_, -width)
+        left, right = np.roll(open_, 1), np.roll(open_, -1)
+        is_door = open_ & ((~left & ~right & up & down) | (~up & ~down & left & right))
+
+        self.room, self.room_cells = self._label(open_ & ~is_door)
+        self.local = [-1] * len(open_)  # flat index -> position in its room's cell list
+        for cells in self.room_cells:
+            for k, i in enumerate(cells):
+                self.local[i] = k
+
+        # Door -> {room: [neighbour cells in that room]}
+        self.doors = {int(d): {} for d in np.flatnonzero(is_door)}
+        for d, sides in self.doors.items():
+            for step in nav.steps:
+                r = self.room[d + step]
+                if r >= 0:
+                    sides.setdefault(r, []).append(d + step)
+
+        self.room_doors = {}
+        for d, sides in self.doors.items():
+            for r in sides:
+                self.room_doors.setdefault(r, []).append(d)
+
+        self.fields = {}  # (door, room) -> distance from the door to each room cell
+        for r, doors in self.room_doors.items():
+            self._room_fields(r, doors)
+
+        # Abstract graph: door -> [(door, cost, room crossed or -1 when adjacent)]
+        self.edges = {d: [] for d in self.doors}
+        for d in self.doors:
+            for step in nav.steps:
+                if d + step in self.doors:
+                    self.edges[d].append((d + step, 1, -1))
+        for r, doors in self.room_doors.items():
+            for a in doors:
+                for b in doors:
+                    if a != b:
+                        field = self.fields[b, r]
+                        cost = min(field[self.local[n]] for n in self.doors[a][r]) + 1
+                        self.edges[a].append((b, int(cost), r))
+
+    def _label(self, free):
+        """Connected components of `free` (flat); returns (room per cell, cells per room)."""
+        free = free.tolist()
+        room = [-1] * len(free)
+        rooms = []
+        steps = self.nav.steps
+        for s, ok in enumerate(free):
+            if not ok or room[s] != -1:
+                continue
+            rid = len(rooms)
+            room[s] = rid
+            cells = [s]
+            stack = [s]
+            while stack:
+                i = stack.pop()
+                for step in steps:
+                    j = i + step
+                    if free[j] and room[j] == -1:
+                        room[j] = rid
+                        cells.append(j)
+                        stack.append(j)
+            rooms.append(cells)
+        return room, rooms
+
+    def _room_fields(self, r, doors):
+        """One wavefront pass over the room's bounding box for all of its doors."""
+        width = self.nav.width
+        cells = np.array(self.room_cells[r])
+        rr, cc = cells // width, cells % width
+        r0, c0 = rr.min(), cc.min()
+        rr, cc = rr - r0, cc - c0
+        passable = np.zeros((rr.max() + 1, cc.max() + 1), dtype=bool)
+        passable[rr, cc] = True
+
+        sources = np.zeros((len(doors),) + passable.shape, dtype=bool)
+        for k, d in enumerate(doors):
+            for n in self.doors[d][r]:
+                sources[k, n // width - r0, n % width - c0] = True
+        dist = wavefront(passable, sources)
+        for k, d in enumerate(doors):
+            self.fields[d, r] = dist[k, rr, cc] + 1
+
+    # ---------------- QUERY ----------------
+    def path(self, start, targets):
+        """Same contract as the other engines: cells after start to the nearest target."""
+        nav = self.nav
+        room, local, fields = self.room, self.local, self.fields
+        s = nav.index(start)
+        goals = {nav.index(t) for t in targets}
+        if s in goals or not goals:
+            return []
+
+        door_goals = set()
+        room_goals = {}  # room -> (flat indices, local indices)
+        for t in goals:
+            if room[t] >= 0:
+                room_goals.setdefault(room[t], []).append(t)
+            elif t in self.doors:
+                door_goals.add(t)
+        room_goals = {r: (ts, np.array([local[t] for t in ts])) for r, ts in room_goals.items()}
+
+        # A* over doors; the Manhattan bound only pays off for a few targets
+        h = _heuristic(nav, targets) if len(goals) <= HEURISTIC_TARGETS else (lambda i: 0)
+        best_cost, best = 1 << 30, None
+        parent = {}
+        g = {}
+        heap = []
+        if s in self.doors:
+            g[s] = 0
+            parent[s] = None
+            heap.append((h(s), 0, s))
+        elif room[s] >= 0:
+            r = room[s]
+            for d in self.room_doors.get(r, ()):
+                cost = int(fields[d, r][local[s]])
+                g[d] = cost
+                parent[d] = (None, r)  # reached straight from the start cell
+                heapq.heappush(heap, (cost + h(d), cost, d))
+            if r in room_goals:
+                direct = self._flood(s, r, set(room_goals[r][0]))
+                if direct:
+                    best_cost, best = len(direct), direct
+        else:
+            return []
+
+        # A goal is settled once no open door can beat it
+        end = None
+        while heap:
+            fi, gi, d = heapq.heappop(heap)
+            if fi >= best_cost:
+                break
+            if gi > g[d]:
+                continue
+            if d in door_goals:
+                best_cost, end = gi, (d, -1, -1)
+                continue
+            for r in self.doors[d]:
+                if r in room_goals:
+                    ts, locs = room_goals[r]
+                    dists = fields[d, r][locs]
+                    k = int(np.argmin(dists))
+                    if gi + dists[k] < best_cost:
+                        best_cost, end = gi + int(dists[k]), (d, r, ts[k])
+            for d2, cost, r in self.edges[d]:
+                if gi + cost < g.get(d2, 1 << 30):
+                    g[d2] = gi + cost
+                    parent[d2] = (d, r)
+                    heapq.heappush(heap, (gi + cost + h(d2), gi + cost, d2))
+
+        if end is None:
+            return [nav.cell(i) for i in best] if best else []
+        return [nav.cell(i) for i in self._refine(s, parent, end)]
+
+    def _flood(self, s, r, goals):
+        """BFS from s that stays inside room r; flat-index path to the nearest goal."""
+        room = self.room
+        parent = {s: -1}
+        q = deque([s])
+        while q:
+            i = q.popleft()
+            for step in self.nav.steps:
+                j = i + step
+                if room[j] == r and j not in parent:
+                    parent[j] = i
+                    if j in goals:
+                        path = []
+                        while j != s:
+                            path.append(j)
+                            j = parent[j]
+                        return path[::-1]
+                    q.append(j)
+        return []
+
+    def _descend(self, i, door, r):
+        """Flat cells after i on a shortest walk inside room r to `door` (door included)."""
+        room, local = self.room, self.local
+        field = self.fields[door, r]
+        f = field[local[i]]
+        path = []
+        while f > 1:
+            for step in self.nav.steps:
+                j = i + step
+                if room[j] == r and field[local[j]] == f - 1:
+                    i, f = j, f - 1
+                    break
+            path.append(i)
+        path.append(door)
+        return path
+
+    def _refine(self, s, parent, end):
+        """Expands the door chain found by path() into single cells."""
+        last, r_end, target = end
+        chain = [last]
+        while parent[chain[-1]] is not None and parent[chain[-1]][0] is not None:
+            chain.append(parent[chain[-1]][0])
+        chain.reverse()
+
+        path = []
+        if parent[chain[0]] is not None:
+            path += self._descend(s, chain[0], parent[chain[0]][1])
+        for a, b in zip(chain, chain[1:]):
+            r = parent[b][1]
+            if r == -1:
+                path.append(b)
+            else:
+                field = self.fields[b, r]
+                n = min(self.doors[a][r], key=lambda c: field[self.local[c]])
+                path += [n] + self._descend(n, b, r)
+        if r_end != -1:
+            # Walk target -> door on the door's field, then reverse it
+            back = self._descend(target, last, r_end)
+            path += back[-2::-1] + [target]
+        return path
+
+
+def hpa_path(nav, start, targets):
+    if nav.rooms is None:
+        nav.rooms = RoomGraph(nav)
+    return nav.rooms.path(start, targets)
+
+
+ENGINES = {
+    "bfs": bfs_path,
+    "astar": astar_path,
+    "jps": jps_path,
+    "hpa": hpa_path,
+}
+
+
+def find_path(nav, start, targets, engine=PLANNER):
+    """Shortest path from start to the nearest target using the named engine.
+
+    Returns the cells after start, or [] when start is already a target or
+    no target is reachable.
+    """
+    return ENGINES[engine](nav, start, targets)
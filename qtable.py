@@ -0,0 +1,137 @@
+import os
+import pickle
+import sys
+import numpy as np
+
+# Bump when the on-disk record layout changes
+FORMAT_VERSION = 1
+POLICY_FILE = "brain.npy"
+
+
+def _record_dtype(shape, num_actions):
+    """One .npy record: version, state-space shape, seen mask, Q-values."""
+    return np.dtype([
+        ("version", "<u4"),
+        ("shape", "<u4", (len(shape),)),
+        ("seen", "u1", shape),
+        ("q", "<f4", tuple(shape) + (num_actions,)),
+    ])
+
+
+class QTable:
+    """Dense Q-table: one contiguous float32 row per state of a fixed state space.
+
+    States are tuples of small ints, one per axis of `shape`, and map to a
+    row with np.ravel_multi_index. It supports the dict operations
+    VacuumAgent relies on (`in`, `[]`, `[] =`, items()). A state reads as
+    zeros until it is first assigned, which is also when `in` starts
+    returning True.
+    """
+
+    def __init__(self, shape, num_actions, values=None, seen=None):
+        self.shape = tuple(int(n) for n in shape)
+        self.num_actions = int(num_actions)
+        num_states = int(np.prod(self.shape))
+        if values is None:
+            values = np.zeros((num_states, self.num_actions), dtype=np.float32)
+        if seen is None:
+            seen = np.zeros(num_states, dtype=np.uint8)
+        self.values = values
+        self.seen = seen
+        self._rows = {}  # state tuple -> row, memoised (ravel_multi_index is slow per call)
+
+    # ---------------- INDEXING ----------------
+    def index(self, state):
+        row = self._rows.get(state)
+        if row is None:
+            row = self._rows[state] = int(np.ravel_multi_index(tuple(state), self.shape))
+        return row
+
+    def indices(self, states):
+        """Row indices for an (N, ndim) array of states."""
+        return np.ravel_multi_index(np.asarray(states).T, self.shape)
+
+    def state(self, index):
+        return tuple(int(v) for v in np.unravel_index(index, self.shape))
+
+    # ---------------- DICT INTERFACE ----------------
+    def __len__(self):
+        return int(np.count_nonzero(self.seen))
+
+    def __contains__(self, state):
+        return bool(self.seen[self.index(state)])
+
+    def __getitem__(self, state):
+        return self.values[self.index(state)]
+
+    def __setitem__(self, state, row):
+        i = self.index(state)
+        self.values[i] = row
+        self.seen[i] = 1
+
+    def items(self):
+        for i in np.flatnonzero(self.seen):
+            yield self.state(i), self.values[i]
+
+    def to_dict(self):
+        return {s: np.array(q, dtype=np.float64) for s, q in self.items()}
+
+    @classmethod
+    def from_dict(cls, table, shape, num_actions):
+        q = cls(shape, num_actions)
+        for state, row in table.items():
+            q[state] = row
+        return q
+
+    # ---------------- PERSISTENCE ----------------
+    def save(self, path=POLICY_FILE):
+        """Writes a single-record .npy file atomically (temp file + rename)."""
+        record = np.zeros(1, dtype=_record_dtype(self.shape, self.num_actions))
+        record["version"] = FORMAT_VERSION
+        record["shape"] = self.shape
+        record["seen"] = self.seen.reshape(self.shape)
+        record["q"] = self.values.reshape(self.shape + (self.num_actions,))
+
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, record)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=POLICY_FILE, mmap=False):
+        """Loads a saved table; with mmap=True the rows stay a read-only file mapping."""
+        record = np.load(path, mmap_mode="r" if mmap else None)
+        version = int(record["version"][0])
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path}: Q-table format v{version}, expected v{FORMAT_VERSION}")
+
+        shape = tuple(int(n) for n in record["shape"][0])
+        q = record["q"][0]
+        num_actions = q.shape[-1]
+        values = q.reshape(-1, num_actions)
+        seen = record["seen"][0].reshape(-1)
+        if not mmap:
+            values, seen = values.copy(), seen.copy()
+        return cls(shape, num_actions, values, seen)
+
+
+def convert_pickle(src="brain.pkl", dst=POLICY_FILE):
+    """One-time migration of a pickled {state: q-values} dict to the .npy format.
+
+    Only run this on brain.pkl files you produced yourself: unpickling can
+    execute arbitrary code.
+    """
+    from agent import STATE_SHAPE, NUM_GOALS
+
+    with open(src, "rb") as f:
+        table = pickle.load(f)
+    q = QTable.from_dict(table, STATE_SHAPE, NUM_GOALS)
+    q.save(dst)
+    return q
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else "brain.pkl"
+    dst = sys.argv[2] if len(sys.argv) > 2 else POLICY_FILE
+    converted = convert_pickle(src, dst)
+    print(f"Converted {len(converted)} states from {src} to {dst}")
@@ -0,0 +1,136 @@
+import os
+import numpy as np
+import pygame
+from config import *
+from dashboard import render_text
+
+# Tiles that change during a run; everything else lives in the cached background
+DYNAMIC_TILES = [DIRT]
+
+
+class GridRenderer:
+    """Pygame view of a GridWorld. Imported lazily by GridWorld(render_mode=True)."""
+
+    def __init__(self, env):
+        self.env = env
+        pygame.init()
+        self.width = env.cols * CELL_SIZE
+        self.height = env.rows * CELL_SIZE + 60
+        self.screen = pygame.display.set_mode((self.width, self.height))
+        pygame.display.set_caption("Vacuum AI - Sensible House Layout")
+        self.assets = {}
+        self.load_assets()
+
+        self.background = None
+        self._static = None  # layout the background was built from
+        self._drawn = None   # grid as of the last frame
+        self._robots = []    # robot cells as of the last frame
+        self._target = None  # surface the last frame went to
+
+    def load_assets(self):
+        def load_img(filename):
+            path = os.path.join("assets", filename)
+            if not os.path.exists(path): return None
+            img = pygame.image.load(path).convert_alpha()
+            return pygame.transform.scale(img, (CELL_SIZE, CELL_SIZE))
+
+        self.assets['floor'] = load_img("floor.png")
+        self.assets['robot'] = load_img("robot.png")
+        self.assets[DIRT] = load_img("dirts.png")
+        self.assets[CHARGER] = load_img("charger.png")
+        self.assets[BIN] = load_img("bin.png")
+        self.assets[WALL] = load_img("wall.png")
+        self.assets[WALL_UP] = load_img("wall_up.png")
+        self.assets[WALL_DOWN] = load_img("wall_down.png")
+        self.assets[SOFA_1] = load_img("sofa1.png")
+        self.assets[SOFA_2] = load_img("sofa2.png")
+        self.assets[CHAIR_UP] = load_img("chair_up.png")
+        self.assets[CHAIR_DOWN] = load_img("chair_down.png")
+        self.assets[TABLE] = load_img("table.png")
+        self.assets[BED] = load_img("bed.png")
+
+    # ---------------- CACHED BACKGROUND ----------------
+    def _paint(self, surface, tile, r, c):
+        pos = (c * CELL_SIZE, r * CELL_SIZE)
+        if tile in self.assets and self.assets[tile]:
+            surface.blit(self.assets[tile], pos)
+        else:
+            color = BLACK
+            if tile == DIRT:
+                color = BROWN
+            elif tile == CHARGER:
+                color = GREEN
+            elif tile == BIN:
+                color = RED
+            elif tile in [SOFA_1, SOFA_2]:
+                color = BLUE
+            pygame.draw.rect(surface, color, (pos[0], pos[1], CELL_SIZE, CELL_SIZE))
+
+    def _build_background(self, static):
+        """Floor plus walls, furniture and utilities, composited once per layout."""
+        env = self.env
+        self.background = pygame.Surface((env.cols * CELL_SIZE, env.rows * CELL_SIZE)).convert()
+        if self.assets.get('floor'):
+            for r in range(env.rows):
+                for c in range(env.cols):
+                    self.background.blit(self.assets['floor'], (c * CELL_SIZE, r * CELL_SIZE))
+        else:
+            self.background.fill(WHITE)
+        for r, c in np.argwhere(static != EMPTY):
+            self._paint(self.background, static[r, c], r, c)
+        self._static = static
+
+    # ---------------- DIRTY-RECT DRAW ----------------
+    def draw(self, agent=None, robots=None):
+        """Redraws only cells that changed since the last frame.
+
+        `robots` draws several numbered robots instead of the single agent.
+        Returns the dirty rects in screen coordinates. When drawing straight
+        to the window they are pushed with display.update(); otherwise the
+        caller composes the surface and decides what to update.
+        """
+        env = self.env
+        grid = env.grid
+        dynamic = np.isin(grid, DYNAMIC_TILES)
+        static = np.where(dynamic, EMPTY, grid)
+        if robots is None:
+            robots = [agent] if agent else []
+        cells_now = [(r.x, r.y) for r in robots]
+
+        layout_changed = self._static is None or not np.array_equal(static, self._static)
+        if layout_changed:
+            self._build_background(static)
+
+        # Full repaint on the first frame, a new layout or a new target surface
+        if layout_changed or self._target is not self.screen:
+            self.screen.blit(self.background, (0, 0))
+            self._target = self.screen
+            cells = np.argwhere(dynamic).tolist()
+            rects = [self.background.get_rect()]
+        else:
+            cells = np.argwhere(grid != self._drawn).tolist()
+            cells += self._robots + cells_now
+            rects = [pygame.Rect(c * CELL_SIZE, r * CELL_SIZE, CELL_SIZE, CELL_SIZE) for r, c in cells]
+
+        for r, c in cells:
+            rect = (c * CELL_SIZE, r * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+            self.screen.blit(self.background, rect, rect)
+            if dynamic[r, c]:
+                self._paint(self.screen, grid[r, c], r, c)
+
+        for i, (x, y) in enumerate(cells_now):
+            if self.assets.get('robot'):
+                self.screen.blit(self.assets['robot'], (y * CELL_SIZE, x * CELL_SIZE))
+            else:
+                rect = (y * CELL_SIZE + 5, x * CELL_SIZE + 5, CELL_SIZE - 10, CELL_SIZE - 10)
+                pygame.draw.rect(self.screen, BLUE, rect)
+            if len(cells_now) > 1:
+                label = render_text(str(i + 1), 'Arial', 18, YELLOW, bold=True)
+                self.screen.blit(label, (y * CELL_SIZE + 2, x * CELL_SIZE))
+
+        self._drawn = grid.copy()
+        self._robots = cells_now
+
+        if self.screen is pygame.display.get_surface():
+            pygame.display.update(rects)
+        return rects
@@ -0,0 +1,116 @@
+import numpy as np
+from config import *
+
+# One stored transition; states are QTable row indices
+TRANSITION_DTYPE = np.dtype([
+    ("state", "<u4"),
+    ("action", "u1"),
+    ("reward", "<f4"),
+    ("next_state", "<u4"),
+])
+
+
+class ReplayBuffer:
+    """Ring buffer of the last `capacity` transitions, replayed by prioritized sweeping.
+
+    Alongside the raw transitions it keeps, for every (state, action), the
+    reward sum and next-state counts of the transitions currently held, i.e.
+    the empirical model of the environment. Those are updated in O(1) per
+    push and eviction, so a sweep works on NUM_STATES x NUM_ACTIONS
+    expected TD errors instead of touching every stored transition:
+
+        td(s, a) = mean reward + DISCOUNT_FACTOR * E[max Q(s')] - Q(s, a)
+
+    Each pass updates the `pairs` pairs with the largest |td|; the next pass
+    recomputes td, which carries a changed value back to the pairs leading
+    into it (the predecessors).
+    """
+
+    def __init__(self, capacity, num_states, num_actions):
+        self.capacity = int(capacity)
+        self.data = np.zeros(self.capacity, dtype=TRANSITION_DTYPE)
+        # Plain field views: per-element access is much cheaper than through records
+        self._fields = tuple(self.data[name] for name in TRANSITION_DTYPE.names)
+        self.head = 0  # next slot to write
+        self.size = 0
+        # Empirical model, one row per (state, action) = state * num_actions + action
+        self.num_actions = num_actions
+        self.counts = np.zeros((num_states * num_actions, num_states))
+        self.visits = np.zeros(num_states * num_actions)
+        self.reward_sum = np.zeros(num_states * num_actions)
+
+    def __len__(self):
+        return self.size
+
+    def push(self, state, action, reward, next_state):
+        """Stores one transition (row indices), evicting the oldest when full."""
+        i = self.head
+        s, a, r, ns = self._fields
+        if self.size == self.capacity:
+            old = s[i] * self.num_actions + a[i]
+            self.counts[old, ns[i]] -= 1
+            self.visits[old] -= 1
+            self.reward_sum[old] -= r[i]
+        else:
+            self.size += 1
+        s[i], a[i], r[i], ns[i] = state, action, reward, next_state
+        pair = state * self.num_actions + action
+        self.counts[pair, next_state] += 1
+        self.visits[pair] += 1
+        self.reward_sum[pair] += r[i]
+        self.head = (i + 1) % self.capacity
+
+    def push_batch(self, states, actions, rewards, next_states):
+        """Stores N transitions at once (arrays of row indices)."""
+        n = len(states)
+        if n > self.capacity:
+            states, actions, rewards, next_states = (a[-self.capacity:] for a in (states, actions, rewards, next_states))
+            n = self.capacity
+        slots = (self.head + np.arange(n)) % self.capacity
+        old = self.data[slots[slots < self.size]]  # slots below size hold live transitions
+        self._count(old, -1)
+
+        new = np.empty(n, dtype=TRANSITION_DTYPE)
+        new["state"], new["action"], new["reward"], new["next_state"] = states, actions, rewards, next_states
+        self.data[slots] = new
+        self._count(new, 1)
+        self.head = int((self.head + n) % self.capacity)
+        self.size = min(self.capacity, self.size + n)
+
+    def _count(self, records, sign):
+        pairs = records["state"].astype(np.int64) * self.num_actions + records["action"]
+        np.add.at(self.counts, (pairs, records["next_state"]), sign)
+        np.add.at(self.visits, pairs, sign)
+        np.add.at(self.reward_sum, pairs, sign * records["reward"].astype(np.float64))
+
+    def model(self):
+        """(mean reward, next-state distribution) per (state, action) row; zeros where unvisited."""
+        seen = self.visits > 0
+        inv = np.divide(1.0, self.visits, out=np.zeros_like(self.visits), where=seen)
+        return self.reward_sum * inv, self.counts * inv[:, None], seen
+
+    def td_errors(self, table, model=None, discount=DISCOUNT_FACTOR):
+        """Expected TD error per (state, action) row under the buffered model; 0 where unvisited."""
+        reward, transition, seen = model or self.model()
+        q = table.values.ravel()
+        td = reward + discount * (transition @ table.values.max(axis=1)) - q
+        td[~seen] = 0.0
+        return td
+
+    def sweep(self, table, passes=REPLAY_SWEEPS, pairs=REPLAY_PAIRS, min_priority=REPLAY_MIN_PRIORITY,
+              learning_rate=LEARNING_RATE, discount=DISCOUNT_FACTOR):
+        """Runs up to `passes` prioritized update passes; returns how many updates were made."""
+        model = self.model()
+        q = table.values.ravel()
+        updates = 0
+        for _ in range(passes):
+            td = self.td_errors(table, model, discount)
+            priority = np.abs(td)
+            top = np.argsort(priority)[-pairs:]
+            top = top[priority[top] > min_priority]
+            if len(top) == 0:
+                break
+            q[top] += learning_rate * td[top]
+            table.seen[top // self.num_actions] = 1
+            updates += len(top)
+        return updates
@@ -0,0 +1,169 @@
+"""The viewer's simulation loop, independent of pygame so it can run on a worker thread."""
+import threading
+import time
+import numpy as np
+from config import *
+from trajectory import Frame
+
+
+def decide(env, agent, plan=None):
+    """Greedy goal choice with plan fallbacks, as the viewer has always run it.
+
+    plan(agent, goal) -> bool makes the path; it defaults to agent.plan so a
+    fleet can substitute a shared planner.
+    """
+    if plan is None:
+        plan = lambda a, g: a.plan(env, g)
+    state = agent.get_state(env)
+
+    # --- CHARGING TRAP LOGIC ---
+    is_charging = False
+    if env.grid[agent.x][agent.y] == CHARGER and agent.battery < MAX_BATTERY:
+        agent.current_goal = 2  # Force status to CHARGING
+        agent.current_path.clear()  # Clear path so it doesn't move
+        is_charging = True
+
+    # Standard Decision Logic
+    if not is_charging:
+        if agent.current_goal is None or not agent.current_path:
+            if state in agent.q_table:
+                goal = np.argmax(agent.q_table[state])
+            else:
+                goal = 0
+
+            if agent.current_goal != goal or not agent.current_path:
+                agent.current_goal = goal
+                success = plan(agent, goal)
+                if not success:
+                    if plan(agent, 0):
+                        agent.current_goal = 0
+                    elif plan(agent, 1):
+                        agent.current_goal = 1
+                    elif plan(agent, 2):
+                        agent.current_goal = 2
+
+
+class Simulation:
+    """main.py's greedy run loop, one step at a time.
+
+    The environment is generated once and kept between runs; each run puts
+    the agent back on the charger with a full battery and an empty bin.
+    """
+
+    def __init__(self, env, agent, recorder=None):
+        self.env = env
+        self.agent = agent
+        self.recorder = recorder
+        self.run = 1
+        self.steps = 0
+        self.done = False
+        self._end_requested = False
+
+        print("--- GENERATING MAP (PERSISTENT) ---")
+        self.start_pos = env.reset()
+        self.begin_run()
+
+    def begin_run(self):
+        agent = self.agent
+        agent.x, agent.y = self.start_pos
+        agent.battery = MAX_BATTERY  # Uses 500 from config
+        agent.bin = 0
+        agent.is_alive = True
+        agent.current_path.clear()
+        agent.current_goal = None
+        self.done = False
+        self._end_requested = False
+        print(f"--- Starting Run #{self.run} ---")
+
+    def end_run(self):
+        """Asks the current run to stop before its next step (safe from another thread)."""
+        self._end_requested = True
+
+    def step(self):
+        """Advances one sim step; returns True once the run is over."""
+        env, agent = self.env, self.agent
+        if self._end_requested:
+            self.done = True
+            return True
+
+        # --- 1. RANDOM DIRT SPAWN ---
+        # This calls the function in your environment.py (approx 1% chance per frame)
+        env.random_dirt_spawn()
+
+        decide(env, agent)
+
+        # Execute
+        r1, died = agent.move_step(env)
+        r2 = agent.interact(env)
+
+        if died:
+            self.done = True
+            print("Agent died (Battery Depleted)")
+
+        self.steps += 1
+        if self.recorder:
+            self.recorder.record(env, agent, self.run)
+        return self.done
+
+    def advance(self, steps, budget=None):
+        """Runs `steps` steps, or as many as fit in `budget` seconds when steps is 0.
+
+        A finished run is followed straight away by the next one. Returns
+        how many runs finished, so callers can pause between them.
+        """
+        finished = 0
+        deadline = time.perf_counter() + (budget or 0)
+        n = 0
+        while (n < steps) if steps else (time.perf_counter() < deadline):
+            if self.step():
+                finished += 1
+                self.run += 1
+                self.begin_run()
+            n += 1
+        return finished
+
+    def snapshot(self):
+        """Copy of the current state, safe to draw while the simulation moves on."""
+        agent = self.agent
+        return Frame(self.steps, self.env.grid.copy(), agent.x, agent.y, agent.current_goal,
+                     agent.battery, agent.bin, agent.is_alive, self.run)
+
+
+class SimWorker(threading.Thread):
+    """Steps a Simulation on its own thread and publishes snapshots.
+
+    `steps_per_frame` (0 = uncapped) may be changed at any time; the worker
+    runs that many steps every 1 / RENDER_FPS seconds and replaces `latest`
+    after each batch, so the renderer always sees a consistent state.
+    """
+
+    def __init__(self, sim, steps_per_frame=1, run_pause=1.0):
+        super().__init__(daemon=True)
+        self.sim = sim
+        self.steps_per_frame = steps_per_frame
+        self.run_pause = run_pause
+        self.latest = sim.snapshot()
+        self._halt = threading.Event()
+
+    def run(self):
+        frame_time = 1.0 / RENDER_FPS
+        next_tick = time.perf_counter()
+        while not self._halt.is_set():
+            steps = self.steps_per_frame
+            finished = self.sim.advance(steps, budget=frame_time)
+            self.latest = self.sim.snapshot()
+
+            # Pause between runs at normal speed, like the single-threaded viewer
+            if finished and steps == 1 and self._halt.wait(self.run_pause):
+                break
+            next_tick += frame_time
+            delay = next_tick - time.perf_counter()
+            if steps and delay > 0:
+                self._halt.wait(delay)
+            else:
+                next_tick = time.perf_counter()
+                time.sleep(0)  # uncapped: let the renderer take the GIL between batches
+
+    def stop(self):
+        self._halt.set()
+        self.join()
@@ -0,0 +1,243 @@
+"""Hyperparameter sweeps over the agent's Hyperparams, one training run per trial in a process pool.
+
+    python sweep.py --param LEARNING_RATE=0.05,0.15,0.3 --param DISCOUNT_FACTOR=0.9,0.95
+    python sweep.py --random 40 --param LEARNING_RATE=log:0.01:0.5 --param EPSILON_DECAY=0.995:0.9995
+
+A value list (a,b,c) is a grid axis; lo:hi and log:lo:hi are ranges for
+--random search, which may also draw from lists. Trial i trains with seed
++ i, is pruned at every WINDOW episodes if its average training reward is
+below the median of the trials that reached that point with the same
+reward constants, and is then scored on held-out houses with the greedy
+policy. One row per trial goes to --out as it finishes. Parameters are
+named as in config.py and reach the trial as a Hyperparams passed to its
+VacuumAgent; config itself is never changed.
+
+Pruning compares a trial with whichever trials reached the same point
+before it, which with several workers depends on the order they finish.
+A sweep with a fixed --seed is only reproducible with --workers 1 or
+--no-prune.
+"""
+import argparse
+import itertools
+import math
+import multiprocessing as mp
+import os
+import random
+import threading
+import time
+import numpy as np
+from environment import GridWorld
+from agent import VacuumAgent, DEFAULT_PARAMS
+from config import *
+from train import EarlyStopping, run_episode, WINDOW
+from evaluate import run_greedy_episode, EPISODE_DTYPE, MAX_STEPS
+from metrics import open_sink
+
+# config.py names of the Hyperparams fields
+DEFAULTS = {name.upper(): value for name, value in DEFAULT_PARAMS._asdict().items()}
+SWEEPABLE = tuple(DEFAULTS)
+
+TRIAL_EPISODES = 3000
+# Trials that must reach a pruning point before others are compared against them
+PRUNE_MIN_TRIALS = 4
+# Greedy evaluation after training, on seeds no trial trains on
+EVAL_EPISODES = 50
+EVAL_SEED = 1_000_000
+
+# Worker-process state, set by _init_worker
+_rungs = None
+_lock = None
+
+
+# ---------------- SEARCH SPACE ----------------
+def parse_param(spec):
+    """'NAME=a,b,c' -> (NAME, [a, b, c]); 'NAME=lo:hi' / 'NAME=log:lo:hi' -> (NAME, (scale, lo, hi))."""
+    name, _, values = spec.partition("=")
+    if name not in SWEEPABLE:
+        raise ValueError(f"{name!r} is not sweepable; choose from {', '.join(SWEEPABLE)}")
+    if ":" in values:
+        parts = values.split(":")
+        scale = parts.pop(0) if parts[0] in ("log", "lin") else "lin"
+        lo, hi = map(float, parts)
+        if scale == "log" and lo <= 0:
+            raise ValueError(f"{name}: log range needs lo > 0")
+        return name, (scale, lo, hi)
+    return name, [float(v) for v in values.split(",")]
+
+
+def grid_trials(space):
+    """Cartesian product of the value lists."""
+    for name, values in space.items():
+        if not isinstance(values, list):
+            raise ValueError(f"{name}: ranges need --random")
+    names = list(space)
+    return [dict(zip(names, combo)) for combo in itertools.product(*space.values())]
+
+
+def random_trials(space, count, seed=0):
+    rng = np.random.default_rng(seed)
+    trials = []
+    for _ in range(count):
+        params = {}
+        for name, values in space.items():
+            if isinstance(values, list):
+                params[name] = values[rng.integers(len(values))]
+            else:
+                scale, lo, hi = values
+                if scale == "log":
+                    params[name] = float(math.exp(rng.uniform(math.log(lo), math.log(hi))))
+                else:
+                    params[name] = float(rng.uniform(lo, hi))
+        trials.append(params)
+    return trials
+
+
+# ---------------- TRIALS ----------------
+def make_params(params):
+    """The agent's Hyperparams with a trial's swept values in place of the defaults."""
+    return DEFAULT_PARAMS._replace(**{name.lower(): _typed(name, value) for name, value in params.items()})
+
+
+def _typed(name, value):
+    """Integer constants stay ints when the swept value is whole."""
+    if isinstance(DEFAULTS[name], int) and float(value).is_integer():
+        return int(value)
+    return float(value)
+
+
+def _reward_key(params):
+    """Trials are only compared on training reward when their reward constants match."""
+    return tuple(sorted((k, v) for k, v in params.items() if k.startswith("REWARD_")))
+
+
+def _should_prune(key, episode, avg):
+    """Median rule: records avg at this point and reports whether it is below the peers' median."""
+    rung = (key, episode)
+    with _lock:
+        peers = _rungs.get(rung, [])
+        _rungs[rung] = peers + [avg]
+    return len(peers) >= PRUNE_MIN_TRIALS and avg < float(np.median(peers))
+
+
+def trial_score(results):
+    """Higher is better, independent of the reward constants.
+
+    A clean house scores 1 - steps / MAX_STEPS (faster is better), an
+    unfinished one its coverage - 1 and a death -1; the score is the mean.
+    """
+    coverage = results["cleaned"] / np.maximum(results["dirt_seen"], 1)
+    score = np.where(results["steps_to_clean"] >= 0, 1 - results["steps_to_clean"] / MAX_STEPS, coverage - 1)
+    score = np.where(results["died"], -1.0, score)
+    return float(score.mean())
+
+
+def run_trial(trial):
+    """Trains one configuration and evaluates it; returns a results row."""
+    tid, seed, params, episodes, layout, prune = trial
+    hyper = make_params(params)
+    start = time.perf_counter()
+    random.seed(seed)
+    np.random.seed(seed)
+
+    env = GridWorld(render_mode=False, layout=layout, seed=seed)
+    agent = VacuumAgent(params=hyper)
+    stopper = EarlyStopping()
+    key = _reward_key(params)
+    status = "complete"
+    ep = 0
+    while ep < episodes:
+        result = run_episode(env, agent, env.reset())
+        ep += 1
+        if agent.epsilon > hyper.min_epsilon:
+            agent.epsilon *= hyper.epsilon_decay
+        if stopper.update(result.total_reward):
+            status = "stopped"
+            break
+        if prune and ep % WINDOW == 0 and ep < episodes and _should_prune(key, ep, stopper.recent.mean()):
+            status = "pruned"
+            break
+
+    agent.epsilon = 0.0
+    evals = np.array([run_greedy_episode(env, agent, EVAL_SEED + i) for i in range(EVAL_EPISODES)],
+                     dtype=EPISODE_DTYPE)
+    clean = evals["steps_to_clean"] >= 0
+    row = {"trial": tid, "seed": seed, **{name: _typed(name, params[name]) for name in sorted(params)}}
+    row.update({
+        "status": status,
+        "episodes": ep,
+        "avg_reward": stopper.recent.mean(),
+        "score": trial_score(evals),
+        "coverage": float((evals["cleaned"] / np.maximum(evals["dirt_seen"], 1)).mean()),
+        "clean_rate": float(clean.mean()),
+        "death_rate": float(evals["died"].mean()),
+        "steps_to_clean": float(evals["steps_to_clean"][clean].mean()) if clean.any() else float("nan"),
+        "elapsed_s": time.perf_counter() - start,
+    })
+    return row
+
+
+def _init_worker(rungs, lock):
+    global _rungs, _lock
+    _rungs, _lock = rungs, lock
+
+
+def sweep(trials, seed=0, workers=None, episodes=TRIAL_EPISODES, layout=None, sinks=(), prune=True):
+    """Runs every params dict in `trials`; yields result rows as trials finish."""
+    workers = workers or os.cpu_count() or 1
+    jobs = [(i, seed + i, params, episodes, layout, prune) for i, params in enumerate(trials)]
+    if workers == 1:
+        _init_worker({}, threading.Lock())
+        yield from _emit(map(run_trial, jobs), sinks)
+        return
+
+    with mp.Manager() as manager:
+        with mp.Pool(workers, initializer=_init_worker, initargs=(manager.dict(), manager.Lock())) as pool:
+            yield from _emit(pool.imap_unordered(run_trial, jobs), sinks)
+
+
+def _emit(rows, sinks):
+    for row in rows:
+        for sink in sinks:
+            sink.write(row)
+        yield row
+
+
+def print_table(rows, names):
+    columns = ["trial", *names, "status", "episodes", "score", "clean_rate", "death_rate", "steps_to_clean"]
+    print("  ".join(f"{c:>14}" for c in columns))
+    for row in sorted(rows, key=lambda r: -r["score"]):
+        print("  ".join(f"{row[c]:>14.5g}" if isinstance(row[c], float) else f"{row[c]!s:>14}" for c in columns))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUES", required=True,
+                        help="a,b,c | lo:hi | log:lo:hi (repeatable)")
+    parser.add_argument("--random", type=int, default=0, metavar="N", help="random search with N trials")
+    parser.add_argument("--episodes", type=int, default=TRIAL_EPISODES, help="training episodes per trial")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--layout", default=None, help="floor plan file or layouts/ name")
+    parser.add_argument("--out", default="sweep.csv", help="results table (.csv or .jsonl)")
+    parser.add_argument("--no-prune", action="store_true", help="train every trial to the end (reproducible)")
+    args = parser.parse_args()
+
+    try:
+        space = dict(parse_param(p) for p in args.param)
+        trials = random_trials(space, args.random, args.seed) if args.random else grid_trials(space)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"Sweeping {len(trials)} trials over {', '.join(space)}...")
+    out = open_sink(args.out)
+    rows = []
+    try:
+        for row in sweep(trials, args.seed, args.workers, args.episodes, args.layout, [out],
+                         prune=not args.no_prune):
+            rows.append(row)
+            print(f"  trial {row['trial']:>4} {row['status']:<8} score {row['score']:.3f} "
+                  f"({len(rows)}/{len(trials)}, {row['elapsed_s']:.0f}s)")
+    finally:
+        out.close()
+    print_table(rows, sorted(space))
+    print(f"Results written to {args.out}")
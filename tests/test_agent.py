@@ -0,0 +1,24 @@
+import pytest
+
+from agent import DEFAULT_PARAMS, VacuumAgent
+from config import *
+from environment import GridWorld
+
+
+@pytest.mark.parametrize("gamma", [DEFAULT_PARAMS.discount_factor, 1.0])
+def test_run_option_discounts_like_the_step_by_step_sum(gamma):
+    env = GridWorld(seed=4)
+    env.build_house()
+    # One dirt tile at the far end of the floor, so the option walks a long way first
+    empty = env.empty_flat
+    env.add_dirt(*divmod(int(empty[-1]), env.cols))
+    agent = VacuumAgent(params=DEFAULT_PARAMS._replace(discount_factor=gamma))
+    agent.x, agent.y = divmod(int(empty[0]), env.cols)
+    assert agent.plan(env, GO_CLEAN)
+
+    reward, discounted, steps, died = agent.run_option(env, 1000)
+    assert steps > 1 and not died
+    # Every step but the last is a plain step; the last may clean dirt
+    last = reward - (steps - 1) * DEFAULT_PARAMS.reward_step
+    expected = sum(gamma ** k * DEFAULT_PARAMS.reward_step for k in range(steps - 1)) + gamma ** (steps - 1) * last
+    assert discounted == pytest.approx(expected)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from agent import VacuumAgent, NUM_GOALS
+from batched_env import BatchedGridWorld, MAX_STEPS
+from environment import GridWorld
+from train import train_batched
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_single_env_steps(seed):
+    """One batched env and train.run_episode's step take the same path, rewards and states."""
+    batched = BatchedGridWorld(1, seed=seed)
+    states = batched.reset()
+
+    env = GridWorld(seed=seed)
+    env.build_house()
+    env.grid[:] = batched.grid[0]  # same dirt
+    env._rebuild_dirt_index()
+    agent = VacuumAgent()
+    agent.x, agent.y = env.charger_positions[0]
+    assert tuple(agent.get_state(env)) == tuple(states[0])
+
+    rng = np.random.default_rng(seed)
+    goal = 0
+    for step in range(MAX_STEPS):
+        if rng.random() < 0.1:
+            goal = int(rng.integers(NUM_GOALS))
+        states, rewards, dones = batched.step([goal])
+        reward, died, _ = agent.act(env, goal)
+
+        assert (agent.x, agent.y) == (batched.x[0], batched.y[0]), step
+        assert reward == rewards[0], step
+        assert tuple(agent.get_state(env)) == tuple(states[0]), step
+        assert agent.battery == batched.battery[0]
+        assert dones[0] == (died or step + 1 == MAX_STEPS)
+        if dones[0]:
+            break
+    assert np.array_equal(env.grid, batched.grid[0])
+
+
+def test_train_batched_writes_policy_file(tmp_path):
+    path = tmp_path / "batched.npy"
+    train_batched(num_envs=4, max_episodes=4, seed=0, policy_file=str(path))
+    assert path.exists()
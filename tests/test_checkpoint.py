@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from qtable import QTable
+from train import train
+
+EPISODES = 40
+
+
+@pytest.mark.parametrize("replay", [0, 500])
+def test_resume_matches_uninterrupted_run(tmp_path, replay):
+    straight = tmp_path / "straight.npy"
+    steps = train(EPISODES, policy_file=str(straight), seed=3, checkpoint_every=0, replay=replay)
+
+    # Stop halfway with a checkpoint, then resume from it in a fresh run
+    checkpoint = str(tmp_path / "half.npz")
+    half = tmp_path / "half.npy"
+    train(EPISODES // 2, policy_file=str(half), seed=3, checkpoint_file=checkpoint,
+          checkpoint_every=EPISODES // 2, replay=replay)
+    resumed = tmp_path / "resumed.npy"
+    resumed_steps = train(EPISODES, policy_file=str(resumed), seed=99, checkpoint_file=checkpoint,
+                          checkpoint_every=0, resume=True, replay=replay)
+
+    assert resumed_steps == steps
+    a, b = QTable.load(str(straight)), QTable.load(str(resumed))
+    assert np.array_equal(a.values, b.values)
+    assert np.array_equal(a.seen, b.seen)
@@ -0,0 +1,82 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from config import *
+from environment import GridWorld
+
+
+def nearest_dirt_distance(env, start):
+    """Plain BFS over the grid to the closest DIRT tile; None if no dirt is reachable."""
+    seen = {start}
+    queue = deque([(start, 0)])
+    while queue:
+        (r, c), d = queue.popleft()
+        if env.grid[r, c] == DIRT:
+            return d
+        for nr, nc in ((r - 1, c), (r + 1, c), (r, c + 1), (r, c - 1)):
+            if (0 <= nr < env.rows and 0 <= nc < env.cols and (nr, nc) not in seen
+                    and env.grid[nr, nc] not in OBSTACLES):
+                seen.add((nr, nc))
+                queue.append(((nr, nc), d + 1))
+    return None
+
+
+@pytest.mark.parametrize("num_dirt", [1, 5, 60])
+def test_nearest_dirt_path_is_a_shortest_walk_to_dirt(num_dirt):
+    env = GridWorld(size=40, seed=num_dirt)
+    env.build_house()
+    empty = env.empty_flat
+    rng = np.random.default_rng(num_dirt)
+    for i in rng.choice(empty, size=num_dirt, replace=False):
+        env.add_dirt(*divmod(int(i), env.cols))
+
+    for i in rng.choice(empty, size=30, replace=False):
+        start = divmod(int(i), env.cols)
+        path = env.nearest_dirt_path(start)
+        assert len(path) == (nearest_dirt_distance(env, start) or 0)
+        if path:
+            assert env.grid[path[-1]] == DIRT
+            # Every step moves to an adjacent open cell
+            for (r0, c0), (r1, c1) in zip([start] + path, path):
+                assert abs(r1 - r0) + abs(c1 - c0) == 1
+                assert env.grid[r1, c1] not in OBSTACLES
+
+
+def test_set_tile_keeps_dirt_index_and_spawn_cells():
+    env = GridWorld(seed=0)
+    env.reset()
+    r, c = env.dirt_positions()[0]
+    count = env.dirt_count
+    i = r * env.cols + c
+
+    env.set_tile(r, c, WALL)
+    assert (r, c) not in env.dirt_positions()
+    assert env.dirt_count == count - 1
+    assert i not in env.empty_flat
+    assert i in env.layout.empty_flat  # the shared layout is left alone
+    assert not env.passable[r, c]
+
+    env.set_tile(r, c, DIRT)
+    assert (r, c) in env.dirt_positions()
+    assert i in env.empty_flat
+
+    env.reset()
+    assert np.array_equal(env.empty_flat, env.layout.empty_flat)
+
+
+def test_set_tile_patches_passability_like_a_full_rebuild():
+    env = GridWorld(seed=0)
+    env.reset()
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        r, c = (int(v) for v in rng.integers(1, [env.rows - 1, env.cols - 1]))
+        env.set_tile(r, c, WALL if env.passable[r, c] else EMPTY)
+
+    rebuilt = GridWorld(seed=0)
+    rebuilt.build_house()
+    rebuilt._compile_passability(env.passable.copy())
+    assert np.array_equal(env.neighbors, rebuilt.neighbors)
+    assert env.nav.open == rebuilt.nav.open
+    assert env.neighbors.dtype == np.int32
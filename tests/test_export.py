@@ -0,0 +1,28 @@
+import struct
+
+import numpy as np
+
+from export import ApngWriter, PNG_SIGNATURE
+
+
+def test_apng_counts_its_frames(tmp_path):
+    path = tmp_path / "clip.png"
+    writer = ApngWriter(str(path))
+    frame = np.zeros((4, 6, 3), dtype=np.uint8)
+    for k in range(3):
+        frame[k, k] = 255
+        writer.add(frame)
+    writer.close()
+
+    data = path.read_bytes()
+    assert data.startswith(PNG_SIGNATURE) and data.endswith(b"IEND\xaeB`\x82")
+    num_frames, _ = struct.unpack_from(">II", data, data.index(b"acTL") + 4)
+    assert num_frames == 3
+
+
+def test_apng_without_frames_leaves_no_file(tmp_path):
+    path = tmp_path / "empty.png"
+    writer = ApngWriter(str(path))
+    writer.close()
+    writer.close()
+    assert not path.exists()
@@ -0,0 +1,60 @@
+from collections import deque
+
+import numpy as np
+
+from bfs import MOVES
+from config import *
+from environment import GridWorld
+from fleet import FleetSimulation, make_fleet
+from qtable import QTable
+from agent import STATE_SHAPE, NUM_GOALS
+
+
+def test_sidestep_stays_on_the_map():
+    env = GridWorld(seed=0)
+    env.reset()
+    # An open border: every in-map neighbour passable, and numpy would wrap (-1, 0) to the far row
+    env._compile_passability(np.ones((env.rows, env.cols), dtype=bool))
+    sim = FleetSimulation(env, make_fleet(1, QTable(STATE_SHAPE, NUM_GOALS)))
+    agent = sim.agents[0]
+    for corner in ((0, 0), (0, env.cols - 1), (env.rows - 1, 0), (env.rows - 1, env.cols - 1)):
+        agent.x, agent.y = corner
+        sim._sidestep(0, 0, set(), set())
+        assert 0 <= agent.x < env.rows and 0 <= agent.y < env.cols
+        assert (agent.x, agent.y) != corner
+
+
+def test_charging_hold_releases_bookings():
+    env = GridWorld(seed=0)
+    sim = FleetSimulation(env, make_fleet(2, QTable(STATE_SHAPE, NUM_GOALS)))
+    sim.step()
+    agent = sim.agents[0]
+    assert agent.current_path and sim.table.booked[0]
+
+    # Parked on a charger with a low battery: decide() empties the path in place
+    agent.x, agent.y = env.charger_positions[0]
+    agent.battery = MAX_BATTERY // 2
+    sim.step()
+    assert not agent.current_path
+    assert 0 not in sim.table.booked
+    assert 0 not in sim.table.slots.values()
+
+
+def test_dead_robot_frees_its_cell_and_bookings():
+    env = GridWorld(seed=0)
+    sim = FleetSimulation(env, make_fleet(2, QTable(STATE_SHAPE, NUM_GOALS)))
+    sim.step()
+    dead, other = sim.agents
+    dead.battery = BATTERY_COST_MOVE  # the next move empties it
+    while dead.is_alive:
+        sim.step()
+    assert 0 not in sim.table.slots.values()
+
+    # The other robot can now walk through the cell the dead one stopped on
+    beside = [(dead.x + dx, dead.y + dy) for dx, dy in MOVES]
+    other.x, other.y = next(cell for cell in beside
+                            if 0 <= cell[0] < env.rows and 0 <= cell[1] < env.cols and env.passable[cell])
+    other.current_path = deque([(dead.x, dead.y)])
+    other.current_goal = GO_CLEAN
+    sim.step()
+    assert (other.x, other.y) == (dead.x, dead.y)
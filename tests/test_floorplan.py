@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from config import EMPTY
+from floorplan import parse_layout, parse_rows
+
+ROOM = ["#####", "#C.B#", "#####"]
+
+
+def test_enclosed_layout_parses():
+    layout = parse_rows(ROOM)
+    assert layout.charger_positions == [(1, 1)]
+    assert layout.bin_positions == [(1, 3)]
+
+
+@pytest.mark.parametrize("rows", [
+    ["#####", "#C.B.", "#####"],
+    ["##.##", "#C.B#", "#####"],
+    ["#####", ".C.B#", "#####"],
+])
+def test_open_border_is_rejected(rows):
+    with pytest.raises(ValueError, match="not enclosed"):
+        parse_rows(rows)
+
+
+def test_open_border_is_rejected_in_json_grids():
+    grid = parse_rows(ROOM).grid.tolist()
+    grid[0][2] = int(EMPTY)
+    with pytest.raises(ValueError, match="not enclosed"):
+        parse_layout(json.dumps({"grid": grid}), fmt="json")
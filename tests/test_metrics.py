@@ -0,0 +1,44 @@
+import threading
+import time
+
+from metrics import LiveStats, LIVE_REFRESH, PHASES
+
+
+def test_steps_per_sec_comes_from_the_step_counter():
+    perf = LiveStats()
+    perf.frame(0.0, 0.0, 0.0, step=100)
+    time.sleep(LIVE_REFRESH + 0.05)
+    perf.frame(0.0, 0.0, 0.0, step=100 + 5000)
+    elapsed = LIVE_REFRESH + 0.05
+    assert 0.5 * 5000 / elapsed < perf.steps_per_sec <= 5000 / elapsed
+
+
+def test_timed_calls_from_another_thread_are_all_counted():
+    perf = LiveStats()
+    plan = perf.timed(lambda: None)
+    stop = threading.Event()
+
+    def worker():
+        while not stop.is_set():
+            plan()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    try:
+        for step in range(200):
+            perf.frame(0.001, 0.001, 0.001, step)
+            perf.snapshot()
+            perf.lines()
+    finally:
+        stop.set()
+        thread.join()
+    assert perf.snapshot()["plan_ms"]["calls"] == perf.plans > 0
+
+
+def test_profile_without_sinks_prints_a_phase_summary(tmp_path, capsys):
+    from train import train
+    train(3, policy_file=str(tmp_path / "brain.npy"), profile=True, seed=0, checkpoint_every=0)
+    out = capsys.readouterr().out
+    assert "Phase timings over 3 episodes:" in out
+    for phase in PHASES:
+        assert phase in out
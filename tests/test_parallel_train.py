@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+import parallel_train
+from qtable import QTable
+
+
+def _crash(*args):
+    os._exit(3)
+
+
+def test_trains_and_saves_policy(tmp_path):
+    path = str(tmp_path / "brain.npy")
+    table = parallel_train.train_parallel(2, 6, 0, [], policy_file=path)
+    assert table.seen.any()
+    assert (QTable.load(path).values == table.values).all()
+
+
+def test_crashed_worker_stops_training(tmp_path, monkeypatch):
+    # Workers are forked, so they pick up the patched target
+    monkeypatch.setattr(parallel_train, "_worker", _crash)
+    monkeypatch.setattr(parallel_train, "RESULT_POLL", 0.1)
+    with pytest.raises(RuntimeError, match="exited with code 3"):
+        parallel_train.train_parallel(2, 10, 0, [], policy_file=str(tmp_path / "brain.npy"))
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from planner import ENGINES, NavGrid, bfs_path
+
+
+def random_query(seed, rows=24, cols=31, wall_rate=0.3, num_targets=1):
+    rng = np.random.default_rng(seed)
+    passable = rng.random((rows, cols)) >= wall_rate
+    cells = np.argwhere(passable)
+    picks = rng.choice(len(cells), size=1 + num_targets, replace=False)
+    start, *targets = (tuple(int(v) for v in cells[k]) for k in picks)
+    return passable, start, targets
+
+
+def assert_valid(path, passable, start, targets):
+    prev = start
+    for cell in path:
+        assert passable[cell]
+        assert abs(cell[0] - prev[0]) + abs(cell[1] - prev[1]) == 1
+        prev = cell
+    assert prev in targets
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+@pytest.mark.parametrize("num_targets", [1, 3, 12])
+def test_engines_match_bfs_length(engine, num_targets):
+    for seed in range(40):
+        passable, start, targets = random_query(seed, num_targets=num_targets)
+        nav = NavGrid(passable)
+        expected = bfs_path(nav, start, targets)
+        path = ENGINES[engine](nav, start, targets)
+        assert len(path) == len(expected), seed
+        if expected:
+            assert_valid(path, passable, start, targets)
+        else:
+            assert path == []
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_start_on_target(engine):
+    passable, start, targets = random_query(0)
+    assert ENGINES[engine](NavGrid(passable), start, targets + [start]) == []
@@ -0,0 +1,32 @@
+import threading
+
+import numpy as np
+
+import agent as agent_module
+import sweep
+from agent import VacuumAgent, DEFAULT_PARAMS
+from config import *
+
+
+def test_make_params_overrides_only_swept_values():
+    params = sweep.make_params({"LEARNING_RATE": 0.5, "REWARD_DEATH": -100.0})
+    assert params.learning_rate == 0.5
+    assert params.reward_death == -100 and isinstance(params.reward_death, int)
+    assert params._replace(learning_rate=LEARNING_RATE, reward_death=REWARD_DEATH) == DEFAULT_PARAMS
+
+
+def test_agent_learns_with_its_own_params():
+    params = DEFAULT_PARAMS._replace(learning_rate=1.0, discount_factor=0.0)
+    agent = VacuumAgent(params=params)
+    agent.learn((2, 0, 0), 1, 7.0, (2, 0, 0))
+    assert agent.q_table[(2, 0, 0)][1] == 7.0
+    assert VacuumAgent().params == DEFAULT_PARAMS
+
+
+def test_trial_leaves_module_constants_alone():
+    sweep._init_worker({}, threading.Lock())
+    row = sweep.run_trial((0, 0, {"LEARNING_RATE": 0.9, "REWARD_STEP": -3.0}, 3, None, True))
+    assert row["LEARNING_RATE"] == 0.9 and row["episodes"] == 3
+    assert agent_module.LEARNING_RATE == LEARNING_RATE
+    assert agent_module.REWARD_STEP == REWARD_STEP
+    assert np.isfinite(row["score"])
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from agent import VacuumAgent
+from config import *
+from environment import GridWorld
+from trajectory import HEADER, MAGIC, VERSION, Trajectory, TrajectoryWriter
+
+
+def record_walk(path, steps, first_run, keyframe_every=16, close=True):
+    """Random walk with dirt changes; returns the expected (grid, agent fields) per step."""
+    env = GridWorld(seed=0)
+    env.reset()
+    agent = VacuumAgent()
+    rng = np.random.default_rng(0)
+    expected = []
+    writer = TrajectoryWriter(path, env, keyframe_every)
+    for step in range(steps):
+        for i in rng.choice(env.empty_flat, size=3, replace=False):
+            r, c = divmod(int(i), env.cols)
+            if env.grid[r, c] == DIRT:
+                env.clean(r, c)
+            else:
+                env.add_dirt(r, c)
+        agent.x, agent.y = (int(v) for v in divmod(int(rng.choice(env.empty_flat)), env.cols))
+        agent.battery = int(rng.integers(-5, MAX_BATTERY))
+        agent.bin = int(rng.integers(MAX_BIN + 1))
+        agent.current_goal = None if step % 5 == 0 else int(rng.integers(4))
+        agent.is_alive = step % 7 != 0
+        run = first_run + step // 10
+        writer.record(env, agent, run)
+        expected.append((env.grid.copy(), (agent.x, agent.y, agent.current_goal, agent.battery, agent.bin,
+                                           agent.is_alive, run)))
+    if close:
+        writer.close()
+    else:
+        writer.file.close()  # as if the recorder was killed: no footer
+    return expected
+
+
+def assert_frame(trajectory, step, expected):
+    grid, fields = expected[step]
+    frame = trajectory.frame(step)
+    assert frame.step == step
+    assert np.array_equal(frame.grid, grid)
+    assert (frame.x, frame.y, frame.current_goal, frame.battery, frame.bin, frame.is_alive, frame.run) == fields
+
+
+@pytest.mark.parametrize("close", [True, False])
+def test_round_trip_and_random_seek(tmp_path, close):
+    path = str(tmp_path / "walk.vtrj")
+    expected = record_walk(path, 200, first_run=65530, close=close)
+    trajectory = Trajectory(path)
+    try:
+        assert len(trajectory) == len(expected)
+        for step in range(len(expected)):
+            assert_frame(trajectory, step, expected)
+        for step in np.random.default_rng(1).integers(len(expected), size=100):
+            assert_frame(trajectory, int(step), expected)
+        assert trajectory.frame(len(expected) - 1).run > 0xFFFF
+    finally:
+        trajectory.close()
+
+
+def test_rejects_other_format_versions(tmp_path):
+    path = tmp_path / "old.vtrj"
+    path.write_bytes(HEADER.pack(MAGIC, VERSION - 1, 2, 2, 16))
+    with pytest.raises(ValueError, match="format v1"):
+        Trajectory(str(path))
@@ -1,110 +1,290 @@
+import argparse
 import numpy as np
-import pickle
+import random
+import time
 from environment import GridWorld
+from batched_env import BatchedGridWorld
 from agent import VacuumAgent
 from config import *
+from qtable import POLICY_FILE
+from checkpoint import CHECKPOINT_FILE, save_checkpoint, load_checkpoint
+from metrics import EpisodeResult, PhaseTimer, RunningWindow, TrainingMetrics, open_sink
 
+MAX_EPISODES = 20000
 
-def train():
-    env = GridWorld(render_mode=False)
-    agent = VacuumAgent()
+# -------- EARLY STOPPING PARAMETERS --------
+WINDOW = 500
+PATIENCE = 3000
+IMPROVEMENT_THRESHOLD = 1.02
+
+# -------- CHECKPOINTING --------
+CHECKPOINT_EVERY = 500
+
+
+class EarlyStopping:
+    """Stops once the WINDOW-episode average stops improving for PATIENCE episodes."""
+
+    def __init__(self):
+        self.best_avg = -float("inf")
+        self.stagnation_counter = 0
+        self.recent = RunningWindow(WINDOW)
+
+    def update(self, total_reward):
+        """Feeds one episode's reward; True means stop."""
+        self.recent.push(total_reward)
+        if len(self.recent) < WINDOW:
+            return False
+
+        current_avg = self.recent.mean()
+        if current_avg > self.best_avg * IMPROVEMENT_THRESHOLD:
+            self.best_avg = current_avg
+            self.stagnation_counter = 0
+        else:
+            self.stagnation_counter += 1
+
+        return self.stagnation_counter >= PATIENCE
+
+
+def run_episode(env, agent, start_pos, max_steps=1000, timer=None):
+    """Plays one training episode from start_pos, learning on every step.
+
+    Pass a metrics.PhaseTimer to accumulate time per loop phase.
+    Returns an EpisodeResult.
+    """
+    agent.x, agent.y = start_pos
+    agent.battery = MAX_BATTERY
+    agent.bin = 0
+    agent.is_alive = True
+    agent.current_goal = None
+    agent.current_path.clear()
+
+    state = agent.get_state(env)
+    done = False
+    total_reward = 0
+    steps = 0
+    plan_failures = 0
+    tick = time.perf_counter
+    t = 0.0
+
+    while not done and steps < max_steps:
+        # 1. Choose Goal
+        if timer: t = tick()
+        goal = agent.choose_goal(state)
+        if timer: t = timer.lap("choose_goal", t)
+
+        # 2. Plan Path (if needed) and execute one step.
+        # A goal that can't be planned is penalised and the robot stays put;
+        # this prevents the "Frozen Robot" bug
+        reward, done, planning_failed = agent.act(env, goal, timer)
+        if planning_failed:
+            plan_failures += 1
+        if timer: t = tick()
+
+        # 3. Learn
+        next_state = agent.get_state(env)
+        agent.learn(state, goal, reward, next_state)
+        if timer: timer.lap("learn", t)
+
+        state = next_state
+        total_reward += reward
+        steps += 1
+
+    return EpisodeResult(total_reward, steps, done, plan_failures)
+
+
+def run_episode_smdp(env, agent, start_pos, max_steps=1000, timer=None):
+    """run_episode() with one decision per macro-step instead of per grid step.
+
+    A chosen goal runs as an option (VacuumAgent.run_option) until the
+    high-level state may change, then gets one SMDP update. A greedy agent
+    takes the same grid steps as in run_episode(), since the state, and so
+    its goal, stays the same along a macro-step. The "move_step" phase
+    covers the whole option, including interact.
+    """
+    agent.x, agent.y = start_pos
+    agent.battery = MAX_BATTERY
+    agent.bin = 0
+    agent.is_alive = True
+    agent.current_goal = None
+    agent.current_path.clear()
+
+    state = agent.get_state(env)
+    done = False
+    total_reward = 0
+    steps = 0
+    plan_failures = 0
+    tick = time.perf_counter
+    t = 0.0
+
+    while not done and steps < max_steps:
+        if timer: t = tick()
+        goal = agent.choose_goal(state)
+        if timer: t = timer.lap("choose_goal", t)
+
+        if agent.current_goal != goal or not agent.current_path:
+            agent.current_goal = goal
+            success = agent.plan(env, goal)
+            if timer: t = timer.lap("plan", t)
+            if not success:
+                # Same penalty and one-step update as run_episode()
+                plan_failures += 1
+                agent.learn(state, goal, REWARD_PLAN_FAIL, state)
+                if timer: timer.lap("learn", t)
+                total_reward += REWARD_PLAN_FAIL
+                steps += 1
+                continue
 
-    MAX_EPISODES = 20000
-    rewards = []
+        reward, discounted, k, done = agent.run_option(env, max_steps - steps)
+        if timer: t = timer.lap("move_step", t)
 
-    # -------- EARLY STOPPING PARAMETERS --------
-    WINDOW = 500
-    PATIENCE = 3000
-    IMPROVEMENT_THRESHOLD = 1.02
+        next_state = agent.get_state(env)
+        agent.learn_option(state, goal, discounted, next_state, k)
+        if timer: timer.lap("learn", t)
 
-    best_avg = -float("inf")
-    stagnation_counter = 0
-    # ------------------------------------------
+        state = next_state
+        total_reward += reward
+        steps += k
 
+    return EpisodeResult(total_reward, steps, done, plan_failures)
+
+
+def train(max_episodes=MAX_EPISODES, policy_file=POLICY_FILE, sinks=(), profile=False,
+          seed=None, checkpoint_file=CHECKPOINT_FILE, checkpoint_every=CHECKPOINT_EVERY, resume=False,
+          layout=None, smdp=False, replay=REPLAY_CAPACITY):
+    """Single-process training loop. Returns the number of env steps taken.
+
+    sinks:            metrics sinks that receive one record per episode.
+    profile:          add per-phase timings (ms per episode) to those records
+                      and print a per-phase summary when training ends.
+    seed:             seeds `random`, numpy and the environment for a reproducible run.
+    checkpoint_every: episodes between checkpoints (0 disables them).
+    resume:           continue from checkpoint_file; the rest of the run
+                      matches an uninterrupted one exactly.
+    layout:           floor plan file or layouts/ name (default: built-in house).
+    smdp:             one decision and Q-update per macro-step (run_episode_smdp).
+    replay:           experience replay buffer size (0: no replay).
+    """
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+
+    env = GridWorld(render_mode=False, layout=layout, seed=seed)
+    agent = VacuumAgent(replay_capacity=replay)
+
+    stopper = EarlyStopping()
+    timer = PhaseTimer() if profile else None
+    metrics = TrainingMetrics(sinks, timer=timer)
+    start_ep = 0
+    total_steps = 0
+
+    if resume:
+        start_ep, total_steps = load_checkpoint(checkpoint_file, agent, stopper, metrics, env)
+        print(f"Resuming from {checkpoint_file} at episode {start_ep}")
+
+    play = run_episode_smdp if smdp else run_episode
     print("Starting training with Robust Planning Logic...")
 
-    for ep in range(MAX_EPISODES):
+    for ep in range(start_ep, max_episodes):
         start_pos = env.reset()
 
-        agent.x, agent.y = start_pos
-        agent.battery = MAX_BATTERY
-        agent.bin = 0
-        agent.is_alive = True
-        agent.current_goal = None
-        agent.current_path.clear()
-
-        state = agent.get_state(env)
-        done = False
-        total_reward = 0
-        steps = 0
-
-        while not done and steps < 1000:
-            # 1. Choose Goal
-            goal = agent.choose_goal(state)
-
-            # 2. Plan Path (if needed)
-            planning_failed = False
-            if agent.current_goal != goal or not agent.current_path:
-                agent.current_goal = goal
-                success = agent.plan(env, goal)
-
-                # --- FIX: Handle Planning Failure ---
-                if not success:
-                    planning_failed = True
-                    # Penalty for picking an invalid/unreachable goal
-                    # This prevents the "Frozen Robot" bug
-                    reward = -10
-
-                    # 3. Execute Step
-            if planning_failed:
-                # If plan failed, don't move. Just learn and retry.
-                r1 = 0
-                r2 = 0
-            else:
-                # Normal execution
-                r1, done = agent.move_step(env)
-                r2 = agent.interact(env)
-                reward = r1 + r2
-
-            # 4. Learn
-            next_state = agent.get_state(env)
-            agent.learn(state, goal, reward, next_state)
-
-            state = next_state
-            total_reward += reward
-            steps += 1
-
-        rewards.append(total_reward)
+        result = play(env, agent, start_pos, timer=timer)
+        total_steps += result.steps
 
         # -------- EPSILON DECAY --------
         if agent.epsilon > MIN_EPSILON:
             agent.epsilon *= EPSILON_DECAY
 
         # -------- LOGGING --------
+        metrics.record(ep, result, agent.epsilon)
         if ep % 1000 == 0:
-            avg_100 = np.mean(rewards[-100:]) if len(rewards) >= 100 else np.mean(rewards)
-            print(f"Episode {ep} | Avg Reward (100): {avg_100:.2f} | Epsilon: {agent.epsilon:.3f}")
+            print(f"Episode {ep} | Avg Reward (100): {metrics.reward.mean():.2f} | Epsilon: {agent.epsilon:.3f}")
 
         # -------- EARLY STOPPING CHECK --------
-        if len(rewards) >= WINDOW:
-            current_avg = np.mean(rewards[-WINDOW:])
-            if current_avg > best_avg * IMPROVEMENT_THRESHOLD:
-                best_avg = current_avg
-                stagnation_counter = 0
-            else:
-                stagnation_counter += 1
-
-            if stagnation_counter >= PATIENCE:
-                print(f"\nEarly stopping triggered at episode {ep}")
-                print(f"Best {WINDOW}-episode avg reward: {best_avg:.2f}")
-                break
+        if stopper.update(result.total_reward):
+            print(f"\nEarly stopping triggered at episode {ep}")
+            print(f"Best {WINDOW}-episode avg reward: {stopper.best_avg:.2f}")
+            break
+
+        # -------- CHECKPOINT --------
+        if checkpoint_every and (ep + 1) % checkpoint_every == 0:
+            save_checkpoint(checkpoint_file, agent, ep + 1, total_steps, stopper, metrics, env)
+
+    metrics.close()
+    if timer:
+        ran = metrics.reward.count - start_ep  # episodes this process played
+        print(f"Phase timings over {ran} episodes:")
+        print(timer.summary(ran))
 
     # -------- SAVE TRAINED POLICY --------
-    with open("brain.pkl", "wb") as f:
-        pickle.dump(agent.q_table, f)
+    agent.q_table.save(policy_file)
+
+    print(f"Training complete. Policy saved to {policy_file}")
+    return total_steps
+
+
+def train_batched(num_envs=256, max_episodes=MAX_EPISODES, seed=None, layout=None, policy_file=POLICY_FILE):
+    """Same task as train(), but steps `num_envs` houses per call; saves the policy to policy_file."""
+    env = BatchedGridWorld(num_envs, seed=seed, layout=layout)
+    agent = VacuumAgent()
+
+    recent = RunningWindow(100)
+    ep_reward = np.zeros(num_envs)
+    finished = 0
+    env_steps = 0
+    start = time.perf_counter()
+
+    print(f"Starting batched training with {num_envs} envs...")
+
+    state = env.reset()
+    while finished < max_episodes:
+        goal = agent.choose_goals(state)
+        next_state, reward, done = env.step(goal)
+        agent.learn_batch(state, goal, reward, next_state)
+
+        ep_reward += reward
+        env_steps += num_envs
+
+        if done.any():
+            for ep_total in ep_reward[done]:
+                recent.push(ep_total)
+                finished += 1
+
+                # -------- EPSILON DECAY (per finished episode) --------
+                if agent.epsilon > MIN_EPSILON:
+                    agent.epsilon *= EPSILON_DECAY
+
+                if finished % 1000 == 0:
+                    rate = env_steps / (time.perf_counter() - start)
+                    print(f"Episode {finished} | Avg Reward (100): {recent.mean():.2f} "
+                          f"| Epsilon: {agent.epsilon:.3f} | {rate:,.0f} steps/s")
+
+            ep_reward[done] = 0
+            next_state = env.reset(done)
+
+        state = next_state
+
+    agent.q_table.save(policy_file)
 
-    print("Training complete. Policy saved to brain.pkl")
+    print(f"Training complete. Policy saved to {policy_file}")
 
 
 if __name__ == "__main__":
-    train()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the vacuum agent's goal policy.")
+    parser.add_argument("--episodes", type=int, default=MAX_EPISODES)
+    parser.add_argument("--metrics", action="append", default=[], metavar="SINK",
+                        help="per-episode metrics sink: stdout, stdout:N, FILE.jsonl or FILE.csv (repeatable)")
+    parser.add_argument("--profile", action="store_true", help="time each loop phase")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help="checkpoint file")
+    parser.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_EVERY,
+                        help="episodes between checkpoints (0 disables)")
+    parser.add_argument("--resume", action="store_true", help="continue from --checkpoint")
+    parser.add_argument("--smdp", action="store_true", help="decide once per macro-step, not per grid step")
+    parser.add_argument("--replay", type=int, default=REPLAY_CAPACITY, metavar="N",
+                        help="replay the last N transitions by prioritized sweeping (default: off)")
+    parser.add_argument("--layout", default=None,
+                        help="floor plan: a .txt/.json file or a name under layouts/ (default: built-in house)")
+    args = parser.parse_args()
+    train(args.episodes, sinks=[open_sink(s) for s in args.metrics], profile=args.profile,
+          seed=args.seed, checkpoint_file=args.checkpoint, checkpoint_every=args.checkpoint_every,
+          resume=args.resume, layout=args.layout, smdp=args.smdp, replay=args.replay)
\ No newline at end of file
@@ -0,0 +1,225 @@
+"""Compact step-by-step run logs for reviewing a simulation without re-running it.
+
+File layout (little-endian):
+    header    "VTRJ", version u16, rows u16, cols u16, keyframe_every u16
+    records   one per step:
+                b"K" step u32, agent, rows*cols u8 grid       every keyframe_every steps
+                b"S" agent, count u16, count x (cell u32, tile u8)   otherwise
+    footer    b"I" steps u32, keyframes u32, keyframes x offset u64, index offset u64, "VIDX"
+
+`agent` is x u16, y u16, goal i8 (-1 = none), battery i16, bin u8, alive u8,
+run u32. The footer is only an index: a log cut short by a crash is still
+readable, it just gets scanned once on open.
+"""
+import mmap
+import struct
+from collections import namedtuple
+import numpy as np
+from config import *
+from floorplan import Layout
+
+MAGIC = b"VTRJ"
+INDEX_MAGIC = b"VIDX"
+VERSION = 2
+KEYFRAME_EVERY = 256
+
+HEADER = struct.Struct("<4sHHHH")
+AGENT = struct.Struct("<HHbhBBI")
+STEP = struct.Struct("<I")
+COUNT = struct.Struct("<H")
+FOOTER = struct.Struct("<II")
+TAIL = struct.Struct("<Q4s")
+DELTA = np.dtype([("cell", "<u4"), ("tile", "u1")])
+
+# Most cells one step record may change; busier steps are written as keyframes
+MAX_DELTAS = 0xFFFF
+
+# One recorded step. It has the attributes the renderer and the dashboard
+# read from a VacuumAgent, so it can be drawn in place of one.
+Frame = namedtuple("Frame", ["step", "grid", "x", "y", "current_goal", "battery", "bin", "is_alive", "run"])
+
+
+def _agent_bytes(agent, run):
+    goal = -1 if agent.current_goal is None else int(agent.current_goal)
+    return AGENT.pack(agent.x, agent.y, goal, agent.battery, agent.bin, bool(agent.is_alive), run)
+
+
+class TrajectoryWriter:
+    """Appends one record per step; use as a context manager or call close()."""
+
+    def __init__(self, path, env, keyframe_every=KEYFRAME_EVERY):
+        self.file = open(path, "wb")
+        self.keyframe_every = keyframe_every
+        self.keyframes = []
+        self.steps = 0
+        self.prev = None
+        self.file.write(HEADER.pack(MAGIC, VERSION, env.rows, env.cols, keyframe_every))
+
+    def record(self, env, agent, run=1):
+        """Logs the state after one step: agent fields plus the grid cells that changed."""
+        agent_bytes = _agent_bytes(agent, run)
+        grid = env.grid.ravel()
+        changed = None
+        if self.steps % self.keyframe_every and self.prev is not None:
+            changed = np.flatnonzero(grid != self.prev)
+            if len(changed) > MAX_DELTAS:
+                changed = None
+
+        if changed is None:
+            self.keyframes.append(self.file.tell())
+            self.file.write(b"K" + STEP.pack(self.steps) + agent_bytes)
+            self.file.write(grid.astype(np.uint8).tobytes())
+            self.prev = grid.copy()
+        else:
+            deltas = np.empty(len(changed), dtype=DELTA)
+            deltas["cell"] = changed
+            deltas["tile"] = grid[changed]
+            self.file.write(b"S" + agent_bytes + COUNT.pack(len(changed)) + deltas.tobytes())
+            self.prev[changed] = grid[changed]
+        self.steps += 1
+
+    def close(self):
+        if self.file.closed:
+            return
+        index = self.file.tell()
+        self.file.write(b"I" + FOOTER.pack(self.steps, len(self.keyframes)))
+        self.file.write(np.array(self.keyframes, dtype="<u8").tobytes())
+        self.file.write(TAIL.pack(index, INDEX_MAGIC))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Trajectory:
+    """Random access to a recorded run.
+
+    frame(n) restores the nearest keyframe at or before n and applies at
+    most keyframe_every - 1 step records, so any seek costs O(interval).
+    Stepping forward one frame at a time applies a single record.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.rows, self.cols, self.keyframe_every = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a trajectory file")
+        if version != VERSION:
+            raise ValueError(f"{path}: trajectory format v{version}, expected v{VERSION}")
+        self.cells = self.rows * self.cols
+        self.keyframes, self.steps = self._read_index()
+
+        self.grid = np.zeros(self.cells, dtype=np.uint8)
+        self._step = -1    # step currently held in self.grid
+        self._next = HEADER.size  # offset of the record after it
+
+    def __len__(self):
+        return self.steps
+
+    def close(self):
+        self.data.close()
+
+    # ---------------- INDEX ----------------
+    def _read_index(self):
+        data = self.data
+        if len(data) >= HEADER.size + TAIL.size:
+            index, magic = TAIL.unpack_from(data, len(data) - TAIL.size)
+            if magic == INDEX_MAGIC and data[index:index + 1] == b"I":
+                steps, count = FOOTER.unpack_from(data, index + 1)
+                offsets = np.frombuffer(data, dtype="<u8", count=count, offset=index + 1 + FOOTER.size)
+                return offsets.astype(np.int64).tolist(), steps
+        return self._scan()
+
+    def _scan(self):
+        """Rebuilds the index of a log without a footer (the recorder was killed)."""
+        keyframes = []
+        steps = 0
+        offset = HEADER.size
+        while True:
+            size = self._record_size(offset)
+            if size is None:
+                break
+            if self.data[offset:offset + 1] == b"K":
+                keyframes.append(offset)
+            offset += size
+            steps += 1
+        return keyframes, steps
+
+    def _record_size(self, offset):
+        """Byte length of the record at offset, or None at the end / a torn record."""
+        data = self.data
+        tag = data[offset:offset + 1]
+        if tag == b"K":
+            size = 1 + STEP.size + AGENT.size + self.cells
+        elif tag == b"S" and offset + 1 + AGENT.size + COUNT.size <= len(data):
+            (count,) = COUNT.unpack_from(data, offset + 1 + AGENT.size)
+            size = 1 + AGENT.size + COUNT.size + count * DELTA.itemsize
+        else:
+            return None
+        return size if offset + size <= len(data) else None
+
+    # ---------------- DECODING ----------------
+    def _apply(self, offset):
+        """Applies the record at offset to self.grid; returns (agent fields, next offset)."""
+        data = self.data
+        if data[offset:offset + 1] == b"K":
+            start = offset + 1 + STEP.size
+            fields = AGENT.unpack_from(data, start)
+            start += AGENT.size
+            self.grid[:] = np.frombuffer(data, dtype=np.uint8, count=self.cells, offset=start)
+            return fields, start + self.cells
+
+        fields = AGENT.unpack_from(data, offset + 1)
+        start = offset + 1 + AGENT.size
+        (count,) = COUNT.unpack_from(data, start)
+        start += COUNT.size
+        deltas = np.frombuffer(data, dtype=DELTA, count=count, offset=start)
+        self.grid[deltas["cell"]] = deltas["tile"]
+        return fields, start + count * DELTA.itemsize
+
+    def frame(self, step):
+        """State after `step` (0-based). The grid array is reused by the next call."""
+        if not 0 <= step < self.steps:
+            raise IndexError(f"step {step} outside 0..{self.steps - 1}")
+        if step == self._step:
+            return self._current
+        if step < self._step or step - self._step > self.keyframe_every:
+            self._next, key_step = self._keyframe_before(step)
+            self._step = key_step - 1
+
+        while self._step < step:
+            fields, self._next = self._apply(self._next)
+            self._step += 1
+        x, y, goal, battery, bin_, alive, run = fields
+        self._current = Frame(step, self.grid.reshape(self.rows, self.cols), x, y,
+                              None if goal < 0 else goal, battery, bin_, bool(alive), run)
+        return self._current
+
+    def _keyframe_before(self, step):
+        """(offset, step) of the last keyframe at or before step.
+
+        Busy steps can add keyframes off the regular grid, so this bisects
+        on the recorded step numbers rather than dividing by the interval.
+        """
+        lo, hi = 0, len(self.keyframes) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self._keyframe_step(mid) <= step:
+                lo = mid
+            else:
+                hi = mid - 1
+        return self.keyframes[lo], self._keyframe_step(lo)
+
+    def _keyframe_step(self, k):
+        return STEP.unpack_from(self.data, self.keyframes[k] + 1)[0]
+
+    def layout(self):
+        """The recorded house without its dirt, for building a GridWorld to draw into."""
+        self.frame(0)
+        grid = self.grid.reshape(self.rows, self.cols)
+        static = np.where(grid == DIRT, EMPTY, grid)
+        return Layout("replay", static, np.argwhere(static == CHARGER), np.argwhere(static == BIN))
@@ -0,0 +1,286 @@
+"""GridWorld + VacuumAgent pairs stepped in worker processes behind one shared-memory buffer.
+
+    python vector_env.py --envs 64 --workers 4 --steps 2000   # throughput check
+
+SubprocVectorEnv has BatchedGridWorld's interface (reset(mask) -> states,
+step(goals) -> (states, rewards, dones)) but runs the real GridWorld and
+VacuumAgent, one step per goal exactly as train.run_episode does. Goals
+go in and states, rewards, dones and optional grids come back through one
+SharedMemory block; the pipes only carry one-byte commands, so nothing is
+pickled per step. step_async() returns at once, so the caller can learn
+from the previous batch while the workers step:
+
+    env.step_async(goals)
+    agent.learn_batch(...)          # overlaps with stepping
+    states, rewards, dones = env.step_wait()
+"""
+import argparse
+import multiprocessing as mp
+import os
+import time
+import traceback
+from multiprocessing import shared_memory
+import numpy as np
+from environment import GridWorld
+from agent import VacuumAgent
+from batched_env import MAX_STEPS
+from config import *
+from floorplan import resolve_layout
+
+# Commands sent to workers; a worker answers each with b"" or a traceback
+CMD_STEP = b"s"
+CMD_RESET = b"r"
+CMD_CLOSE = b"c"
+
+
+def buffer_layout(num_envs, rows, cols, observe_grid):
+    """Field name -> (dtype, shape, offset) in the shared block, plus the total size."""
+    fields = [
+        ("goals", np.int64, (num_envs,)),
+        ("reset_mask", np.bool_, (num_envs,)),
+        ("states", np.int64, (num_envs, 3)),
+        ("final_states", np.int64, (num_envs, 3)),
+        ("rewards", np.float64, (num_envs,)),
+        ("dones", np.bool_, (num_envs,)),
+    ]
+    if observe_grid:
+        fields.append(("grids", np.uint8, (num_envs, rows, cols)))
+    layout = {}
+    offset = 0
+    for name, dtype, shape in fields:
+        offset = -(-offset // 8) * 8  # keep every field 8-byte aligned
+        layout[name] = (dtype, shape, offset)
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return layout, max(offset, 1)
+
+
+def _views(shm, layout):
+    return {name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            for name, (dtype, shape, offset) in layout.items()}
+
+
+# ---------------- WORKER ----------------
+def _reset_pair(env, agent):
+    agent.x, agent.y = env.reset()
+    agent.battery = MAX_BATTERY
+    agent.bin = 0
+    agent.is_alive = True
+    agent.current_goal = None
+    agent.current_path.clear()
+
+
+def _worker(conn, name, layout, lo, hi, seed, autoreset, max_steps, map_layout):
+    shm = shared_memory.SharedMemory(name=name)
+    buf = _views(shm, layout)
+    goals, reset_mask, states = buf["goals"], buf["reset_mask"], buf["states"]
+    final_states, rewards, dones = buf["final_states"], buf["rewards"], buf["dones"]
+    grids = buf.get("grids")
+
+    pairs = [(GridWorld(render_mode=False, layout=map_layout, seed=seed + i), VacuumAgent())
+             for i in range(lo, hi)]
+    steps = [0] * len(pairs)
+
+    def reset(k, i):
+        env, agent = pairs[k]
+        _reset_pair(env, agent)
+        steps[k] = 0
+        states[i] = agent.get_state(env)
+        if grids is not None:
+            np.copyto(grids[i], env.grid)
+
+    try:
+        while True:
+            cmd = conn.recv_bytes()
+            try:
+                if cmd == CMD_STEP:
+                    for k, i in enumerate(range(lo, hi)):
+                        env, agent = pairs[k]
+                        reward, died, _ = agent.act(env, int(goals[i]))
+                        steps[k] += 1
+                        rewards[i] = reward
+                        dones[i] = died or steps[k] >= max_steps
+                        states[i] = final_states[i] = agent.get_state(env)
+                        if dones[i] and autoreset:
+                            reset(k, i)
+                        elif grids is not None:
+                            np.copyto(grids[i], env.grid)
+                elif cmd == CMD_RESET:
+                    for k, i in enumerate(range(lo, hi)):
+                        if reset_mask[i]:
+                            reset(k, i)
+                elif cmd == CMD_CLOSE:
+                    break
+                conn.send_bytes(b"")
+            except Exception:
+                conn.send_bytes(traceback.format_exc().encode())
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        del buf, goals, reset_mask, states, final_states, rewards, dones, grids
+        shm.close()
+        conn.close()
+
+
+# ---------------- VECTOR ENV ----------------
+class SubprocVectorEnv:
+    """`num_envs` GridWorld + VacuumAgent pairs split across `workers` processes.
+
+    Each worker hosts a contiguous slice of the envs. Env i draws its houses
+    from its own generator seeded with seed + i, so episodes do not depend
+    on the number of workers. Every step writes the high-level state (as
+    VacuumAgent.get_state), the reward and done into the shared block;
+    with observe_grid=True each env's tile grid too. dones include
+    truncation at max_steps.
+
+    With autoreset=True finished envs reset inside the worker during the
+    same step: `states` then already holds the new episode's first state
+    and `final_states` the state the finished episode ended in (the
+    next_state to learn from). Otherwise call reset(dones) as with
+    BatchedGridWorld.
+
+    Arrays returned by step_wait() and reset() are copies unless copy=False,
+    in which case they are views that the next call overwrites.
+    """
+
+    def __init__(self, num_envs, workers=None, seed=0, layout=None, observe_grid=False,
+                 autoreset=False, max_steps=MAX_STEPS, copy=True):
+        workers = min(workers or os.cpu_count() or 1, num_envs)
+        map_layout = resolve_layout(layout)
+        self.num_envs = num_envs
+        self.rows, self.cols = map_layout.rows, map_layout.cols
+        self.autoreset = autoreset
+        self.copy = copy
+
+        self._layout, size = buffer_layout(num_envs, self.rows, self.cols, observe_grid)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.buf = _views(self.shm, self._layout)
+        self.conns = []
+        self.procs = []
+        self.waiting = False
+        self.closed = False
+
+        bounds = np.linspace(0, num_envs, workers + 1).astype(int)
+        for w in range(workers):
+            parent, child = mp.Pipe()
+            args = (child, self.shm.name, self._layout, int(bounds[w]), int(bounds[w + 1]), seed,
+                    autoreset, max_steps, map_layout)
+            proc = mp.Process(target=_worker, args=args, daemon=True)
+            proc.start()
+            child.close()
+            self.conns.append(parent)
+            self.procs.append(proc)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def grids(self):
+        """(N, rows, cols) tiles after the last step or reset; None without observe_grid."""
+        grids = self.buf.get("grids")
+        return grids.copy() if grids is not None and self.copy else grids
+
+    @property
+    def final_states(self):
+        return self._out("final_states")
+
+    def _out(self, name):
+        return self.buf[name].copy() if self.copy else self.buf[name]
+
+    def _send(self, cmd):
+        for conn in self.conns:
+            conn.send_bytes(cmd)
+
+    def _wait(self):
+        errors = []
+        for w, conn in enumerate(self.conns):
+            reply = conn.recv_bytes()
+            if reply:
+                errors.append(f"worker {w}:\n{reply.decode()}")
+        if errors:
+            raise RuntimeError("\n".join(errors))
+
+    def reset(self, mask=None):
+        """Resets the selected envs (all by default) and returns all states."""
+        if self.waiting:
+            self.step_wait()
+        self.buf["reset_mask"][:] = True if mask is None else mask
+        self._send(CMD_RESET)
+        self._wait()
+        return self._out("states")
+
+    def step_async(self, goals):
+        """Starts one step of every env with these goals and returns immediately."""
+        if self.waiting:
+            raise RuntimeError("step_async called twice without step_wait")
+        self.buf["goals"][:] = goals
+        self._send(CMD_STEP)
+        self.waiting = True
+
+    def step_wait(self):
+        """Blocks until the step started by step_async is done; returns (states, rewards, dones)."""
+        if not self.waiting:
+            raise RuntimeError("step_wait called without step_async")
+        self.waiting = False
+        self._wait()
+        return self._out("states"), self._out("rewards"), self._out("dones")
+
+    def step(self, goals):
+        self.step_async(goals)
+        return self.step_wait()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for conn, proc in zip(self.conns, self.procs):
+            try:
+                if self.waiting:
+                    conn.recv_bytes()
+                conn.send_bytes(CMD_CLOSE)
+            except (BrokenPipeError, EOFError, OSError):
+                pass
+        for conn, proc in zip(self.conns, self.procs):
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+            conn.close()
+        # Views into the buffer must go before the mapping can be closed
+        self.buf = {}
+        self.shm.close()
+        self.shm.unlink()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--envs", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--steps", type=int, default=2000, help="vector steps to time")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--layout", default=None, help="floor plan file or layouts/ name")
+    parser.add_argument("--grid", action="store_true", help="also return tile grids")
+    args = parser.parse_args()
+
+    agent = VacuumAgent()
+    with SubprocVectorEnv(args.envs, args.workers, args.seed, args.layout, observe_grid=args.grid,
+                          autoreset=True) as env:
+        state = env.reset()
+        goal = agent.choose_goals(state)
+        pending = None
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            env.step_async(goal)
+            # Learn from the previous transition while the workers step
+            if pending:
+                agent.learn_batch(*pending)
+            next_state, reward, done = env.step_wait()
+            pending = (state, goal, reward, np.where(done[:, None], env.final_states, next_state))
+            if agent.epsilon > MIN_EPSILON:
+                agent.epsilon *= EPSILON_DECAY ** int(done.sum())
+            state = next_state
+            goal = agent.choose_goals(state)
+        elapsed = time.perf_counter() - start
+    print(f"{args.envs} envs x {args.steps} steps in {elapsed:.1f}s: "
+          f"{args.envs * args.steps / elapsed:,.0f} env steps/s")